@@ -1,8 +1,7 @@
 import os
-import json
-import time
 from comfy_client import ComfyClient
-from config import WORKFLOWS_DIR, OUTPUT_DIR
+from config import OUTPUT_DIR, COMFYUI_JOB_TIMEOUT
+from agents.workflow_registry import get_workflow_registry
 
 class ArtDeptAgent:
     def __init__(self, auto_start_comfy=True):
@@ -21,14 +20,12 @@ class ArtDeptAgent:
             print(f"   ⚠️ LTX-2 not available: {e}")
             self.ltx2 = None
         
-        # Load the Flux workflow template
-        workflow_path = os.path.join(WORKFLOWS_DIR, "flux_workflow_api.json")
-        if os.path.exists(workflow_path):
-            with open(workflow_path, 'r') as f:
-                self.flux_template = json.load(f)
-        else:
-            print(f"⚠️ Warning: Workflow NOT found at {workflow_path}")
-            self.flux_template = {}
+        # Load the Flux workflow template (validated once, shared via the registry)
+        try:
+            self.flux_template = get_workflow_registry().get("flux")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Warning: Flux workflow unavailable: {e}")
+            self.flux_template = None
 
     def generate_video_clip(self, scene_data, duration=5):
         """
@@ -91,33 +88,45 @@ class ArtDeptAgent:
 
     def generate_keyframe(self, scene_data):
         """
-        Generates a keyframe image via ComfyUI. Returns filename.
+        Generates a keyframe image via ComfyUI (submit + wait). Returns its path.
+        """
+        prompt_id = self.submit_keyframe(scene_data)
+        return self.collect_keyframe(prompt_id) if prompt_id else None
+
+    def submit_keyframe(self, scene_data):
+        """
+        Queues a keyframe job on ComfyUI without waiting. Returns the prompt_id or None.
         """
         if not self.comfy.connected:
             print("   ⚠️ Art Dept: ComfyUI not connected. Skipping generation.")
             return None
+        if self.flux_template is None:
+            return None
 
         prompt_text = scene_data.get('visual_prompt', "")
         print(f"   🎨 Generating Keyframe: '{prompt_text[:50]}...'")
         
         try:
-            # Clone template
-            workflow = self.flux_template.copy()
-            
-            # Inject Prompt (Node ID 6 is CLIP Text Encode)
-            if "6" in workflow:
-                workflow["6"]["inputs"]["text"] = prompt_text
+            # Independent job graph with the prompt injected (the template is never touched)
+            workflow = self.flux_template.instantiate(prompt=prompt_text)
             
             # Queue Prompt
             response = self.comfy.queue_prompt(workflow)
-            prompt_id = response['prompt_id']
-            
-            # Wait for completion (Simple Polling)
-            print("      ⏳ Rendering...")
-            time.sleep(5) # Placeholder wait
-            
-            return f"flux_{prompt_id}.png"
+            return response['prompt_id']
             
         except Exception as e:
             print(f"   ❌ Art Dept Error: {e}")
             return None
+
+    def collect_keyframe(self, prompt_id):
+        """
+        Waits for a submitted keyframe job. Returns the image path or None.
+        """
+        try:
+            outputs = self.comfy.wait_for_outputs(prompt_id, max_wait=COMFYUI_JOB_TIMEOUT)
+            image = self.comfy.first_output(outputs, kinds=("images",))
+            if image:
+                return self.comfy.fetch_output(prompt_id, image, OUTPUT_DIR)
+        except Exception as e:
+            print(f"   ❌ Art Dept Error: {e}")
+        return None
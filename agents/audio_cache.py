@@ -0,0 +1,139 @@
+"""
+Audio Cache - Decode every audio asset ONCE to float32 PCM
+Voiceovers, music and SFX arrive as MP3 (edge-tts even writes MP3 data into .wav names).
+Each file is decoded by ffmpeg a single time at the project sample rate into a
+content-hashed raw PCM file that the mixer, subtitles and loudness analysis memory-map.
+Re-runs and re-mixes hit the cache instead of decoding again.
+"""
+import os
+import hashlib
+import subprocess
+import threading
+import numpy as np
+from config import AUDIO_CACHE_DIR, AUDIO_SAMPLE_RATE
+from agents.render_pipeline import ffmpeg_exe
+
+
+class AudioCache:
+    """
+    Content-addressed cache of decoded audio.
+    Key: sha1(file bytes) + sample rate + channel count -> <cache_dir>/<key>.f32
+    """
+    def __init__(self, cache_dir=AUDIO_CACHE_DIR, sample_rate=AUDIO_SAMPLE_RATE, channels=2):
+        self.cache_dir = cache_dir
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.hashes = {}  # (path, size, mtime) -> sha1, so unchanged files are hashed once per process
+        self.locks = {}
+        self.lock = threading.Lock()
+        self.stats = {"decoded": 0, "cached": 0}
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def content_hash(self, path):
+        st = os.stat(path)
+        memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        digest = self.hashes.get(memo_key)
+        if digest is None:
+            h = hashlib.sha1()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    h.update(chunk)
+            digest = h.hexdigest()
+            self.hashes[memo_key] = digest
+        return digest
+
+    def ingest(self, path, sample_rate=None, channels=None):
+        """
+        Ensure `path` is decoded in the cache. Returns the cached PCM path or None.
+        """
+        sample_rate = sample_rate or self.sample_rate
+        channels = channels or self.channels
+        if not path or not os.path.exists(path):
+            return None
+
+        key = f"{self.content_hash(path)}_{sample_rate}_{channels}"
+        pcm_path = os.path.join(self.cache_dir, f"{key}.f32")
+        if os.path.exists(pcm_path):
+            self.stats["cached"] += 1
+            return pcm_path
+
+        with self.lock:
+            key_lock = self.locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if os.path.exists(pcm_path):
+                self.stats["cached"] += 1
+                return pcm_path
+            # Decode to a private temp file, then publish atomically
+            tmp_path = f"{pcm_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            cmd = [ffmpeg_exe(), "-v", "error", "-y", "-i", path, "-vn",
+                   "-f", "f32le", "-acodec", "pcm_f32le",
+                   "-ac", str(channels), "-ar", str(sample_rate), tmp_path]
+            try:
+                subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                os.replace(tmp_path, pcm_path)
+            except Exception as e:
+                print(f"   ⚠️ Audio decode failed for {os.path.basename(path)}: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return None
+            self.stats["decoded"] += 1
+        return pcm_path
+
+    def ingest_all(self, paths):
+        """Audio ingest step: decode every distinct asset once"""
+        paths = [p for p in dict.fromkeys(paths) if p and os.path.exists(p)]
+        if not paths:
+            return {}
+        before = dict(self.stats)
+        result = {p: self.ingest(p) for p in paths}
+        decoded = self.stats["decoded"] - before["decoded"]
+        print(f"   🎧 Audio ingest: {len(paths)} assets ({decoded} decoded, {len(paths) - decoded} from cache)")
+        return result
+
+    def load(self, path, sample_rate=None, channels=None):
+        """Memory-map decoded PCM as a (frames, channels) float32 array"""
+        channels = channels or self.channels
+        pcm_path = self.ingest(path, sample_rate, channels)
+        if not pcm_path:
+            return None
+        if os.path.getsize(pcm_path) == 0:
+            return np.zeros((0, channels), dtype=np.float32)
+        return np.memmap(pcm_path, dtype=np.float32, mode='r').reshape(-1, channels)
+
+    def audio_clip(self, path):
+        """MoviePy audio clip backed by the memory-mapped PCM (no ffmpeg decode)"""
+        from moviepy.audio.AudioClip import AudioArrayClip
+        samples = self.load(path)
+        if samples is None or len(samples) == 0:
+            raise IOError(f"Could not decode audio: {path}")
+        return AudioArrayClip(samples, fps=self.sample_rate)
+
+    def loudness(self, path, block=1 << 20):
+        """RMS and peak level in dBFS, streamed over the memory map"""
+        samples = self.load(path)
+        if samples is None or len(samples) == 0:
+            return None
+        flat = samples.reshape(-1)
+        sum_sq = 0.0
+        peak = 0.0
+        for start in range(0, len(flat), block):
+            chunk = flat[start:start + block]
+            sum_sq += float(np.dot(chunk, chunk))
+            peak = max(peak, float(np.abs(chunk).max()))
+        rms = (sum_sq / len(flat)) ** 0.5
+        to_db = lambda v: float(20 * np.log10(v)) if v > 0 else float("-inf")
+        return {"rms_db": to_db(rms), "peak_db": to_db(peak)}
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_audio_cache():
+    """Process-wide AudioCache shared by the mixer, subtitles and analysis"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = AudioCache()
+        return _shared_cache
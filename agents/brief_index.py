@@ -0,0 +1,61 @@
+"""
+Brief Index - Local TF-IDF similarity search over past briefs
+Lets the planner warm-start from plans and scripts that already worked for similar
+briefs ("coffee ad, warm morning" ~ "morning coffee commercial"). Pure Python, no network.
+- Word unigrams + bigrams, smoothed IDF, L2-normalised vectors, cosine similarity
+- Rebuilt in memory from knowledge.json entries (a few hundred briefs at most)
+"""
+import re
+import math
+from collections import Counter
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "for", "of", "to", "in", "on", "with", "at", "by",
+    "is", "it", "this", "that", "be", "as", "from", "about", "make", "create", "video",
+    "me", "my", "our", "please", "some", "very"
+}
+
+
+def tokenize(text):
+    """Lower-cased word unigrams and bigrams, stopwords removed, light plural folding"""
+    words = [w.rstrip("s") if len(w) > 3 else w
+             for w in re.findall(r"[a-z0-9]+", str(text).lower()) if w not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class BriefIndex:
+    def __init__(self, entries=(), key="prompt"):
+        self.key = key
+        self.entries = []
+        self.vectors = []
+        self.idf = {}
+        self.build(entries)
+
+    def build(self, entries):
+        """Index entries (dicts with the brief under `key`)"""
+        self.entries = [e for e in entries if isinstance(e, dict) and e.get(self.key)]
+        docs = [Counter(tokenize(e[self.key])) for e in self.entries]
+        df = Counter(term for doc in docs for term in doc)
+        n = len(docs)
+        self.idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+        self.vectors = [self._vector(doc) for doc in docs]
+
+    def _vector(self, counts):
+        vec = {term: (1 + math.log(tf)) * self.idf[term] for term, tf in counts.items() if term in self.idf}
+        norm = math.sqrt(sum(v * v for v in vec.values()))
+        return {term: v / norm for term, v in vec.items()} if norm else {}
+
+    def search(self, query, k=3, min_score=0.0):
+        """Top-k (score, entry) pairs by cosine similarity, best first"""
+        if not self.entries:
+            return []
+        qvec = self._vector(Counter(tokenize(query)))
+        if not qvec:
+            return []
+        scored = []
+        for entry, vec in zip(self.entries, self.vectors):
+            score = sum(weight * vec.get(term, 0.0) for term, weight in qvec.items())
+            if score > min_score:
+                scored.append((score, entry))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return scored[:k]
@@ -0,0 +1,130 @@
+"""
+Budget Planner - Keep a production inside its wall-clock budget
+- StageTimings: learned cost of each remaining stage (EWMA, persisted across runs)
+- BudgetPlanner: projects the rest of the run and, when it would overshoot, degrades
+  the costliest GENERATE scenes (to STOCK, or offline Ken Burns stills without network)
+  and finally drops the render to the draft preset
+Every decision is logged to the WorkflowTracker so missed SLAs can be explained.
+"""
+import os
+import json
+import time
+import threading
+
+from config import STAGE_TIMINGS_PATH, QUALITY_PROFILES
+
+# Seconds, used until a stage has history. GENERATE scales with footage length
+# (keyframe + LTX/ComfyUI video), post-production with the length of the cut.
+DEFAULT_TIMINGS = {
+    "dp_scene": 4.0,
+    "voiceover_scene": 3.0,
+    "scene_STOCK": 12.0,
+    "scene_OFFLINE": 2.0,
+    "scene_GENERATE_per_s": 40.0,
+    "post_per_s": 3.0,
+}
+
+
+class StageTimings:
+    def __init__(self, path=STAGE_TIMINGS_PATH, alpha=0.3):
+        self.path = path
+        self.alpha = alpha
+        self.lock = threading.Lock()
+        self.stages = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.stages = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"   ⚠️ Stage timings unreadable, using defaults: {e}")
+
+    def estimate(self, stage):
+        with self.lock:
+            entry = self.stages.get(stage)
+        return entry["ewma"] if entry else DEFAULT_TIMINGS.get(stage, 0.0)
+
+    def record(self, stage, seconds):
+        with self.lock:
+            entry = self.stages.setdefault(stage, {"ewma": seconds, "samples": 0})
+            if entry["samples"]:
+                entry["ewma"] = (1 - self.alpha) * entry["ewma"] + self.alpha * seconds
+            entry["samples"] += 1
+
+    def save(self):
+        with self.lock:
+            data = json.dumps(self.stages, indent=2)
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+class BudgetPlanner:
+    def __init__(self, budget_s, timings, tracker=None, offline=False):
+        self.budget_s = budget_s
+        self.timings = timings
+        self.tracker = tracker
+        self.offline = offline  # No network: degrade to offline stills instead of stock
+        self.started = time.time()
+        self.render_preset = None  # Set when the render has to drop to the draft preset
+
+    def elapsed(self):
+        return time.time() - self.started
+
+    def scene_cost(self, scene):
+        source = scene.get('source_type', 'GENERATE')
+        if source == "GENERATE":
+            return self.timings.estimate("scene_GENERATE_per_s") * float(scene.get('duration', 5) or 5)
+        return self.timings.estimate(f"scene_{source}")
+
+    def project(self, scenes, prepared=()):
+        """Seconds still needed: DP/voiceover for scenes not yet prepared, assets, post-production"""
+        prep = len([i for i in range(len(scenes)) if i not in prepared])
+        footage = sum(float(s.get('duration', 5) or 5) for s in scenes)
+        return (prep * (self.timings.estimate("dp_scene") + self.timings.estimate("voiceover_scene"))
+                + sum(self.scene_cost(s) for s in scenes)
+                + footage * self.timings.estimate("post_per_s"))
+
+    def fit(self, scenes, prepared=()):
+        """
+        Degrade scenes in place until the projection fits the remaining budget.
+        Returns the list of decisions taken (empty when already on schedule or unbudgeted).
+        """
+        if not self.budget_s:
+            return []
+        decisions = []
+        remaining = self.budget_s - self.elapsed()
+        projected = self.project(scenes, prepared)
+        self._log("projection", f"{projected:.0f}s projected, {remaining:.0f}s left of {self.budget_s:.0f}s",
+                  "Stage estimates from historical timings")
+
+        fallback = "OFFLINE" if self.offline else "STOCK"
+        generate = sorted((i for i, s in enumerate(scenes) if s.get('source_type', 'GENERATE') == "GENERATE"),
+                          key=lambda i: self.scene_cost(scenes[i]), reverse=True)
+        for i in generate:
+            if projected <= remaining:
+                break
+            saved = self.scene_cost(scenes[i])
+            scenes[i]['source_type'] = fallback
+            scenes[i]['budget_degraded'] = True
+            saved -= self.scene_cost(scenes[i])
+            projected -= saved
+            decisions.append({"scene": i, "from": "GENERATE", "to": fallback, "saved_s": round(saved, 1)})
+            self._log("degrade", f"Scene {i+1}: GENERATE -> {fallback}",
+                      f"Saves ~{saved:.0f}s; now {projected:.0f}s projected vs {remaining:.0f}s left")
+
+        if projected > remaining:
+            self.render_preset = QUALITY_PROFILES["draft"]["preset"]
+            decisions.append({"render_preset": self.render_preset})
+            self._log("degrade", f"Render preset -> draft ({self.render_preset})",
+                      f"Still {projected - remaining:.0f}s over budget after degrading scenes")
+        return decisions
+
+    def _log(self, decision_type, decision, rationale):
+        if self.tracker:
+            self.tracker.log_decision("Scheduler", decision_type, decision, rationale)
+        else:
+            print(f"   ⏱️ Scheduler: {decision} - {rationale}")
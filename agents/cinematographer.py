@@ -1,5 +1,28 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from agents.llm_client import LLMClient
+from config import CINEMATOGRAPHER_MODE, CINEMATOGRAPHER_CONCURRENCY
+
+# Specialized System Prompt for the DP
+DP_SYSTEM_PROMPT = """You are a Master Cinematographer (DoP).
+Your job is to translate a script description into a Technical Visual Prompt for an AI Video Generator.
+
+Input: "A man showing a coffee cup."
+Output: "Close-up shot of a ceramic coffee cup held by weathered hands, 50mm lens, f/1.8, soft morning lighting, steam rising, bokeh kitchen background, high resolution, photorealistic."
+
+RULES:
+1. Be specific about CAMERA ANGLE (Low angle, Overhead, Eye level).
+2. Specify LIGHTING (Golden hour, Neon, Studio softbox).
+3. Specify LENS/STYLE (Wide angle, Macro, 35mm film grain).
+4. Keep it under 40 words."""
+
+SINGLE_OUTPUT_RULE = "\n5. Return ONLY the prompt text. No quotes."
+
+BATCH_OUTPUT_RULE = """
+5. You will receive several numbered shots. Enhance EACH one, keeping the shots visually consistent.
+Reply with JSON only:
+{"scenes": [{"index": 1, "visual_prompt": "..."}]}"""
+
 
 class CinematographerAgent:
     """
@@ -8,57 +31,108 @@ class CinematographerAgent:
     - Takes a narrative script.
     - Rewrites 'visual_prompt' into technical camera instructions.
     - Ensures visual consistency (color palette, lighting style).
+
+    Modes (CINEMATOGRAPHER_MODE):
+    - "batched": all scenes in one JSON call, per-scene calls for any it misses
+    - "concurrent": one call per scene, CINEMATOGRAPHER_CONCURRENCY in flight
+    - "sequential": one call per scene, in order
+    Per-scene calls share one system prompt (DP_SYSTEM_PROMPT + SINGLE_OUTPUT_RULE), so on
+    Ollama's chat endpoint only the short user turn is evaluated after the first scene.
     """
-    def __init__(self):
-        self.llm = LLMClient()
+    def __init__(self, mode=CINEMATOGRAPHER_MODE, concurrency=CINEMATOGRAPHER_CONCURRENCY):
+        self.llm = LLMClient(agent="cinematographer")
+        self.mode = mode
+        self.concurrency = max(1, concurrency)
+
+    def enhance_visuals(self, script_data, skip=()):
+        """Enhance every scene's visual prompt. Indices in `skip` are already done."""
+        print(f"   🎥 Cinematographer: Enhancing visual prompts ({self.mode})...")
 
-    def enhance_visuals(self, script_data):
-        print("   🎥 Cinematographer: Enhancing visual prompts...")
-        
         scenes = script_data.get('scenes', [])
         if not scenes:
             return script_data
 
-        enhanced_scenes = []
-        
-        for i, scene in enumerate(scenes):
-            original_visual = scene.get('visual_prompt', '')
-            print(f"      👁️ Analyzing Scene {i+1}: {original_visual[:40]}...")
-            
-            # Specialized System Prompt for the DP
-            system_prompt = """You are a Master Cinematographer (DoP).
-Your job is to translate a script description into a Technical Visual Prompt for an AI Video Generator.
+        pending = [i for i in range(len(scenes)) if i not in skip]
+        if self.mode == "batched" and len(pending) > 1:
+            missed = self._enhance_batch(scenes, pending)
+            if missed:
+                print(f"      ↩️ Batch missed {len(missed)} scenes, enhancing them individually...")
+            self._enhance_each(scenes, missed, self.concurrency)
+        elif self.mode in ("batched", "concurrent"):
+            self._enhance_each(scenes, pending, self.concurrency)
+        else:
+            self._enhance_each(scenes, pending, 1)
 
-Input: "A man showing a coffee cup."
-Output: "Close-up shot of a ceramic coffee cup held by weathered hands, 50mm lens, f/1.8, soft morning lighting, steam rising, bokeh kitchen background, high resolution, photorealistic."
+        script_data['scenes'] = scenes
+        return script_data
 
-RULES:
-1. Be specific about CAMERA ANGLE (Low angle, Overhead, Eye level).
-2. Specify LIGHTING (Golden hour, Neon, Studio softbox).
-3. Specify LENS/STYLE (Wide angle, Macro, 35mm film grain).
-4. Keep it under 40 words.
-5. Return ONLY the prompt text. No quotes."""
+    def _enhance_each(self, scenes, indices, workers):
+        """Per-scene calls with bounded parallelism (failures keep the original prompt)"""
+        if workers <= 1 or len(indices) <= 1:
+            for i in indices:
+                self.enhance_scene(scenes[i], i)
+            return
+        with ThreadPoolExecutor(max_workers=min(workers, len(indices))) as pool:
+            list(pool.map(lambda i: self.enhance_scene(scenes[i], i), indices))
 
+    def _enhance_batch(self, scenes, indices):
+        """
+        Enhance all pending scenes in one structured call.
+        Returns the indices that still need a per-scene call.
+        """
+        shots = "\n".join(
+            f"{n}. {scenes[i].get('visual_prompt', '')}" for n, i in enumerate(indices, start=1)
+        )
+        try:
+            result = self.llm.generate(
+                system_prompt=DP_SYSTEM_PROMPT + BATCH_OUTPUT_RULE,
+                user_prompt=f"Enhance these {len(indices)} shots:\n{shots}",
+                temperature=0.6,
+                json_mode=True
+            )
+        except Exception as e:
+            print(f"         ❌ Cinematographer batch error: {e}")
+            return list(indices)
+
+        entries = result.get('scenes', []) if isinstance(result, dict) else []
+        enhanced = {}
+        for position, entry in enumerate(entries, start=1):
+            if not isinstance(entry, dict):
+                continue
             try:
-                # We use a lower temperature for consistent technical details
-                technical_prompt = self.llm.generate(
-                    system_prompt=system_prompt,
-                    user_prompt=f"Enhance this visual: {original_visual}",
-                    temperature=0.6,
-                    json_mode=False
-                )
-                
-                # Check validity
-                if technical_prompt and len(technical_prompt) > 5:
-                    scene['visual_prompt'] = technical_prompt.strip()
-                    print(f"         ✨ Enhanced: {technical_prompt[:50]}...")
-                else:
-                    print("         ⚠️ Enhancement failed, keeping original.")
-                    
-            except Exception as e:
-                print(f"         ❌ Cinematographer error: {e}")
-            
-            enhanced_scenes.append(scene)
-            
-        script_data['scenes'] = enhanced_scenes
-        return script_data
+                n = int(entry.get('index', position))
+            except (TypeError, ValueError):
+                n = position
+            prompt = entry.get('visual_prompt')
+            if 1 <= n <= len(indices) and isinstance(prompt, str) and len(prompt.strip()) > 5:
+                enhanced[indices[n - 1]] = prompt.strip()
+
+        for i, prompt in enhanced.items():
+            scenes[i]['visual_prompt'] = prompt
+            print(f"      ✨ Scene {i+1}: {prompt[:50]}...")
+        return [i for i in indices if i not in enhanced]
+
+    def enhance_scene(self, scene, i):
+        """Rewrite one scene's visual_prompt in place"""
+        original_visual = scene.get('visual_prompt', '')
+        print(f"      👁️ Analyzing Scene {i+1}: {original_visual[:40]}...")
+
+        try:
+            # We use a lower temperature for consistent technical details
+            technical_prompt = self.llm.generate(
+                system_prompt=DP_SYSTEM_PROMPT + SINGLE_OUTPUT_RULE,
+                user_prompt=f"Enhance this visual: {original_visual}",
+                temperature=0.6,
+                json_mode=False
+            )
+
+            # Check validity
+            if technical_prompt and len(technical_prompt) > 5:
+                scene['visual_prompt'] = technical_prompt.strip()
+                print(f"         ✨ Enhanced: {technical_prompt[:50]}...")
+            else:
+                print("         ⚠️ Enhancement failed, keeping original.")
+
+        except Exception as e:
+            print(f"         ❌ Cinematographer error: {e}")
+        return scene
@@ -3,14 +3,29 @@ EditorAgent - Professional Video Assembly & Editing
 Gemini Veo-Level Post-Production:
 - Smart Ken Burns effect for static images
 - Professional audio mixing (Music, SFX, Voiceover)
-- Seamless transitions
+- Seamless transitions (TransitionsDirector specs, blended only inside each window)
+- Fused per-frame effects (FrameEngine) instead of chained vfx
+- Optional pipelined render (shared-memory decode/effects/encode processes)
+- Social cutdowns (6s/15s) from the master timeline
+- Audio decoded once into a memory-mapped PCM cache (AudioCache)
 - Robust error handling
 """
 import os
 import random
 from datetime import datetime
-from moviepy.editor import VideoFileClip, ImageClip, concatenate_videoclips, CompositeAudioClip, AudioFileClip, vfx, CompositeVideoClip
-from config import OUTPUT_DIR, RESOLUTION, FPS
+from moviepy.editor import VideoFileClip, ImageClip, concatenate_videoclips, CompositeAudioClip, vfx, CompositeVideoClip
+from config import OUTPUT_DIR, RESOLUTION, FPS, CUTDOWN_DURATIONS, ENABLE_CUTDOWNS, EDITOR_FRAME_ENGINE, RENDER_MODE, AUDIO_SAMPLE_RATE
+from agents.frame_engine import FrameEngine, KenBurns, render_text_overlay
+from agents.render_pipeline import PipelinedRenderer
+from agents.transitions import build_timeline, has_blends
+from agents.audio_cache import get_audio_cache
+
+# Purpose keywords that make a shot worth keeping in a short cutdown
+CUTDOWN_KEY_PURPOSES = ['hook', 'open', 'intro', 'establish', 'reveal', 'product', 'brand',
+                        'logo', 'climax', 'payoff', 'call to action', 'cta', 'resolution', 'end']
+
+# Shortest on-screen time per pacing before a shot stops reading
+CUTDOWN_MIN_SHOT = {"fast": 1.0, "medium": 1.5, "slow": 2.0}
 
 class EditorAgent:
     def __init__(self):
@@ -22,6 +37,14 @@ class EditorAgent:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.output_filename = f"final_cut_{timestamp}.mp4"
         self.output_path = os.path.join(self.output_dir, self.output_filename)
+        self.cutdown_paths = []
+        
+        # Fused frame kernels replace the resize/crop/colorx/blackwhite/composite chain
+        self.frame_engine = FrameEngine() if EDITOR_FRAME_ENGINE == "fused" else None
+        # Every audio layer is served from decoded PCM memory maps
+        self.audio_cache = get_audio_cache()
+        # x264 preset; the budget planner lowers it to the draft profile under deadline pressure
+        self.render_preset = None
     
     def assemble_cut(self, assets, audio_path=None, sound_effects=None, voiceover_path=None, production_plan=None, tracker=None):
         """
@@ -33,8 +56,35 @@ class EditorAgent:
             print("   ⚠️ No assets to assemble")
             return None
             
+        production_plan = production_plan or {}
+        style = production_plan.get('style', '')
+        
+        # AUDIO INGEST: decode music, SFX and all voiceovers once (cached across runs)
+        self.audio_cache.ingest_all(
+            [audio_path, voiceover_path] + list(sound_effects or []) +
+            [asset.get('voiceover_path') for asset in assets]
+        )
+        
+        # The pipelined renderer only does hard cuts and the master: fall back when more is needed
+        pipelined = RENDER_MODE == "pipelined"
+        if pipelined and ENABLE_CUTDOWNS and CUTDOWN_DURATIONS:
+            print("   ⚠️ Pipelined render skipped: social cutdowns are enabled (rendered by the MoviePy path)")
+            pipelined = False
+        elif pipelined and has_blends(production_plan.get('transitions')):
+            print("   ⚠️ Pipelined render skipped: the plan has blended transitions (hard cuts only there)")
+            pipelined = False
+        if pipelined:
+            try:
+                result = self._assemble_pipelined(assets, audio_path, sound_effects, voiceover_path, style)
+                if result:
+                    return result
+            except Exception as e:
+                print(f"   ⚠️ Pipelined render error: {e}")
+            print("   ⚠️ Pipelined render failed, falling back to MoviePy...")
+        
         try:
             clips = []
+            segments = []  # Timeline metadata for cutdowns (parallel to clips)
             
             # STEP 1: PROCESSING CLIPS
             for i, asset in enumerate(assets):
@@ -51,7 +101,7 @@ class EditorAgent:
                 scene_vo_path = asset.get('voiceover_path')
                 if scene_vo_path and os.path.exists(scene_vo_path):
                     try:
-                        vo_clip = AudioFileClip(scene_vo_path)
+                        vo_clip = self.audio_cache.audio_clip(scene_vo_path)
                         # Extend video to match VO if VO is longer
                         if vo_clip.duration > target_duration:
                             print(f"         ⏳ Extending clip duration to {vo_clip.duration:.1f}s to match VO")
@@ -62,11 +112,15 @@ class EditorAgent:
 
                 try:
                     clip = None
+                    zoom = None
                     # HANDLE IMAGES (Ken Burns)
                     if asset_path.lower().endswith(('.jpg', '.jpeg', '.png', '.webp')):
                         print(f"         🖼️ Applying Ken Burns effect to image...")
                         clip = ImageClip(asset_path).set_duration(target_duration)
-                        clip = self._apply_ken_burns(clip, target_duration)
+                        if self.frame_engine:
+                            zoom = self._ken_burns_zoom(target_duration)  # Fused into the kernel
+                        else:
+                            clip = self._apply_ken_burns(clip, target_duration)
                         
                     # HANDLE VIDEO
                     elif asset_path.lower().endswith(('.mp4', '.mov', '.avi', '.mkv')):
@@ -87,13 +141,18 @@ class EditorAgent:
                             # But wait, step 3 is global mixing.
                             # Better approach: Attach audio to clip, then CompositeAudioClip will include it?
                             # Concatenate_videoclips usually handles audio if present.
-                            vo_clip = AudioFileClip(scene_vo_path).volumex(1.5) # Boost VO
+                            vo_clip = self.audio_cache.audio_clip(scene_vo_path).volumex(1.5) # Boost VO
                             clip = clip.set_audio(vo_clip)
                             print(f"         ✅ Attached Scene Voiceover")
                         except Exception as e:
                             print(f"         ❌ Failed to attach VO: {e}")
                     
-                    if clip:
+                    if clip and self.frame_engine:
+                        # ONE KERNEL: resize + crop + zoom + grade + text overlay
+                        text = asset.get('text_overlay')
+                        overlay = self._render_text_rgba(text) if text and len(text) >= 2 else None
+                        clip = self.frame_engine.apply(clip, zoom=zoom, style=style, overlay=overlay)
+                    elif clip:
                         # STANDARDIZE RESOLUTION (1080p)
                         clip = self._resize_to_1080p(clip)
                         
@@ -101,9 +160,16 @@ class EditorAgent:
                         text = asset.get('text_overlay')
                         if text:
                             clip = self._apply_text_overlay(clip, text, target_duration)
-                            
+                    
+                    if clip:
                         clip = clip.set_fps(FPS)
                         clips.append(clip)
+                        segments.append({
+                            'scene_index': asset.get('scene_index', i),
+                            'duration': clip.duration,
+                            'purpose': asset.get('purpose', ''),
+                            'pacing': asset.get('pacing', '')
+                        })
                         
                 except Exception as e:
                     print(f"         ❌ Failed to process clip: {e}")
@@ -115,10 +181,15 @@ class EditorAgent:
             
             # STEP 1.5: CINEMATIC COLOR GRADING
             print(f"      🎨 Applying Color Grade: {production_plan.get('style', 'Standard')}")
-            style = production_plan.get('style', '').lower()
+            style = style.lower()
             
             processed_clips = []
             for clip in clips:
+                # Fused kernels already graded every frame
+                if self.frame_engine:
+                    processed_clips.append(clip)
+                    continue
+                
                 # Noir Mode
                 if "noir" in style or "black and white" in style:
                     clip = clip.fx(vfx.blackwhite)
@@ -139,59 +210,14 @@ class EditorAgent:
             
             clips = processed_clips
             
-            # STEP 2: CONCATENATION
+            # STEP 2: CONCATENATION (hard cuts + overlap-only transitions)
             print("      🎬 Concatenating...")
-            final_video = concatenate_videoclips(clips, method="compose")
+            final_video = build_timeline(clips, segments, production_plan.get('transitions'))
             
             # STEP 3: AUDIO MIXING (Smart Levels)
-            print("      🎧 Mixing Audio Layers...")
-            audio_layers = []
-            
-            # Determine mix levels
-            music_vol = 0.25 if voiceover_path else 0.6  # Ducking logic: 25% if VO exists, else 60%
-            sfx_vol = 0.6
-            vo_vol = 1.0
-            
-            # Layer 1: Background Music
-            if audio_path and os.path.exists(audio_path):
-                try:
-                    music = AudioFileClip(audio_path)
-                    if music.duration < final_video.duration:
-                         # Simple loop: just play it again? MoviePy looping is tricky.
-                         # Better: fade out if too short
-                         pass 
-                    else:
-                        music = music.subclip(0, final_video.duration)
-                    
-                    music = music.volumex(music_vol)
-                    music = music.audio_fadein(2).audio_fadeout(2) # Smooth transitions
-                    audio_layers.append(music)
-                    print(f"         ✅ Music Added (Level: {music_vol})")
-                except Exception as e:
-                    print(f"         ⚠️ Music Failed: {e}")
-            
-            # Layer 2: Sound Effects
-            if sound_effects:
-                for sfx_path in sound_effects:
-                    if os.path.exists(sfx_path):
-                        try:
-                            sfx = AudioFileClip(sfx_path).volumex(sfx_vol)
-                            if sfx.duration > final_video.duration:
-                                sfx = sfx.subclip(0, final_video.duration)
-                            audio_layers.append(sfx)
-                        except:
-                            pass
-            
-            # Layer 3: Voiceover
-            if voiceover_path and os.path.exists(voiceover_path):
-                try:
-                    vo = AudioFileClip(voiceover_path).volumex(vo_vol)
-                    if vo.duration > final_video.duration:
-                        vo = vo.subclip(0, final_video.duration)
-                    audio_layers.append(vo)
-                    print(f"         ✅ Voiceover Added (Level: 1.0)")
-                except:
-                    pass
+            audio_layers, music_vol = self._mix_audio_layers(
+                final_video.duration, audio_path, sound_effects, voiceover_path
+            )
             
             if audio_layers:
                 final_audio = CompositeAudioClip(audio_layers)
@@ -204,10 +230,18 @@ class EditorAgent:
                 fps=FPS,
                 codec='libx264',
                 audio_codec='aac',
+                preset=self.render_preset or "medium",
                 threads=4,
                 logger=None
             )
             
+            # STEP 5: SOCIAL CUTDOWNS (reuse normalized clips, no re-decode of sources)
+            if ENABLE_CUTDOWNS and CUTDOWN_DURATIONS:
+                self.cutdown_paths = self.render_cutdowns(
+                    clips, segments, CUTDOWN_DURATIONS,
+                    audio_path=audio_path, music_vol=music_vol, tracker=tracker
+                )
+            
             # Cleanup
             final_video.close()
             for c in clips: c.close()
@@ -220,6 +254,251 @@ class EditorAgent:
             traceback.print_exc()
             return None
 
+    def _mix_audio_layers(self, duration, audio_path=None, sound_effects=None, voiceover_path=None):
+        """Build music/SFX/VO layers for a timeline of the given duration. Returns (layers, music_vol)."""
+        print("      🎧 Mixing Audio Layers...")
+        audio_layers = []
+        
+        # Determine mix levels
+        music_vol = 0.25 if voiceover_path else 0.6  # Ducking logic: 25% if VO exists, else 60%
+        sfx_vol = 0.6
+        vo_vol = 1.0
+        
+        # Layer 1: Background Music
+        if audio_path and os.path.exists(audio_path):
+            try:
+                music = self.audio_cache.audio_clip(audio_path)
+                if music.duration < duration:
+                     # Simple loop: just play it again? MoviePy looping is tricky.
+                     # Better: fade out if too short
+                     pass 
+                else:
+                    music = music.subclip(0, duration)
+                
+                music = music.volumex(music_vol)
+                music = music.audio_fadein(2).audio_fadeout(2) # Smooth transitions
+                audio_layers.append(music)
+                level = self.audio_cache.loudness(audio_path)
+                level_note = f", {level['rms_db']:.1f} dBFS RMS" if level else ""
+                print(f"         ✅ Music Added (Level: {music_vol}{level_note})")
+            except Exception as e:
+                print(f"         ⚠️ Music Failed: {e}")
+        
+        # Layer 2: Sound Effects
+        if sound_effects:
+            for sfx_path in sound_effects:
+                if os.path.exists(sfx_path):
+                    try:
+                        sfx = self.audio_cache.audio_clip(sfx_path).volumex(sfx_vol)
+                        if sfx.duration > duration:
+                            sfx = sfx.subclip(0, duration)
+                        audio_layers.append(sfx)
+                    except:
+                        pass
+        
+        # Layer 3: Voiceover
+        if voiceover_path and os.path.exists(voiceover_path):
+            try:
+                vo = self.audio_cache.audio_clip(voiceover_path).volumex(vo_vol)
+                if vo.duration > duration:
+                    vo = vo.subclip(0, duration)
+                audio_layers.append(vo)
+                print(f"         ✅ Voiceover Added (Level: 1.0)")
+            except:
+                pass
+        
+        return audio_layers, music_vol
+
+    def _assemble_pipelined(self, assets, audio_path, sound_effects, voiceover_path, style):
+        """
+        Render through the shared-memory decode/effects/encode pipeline.
+        Audio is mixed with MoviePy into a temp WAV and muxed by the encoder.
+        """
+        print("      ⚙️ Render mode: pipelined (shared-memory ring buffer, hard cuts only)")
+        from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+        
+        segments = []
+        vo_layers = []
+        cursor = 0.0
+        for i, asset in enumerate(assets):
+            asset_path = asset.get('path')
+            duration = asset.get('duration', 5)
+            if not asset_path or not os.path.exists(asset_path):
+                print(f"      ⚠️ Missing asset: {asset_path}")
+                continue
+            
+            spec = {'path': asset_path, 'style': style, 'text': asset.get('text_overlay')}
+            lower = asset_path.lower()
+            is_image = lower.endswith(('.jpg', '.jpeg', '.png', '.webp'))
+            if not is_image and not lower.endswith(('.mp4', '.mov', '.avi', '.mkv')):
+                continue
+            
+            # Scene VO: extend the shot to fit and place it on the timeline
+            scene_vo_path = asset.get('voiceover_path')
+            if scene_vo_path and os.path.exists(scene_vo_path):
+                try:
+                    vo_clip = self.audio_cache.audio_clip(scene_vo_path)
+                    duration = max(duration, vo_clip.duration)
+                    vo_layers.append(vo_clip.volumex(1.5).set_start(cursor))
+                except Exception as e:
+                    print(f"         ⚠️ Failed to load scene VO: {e}")
+            
+            spec['duration'] = duration
+            if is_image:
+                spec['zoom'] = self._ken_burns_zoom(duration)
+            else:
+                # Center trim, like the MoviePy path (short sources loop in the decoder)
+                source_duration = ffmpeg_parse_infos(asset_path).get('duration', 0)
+                if source_duration > duration:
+                    spec['start'] = (source_duration - duration) / 2
+            
+            print(f"      🎞️ Queued clip {i+1}: {os.path.basename(asset_path)} ({duration:.1f}s)")
+            segments.append(spec)
+            cursor += duration
+        
+        if not segments:
+            print("   ❌ No valid clips produced")
+            return None
+        
+        audio_layers, _ = self._mix_audio_layers(cursor, audio_path, sound_effects, voiceover_path)
+        audio_layers = vo_layers + audio_layers
+        mix_path = None
+        if audio_layers:
+            mix_path = os.path.join(self.output_dir, "_pipeline_mix.wav")
+            CompositeAudioClip(audio_layers).set_duration(cursor).write_audiofile(mix_path, fps=AUDIO_SAMPLE_RATE, logger=None)
+        
+        print(f"      💾 Exporting to {self.output_filename}...")
+        try:
+            return PipelinedRenderer().render(segments, self.output_path, audio_path=mix_path,
+                                              preset=self.render_preset or "medium")
+        finally:
+            if mix_path and os.path.exists(mix_path):
+                os.remove(mix_path)
+
+    def render_cutdowns(self, clips, segments, durations, audio_path=None, music_vol=0.6, tracker=None):
+        """
+        Render all social cutdowns in one batch from the normalized master clips.
+        Music is decoded once and trimmed with a fade for each cutdown.
+        """
+        master_duration = sum(seg['duration'] for seg in segments)
+        targets = sorted(d for d in durations if d < master_duration)
+        if not targets:
+            print("      ⚠️ No cutdowns shorter than the master timeline")
+            return []
+        
+        print(f"      📱 Rendering {len(targets)} social cutdowns: {', '.join(f'{d}s' for d in targets)}")
+        
+        music = None
+        if audio_path and os.path.exists(audio_path):
+            try:
+                music = self.audio_cache.audio_clip(audio_path)
+            except Exception as e:
+                print(f"         ⚠️ Cutdown music failed: {e}")
+        
+        base_name = os.path.splitext(self.output_filename)[0]
+        outputs = []
+        for target in targets:
+            plan = self._plan_cutdown(segments, target)
+            if not plan:
+                continue
+            
+            pieces = []
+            for idx, start, length in plan:
+                piece = clips[idx].subclip(start, start + length)
+                # Keep scene VO only when the whole shot survives (no clipped sentences)
+                if length < segments[idx]['duration'] - 0.05:
+                    piece = piece.without_audio()
+                pieces.append(piece)
+            
+            cut = concatenate_videoclips(pieces, method="chain")
+            
+            audio_layers = [cut.audio] if cut.audio else []
+            if music:
+                trimmed = music.subclip(0, min(music.duration, cut.duration)).volumex(music_vol)
+                fade = min(1.0, cut.duration / 4)
+                audio_layers.append(trimmed.audio_fadein(fade / 2).audio_fadeout(fade))
+            if audio_layers:
+                cut = cut.set_audio(CompositeAudioClip(audio_layers))
+            
+            cut_path = os.path.join(self.output_dir, f"{base_name}_{target}s.mp4")
+            print(f"         💾 {target}s cutdown: {len(plan)} shots -> {os.path.basename(cut_path)}")
+            try:
+                cut.write_videofile(
+                    cut_path,
+                    fps=FPS,
+                    codec='libx264',
+                    audio_codec='aac',
+                    preset=self.render_preset or "medium",
+                    threads=4,
+                    logger=None
+                )
+                outputs.append(cut_path)
+                if tracker:
+                    tracker.log_decision(
+                        "Editor", "cutdown", f"{target}s cutdown",
+                        f"Shots {[segments[idx]['scene_index'] + 1 for idx, _, _ in plan]}"
+                    )
+            except Exception as e:
+                print(f"         ❌ Cutdown {target}s failed: {e}")
+            finally:
+                cut.close()
+        
+        if music:
+            music.close()
+        return outputs
+
+    def _plan_cutdown(self, segments, target):
+        """
+        Pick shots for a cutdown using purpose and pacing.
+        Returns [(segment_index, start, length)] in timeline order.
+        """
+        last = len(segments) - 1
+        candidates = []
+        for idx, seg in enumerate(segments):
+            purpose = str(seg.get('purpose', '')).lower()
+            pacing = str(seg.get('pacing', '')).lower()
+            min_len = min(CUTDOWN_MIN_SHOT.get(pacing, 1.5), seg['duration'])
+            
+            score = 1.0
+            if any(kw in purpose for kw in CUTDOWN_KEY_PURPOSES):
+                score += 2.0
+            if idx == 0 or idx == last:
+                score += 1.0  # Hook and end card carry the spot
+            if pacing == "fast":
+                score += 0.5  # Fast shots survive tight trims
+            candidates.append((score, -min_len, idx, min_len))
+        
+        # Greedy: highest score first, as long as the minimum lengths fit
+        chosen = {}
+        used = 0.0
+        for score, _, idx, min_len in sorted(candidates, reverse=True):
+            if used + min_len <= target:
+                chosen[idx] = min_len
+                used += min_len
+        if not chosen:
+            return []
+        
+        # Spread remaining time proportionally to each shot's spare length
+        spare = target - used
+        capacity = {idx: segments[idx]['duration'] - length for idx, length in chosen.items()}
+        total_capacity = sum(capacity.values())
+        if spare > 0 and total_capacity > 0:
+            for idx in chosen:
+                chosen[idx] += min(capacity[idx], spare * capacity[idx] / total_capacity)
+        
+        plan = []
+        for idx in sorted(chosen):
+            length = chosen[idx]
+            duration = segments[idx]['duration']
+            if idx == 0:
+                start = 0  # Hook opens on its first frame
+            elif idx == last:
+                start = duration - length  # End card keeps its final frame
+            else:
+                start = (duration - length) / 2
+            plan.append((idx, start, length))
+        return plan
+
     def _resize_to_1080p(self, clip):
         """Standardize clip to 1920x1080 with proper cropping/resizing"""
         target_w, target_h = 1920, 1080
@@ -250,58 +529,23 @@ class EditorAgent:
 
     def _apply_ken_burns(self, clip, duration):
         """Apply cinematic slow zoom/pan effect"""
-        # Randomly choose Zoom In or Zoom Out
-        zoom_direction = random.choice(['in', 'out'])
-        
-        def zoom_in(t):
-            return 1 + 0.1 * (t / duration)  # 1.0 -> 1.1
-            
-        def zoom_out(t):
-            return 1.1 - 0.1 * (t / duration) # 1.1 -> 1.0
-            
-        zoom_func = zoom_in if zoom_direction == 'in' else zoom_out
-        
         # Apply Resize
-        return clip.resize(zoom_func)
+        return clip.resize(self._ken_burns_zoom(duration))
+
+    def _ken_burns_zoom(self, duration):
+        """Randomly choose Zoom In or Zoom Out; returns t -> zoom factor"""
+        return KenBurns(duration, random.choice(['in', 'out']))
 
     def _create_text_overlay(self, text, duration):
         """Create a text overlay using PIL (No ImageMagick required)"""
-        from PIL import Image, ImageDraw, ImageFont
-        import numpy as np
-        
-        w, h = 1920, 1080
-        # Create transparent image
-        img = Image.new('RGBA', (w, h), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # Font (fallback to default if not found)
-        try:
-            # Try to load a bold font
-            font = ImageFont.truetype("arialbd.ttf", 80)
-        except:
-            font = ImageFont.load_default()
-            
-        # text size
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_w = bbox[2] - bbox[0]
-        text_h = bbox[3] - bbox[1]
-        
-        # Position (Bottom Center with margin)
-        x = (w - text_w) // 2
-        y = h - text_h - 150
-        
-        # Draw Shadow
-        draw.text((x+4, y+4), text, font=font, fill=(0, 0, 0, 180))
-        # Draw Text
-        draw.text((x, y), text, font=font, fill=(255, 255, 255, 255))
-        
-        # Convert to numpy
-        img_np = np.array(img)
-        
         # Create ImageClip
-        txt_clip = ImageClip(img_np).set_duration(duration)
+        txt_clip = ImageClip(self._render_text_rgba(text)).set_duration(duration)
         return txt_clip
 
+    def _render_text_rgba(self, text):
+        """Render headline text to a 1920x1080 RGBA numpy array"""
+        return render_text_overlay(text, (1920, 1080))
+
     def _apply_text_overlay(self, clip, text, duration):
         """Composite text over video"""
         if not text or len(text) < 2:
@@ -0,0 +1,249 @@
+"""
+Frame Engine - Fused per-frame processing for the Editor
+Replaces chained MoviePy effects (resize, crop, colorx, blackwhite, text composite)
+with ONE kernel per clip that writes into preallocated uint8 buffers:
+- Cover-fit resize, center crop and Ken Burns zoom collapse into a single ROI resize
+- Black & white + contrast gain collapse into a single color transform
+- Text overlays blend only inside their bounding box with integer math
+- Operations that are identity for the clip are skipped entirely
+"""
+import numpy as np
+try:
+    import cv2  # opencv-python: resize/transform straight into our buffers
+except ImportError:
+    cv2 = None
+
+from config import RESOLUTION
+
+
+class KenBurns:
+    """Slow zoom in (1.0 -> 1.1) or out (1.1 -> 1.0); picklable for render workers"""
+    def __init__(self, duration, direction='in'):
+        self.duration = max(duration, 1e-3)
+        self.direction = direction
+
+    def __call__(self, t):
+        if self.direction == 'in':
+            return 1 + 0.1 * (t / self.duration)
+        return 1.1 - 0.1 * (t / self.duration)
+
+
+def render_text_overlay(text, size=RESOLUTION):
+    """Render headline text to an RGBA numpy array using PIL (No ImageMagick required)"""
+    from PIL import Image, ImageDraw, ImageFont
+    
+    w, h = size
+    # Create transparent image
+    img = Image.new('RGBA', (w, h), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    
+    # Font (fallback to default if not found)
+    try:
+        # Try to load a bold font
+        font = ImageFont.truetype("arialbd.ttf", 80)
+    except:
+        font = ImageFont.load_default()
+        
+    # text size
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_w = bbox[2] - bbox[0]
+    text_h = bbox[3] - bbox[1]
+    
+    # Position (Bottom Center with margin)
+    x = (w - text_w) // 2
+    y = h - text_h - 150
+    
+    # Draw Shadow
+    draw.text((x+4, y+4), text, font=font, fill=(0, 0, 0, 180))
+    # Draw Text
+    draw.text((x, y), text, font=font, fill=(255, 255, 255, 255))
+    
+    # Convert to numpy
+    return np.array(img)
+
+
+class FrameKernel:
+    """
+    Compiled effect chain for one clip.
+    Call it with a source frame and time; returns a preallocated output frame.
+    """
+    def __init__(self, src_size, target_size=RESOLUTION, zoom=None, gray=False, gain=1.0, overlay=None):
+        self.src_w, self.src_h = src_size
+        self.dst_w, self.dst_h = target_size
+        self.zoom = zoom
+
+        # Cover-fit: scale so the frame fills the target, crop the overflow (center)
+        self.base_scale = max(self.dst_w / self.src_w, self.dst_h / self.src_h)
+        self.static_roi = None if zoom else self._roi(1.0)
+        self.needs_resize = bool(zoom) or self.static_roi != (0, 0, self.src_w, self.src_h) \
+            or (self.src_w, self.src_h) != (self.dst_w, self.dst_h)
+
+        # Color: blackwhite (equal RGB weights, like vfx.blackwhite) then colorx gain
+        self.gray = gray
+        self.gain = gain
+        self.needs_color = gray or abs(gain - 1.0) > 1e-3
+        if cv2 is not None:
+            base = np.full((3, 3), 1 / 3, dtype=np.float32) if gray else np.eye(3, dtype=np.float32)
+            self.color_matrix = base * np.float32(gain)
+        self.gain_q8 = int(round(gain * 256))  # Fixed-point gain for the NumPy path
+
+        # Double-buffered outputs so a consumer holding the previous frame stays valid
+        shape = (self.dst_h, self.dst_w, 3)
+        self.outputs = [np.empty(shape, dtype=np.uint8), np.empty(shape, dtype=np.uint8)]
+        self.scratch = np.empty(shape, dtype=np.uint8)
+        self.turn = 0
+
+        # NumPy fallback scratch: row-gathered frame and luma accumulator
+        if cv2 is None:
+            self.row_scratch = None
+            self.luma = np.empty((self.dst_h, self.dst_w), dtype=np.uint16)
+            self.acc = np.empty(shape, dtype=np.uint32)
+            self.static_maps = self._index_maps(self.static_roi) if self.static_roi else None
+
+        self.overlay = None
+        if overlay is not None:
+            self._prepare_overlay(overlay)
+
+    def _roi(self, zoom):
+        """Source rectangle (x, y, w, h) that maps onto the full target frame"""
+        scale = self.base_scale * zoom
+        w = min(self.src_w, max(1, int(round(self.dst_w / scale))))
+        h = min(self.src_h, max(1, int(round(self.dst_h / scale))))
+        x = (self.src_w - w) // 2
+        y = (self.src_h - h) // 2
+        return (x, y, w, h)
+
+    def _index_maps(self, roi):
+        """Nearest-neighbour row/column indices for the NumPy fallback"""
+        x, y, w, h = roi
+        rows = (y + (np.arange(self.dst_h) * h) // self.dst_h).astype(np.intp)
+        cols = (x + (np.arange(self.dst_w) * w) // self.dst_w).astype(np.intp)
+        return rows, cols
+
+    def _prepare_overlay(self, rgba):
+        """Precompute the overlay's bounding box and premultiplied colors"""
+        alpha = rgba[:, :, 3]
+        ys, xs = np.nonzero(alpha)
+        if len(ys) == 0:
+            return
+        y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+        a = alpha[y0:y1, x0:x1].astype(np.uint16)[:, :, None]
+        self.overlay = {
+            "box": (slice(y0, y1), slice(x0, x1)),
+            "premul": rgba[y0:y1, x0:x1, :3].astype(np.uint16) * a + 127,
+            "inv_alpha": (255 - a).astype(np.uint16),
+            "acc": np.empty((y1 - y0, x1 - x0, 3), dtype=np.uint16)
+        }
+
+    def __call__(self, frame, t=0, out=None):
+        """
+        Process one frame. Pass `out` to write into a caller-owned buffer
+        (it may be `frame` itself when no resize is needed).
+        """
+        if frame.dtype != np.uint8:
+            frame = frame.astype(np.uint8)
+        if frame.shape[2] > 3:
+            frame = frame[:, :, :3]
+
+        if out is None:
+            out = self.outputs[self.turn]
+            self.turn ^= 1
+
+        # 1. Geometry (crop + resize + zoom in one pass)
+        if self.needs_resize:
+            roi = self._roi(self.zoom(t)) if self.zoom else self.static_roi
+            self._resample(frame, roi, self.scratch if self.needs_color else out)
+            src = self.scratch if self.needs_color else out
+        else:
+            src = frame
+
+        # 2. Color (gray + gain in one transform)
+        if self.needs_color:
+            self._grade(src, out)
+        elif src is not out:
+            np.copyto(out, src)
+
+        # 3. Text overlay (bounding box only)
+        if self.overlay:
+            self._blend_overlay(out)
+        return out
+
+    def _resample(self, frame, roi, dst):
+        x, y, w, h = roi
+        view = frame[y:y + h, x:x + w]
+        if cv2 is not None:
+            interp = cv2.INTER_AREA if w > self.dst_w else cv2.INTER_LINEAR
+            cv2.resize(view, (self.dst_w, self.dst_h), dst=dst, interpolation=interp)
+            return
+        rows, cols = self.static_maps if not self.zoom else self._index_maps(roi)
+        row_shape = (self.dst_h, frame.shape[1], 3)
+        if self.row_scratch is None or self.row_scratch.shape != row_shape:
+            self.row_scratch = np.empty(row_shape, dtype=np.uint8)
+        np.take(frame, rows, axis=0, out=self.row_scratch, mode='clip')
+        np.take(self.row_scratch, cols, axis=1, out=dst, mode='clip')
+
+    def _grade(self, src, dst):
+        if cv2 is not None:
+            cv2.transform(src, self.color_matrix, dst=dst)
+            return
+        if self.gray:
+            np.add(src[:, :, 0], src[:, :, 1], out=self.luma, dtype=np.uint16)
+            np.add(self.luma, src[:, :, 2], out=self.luma)
+            np.floor_divide(self.luma, 3, out=self.luma)
+            for c in range(3):
+                np.copyto(dst[:, :, c], self.luma, casting='unsafe')
+            src = dst
+            if abs(self.gain - 1.0) <= 1e-3:
+                return
+        np.multiply(src, self.gain_q8, out=self.acc, dtype=np.uint32)
+        np.right_shift(self.acc, 8, out=self.acc)
+        np.minimum(self.acc, 255, out=self.acc)
+        np.copyto(dst, self.acc, casting='unsafe')
+
+    def _blend_overlay(self, out):
+        ov = self.overlay
+        region = out[ov["box"]]
+        acc = ov["acc"]
+        np.multiply(region, ov["inv_alpha"], out=acc)
+        np.add(acc, ov["premul"], out=acc)
+        np.floor_divide(acc, 255, out=acc)
+        np.copyto(region, acc, casting='unsafe')
+
+
+class FrameEngine:
+    """
+    Builds fused kernels and attaches them to MoviePy clips.
+    Used by EditorAgent as an alternative to chained vfx calls.
+    """
+    def __init__(self, target_size=RESOLUTION):
+        self.target_size = target_size
+        if cv2 is None:
+            print("   ⚠️ Frame Engine: OpenCV not installed, using NumPy nearest-neighbour resampling")
+
+    @staticmethod
+    def style_grade(style):
+        """Map a production style to (gray, gain), mirroring the Editor's vfx grading"""
+        style = (style or '').lower()
+        if "noir" in style or "black and white" in style:
+            return True, 1.2
+        if "cyberpunk" in style or "matrix" in style:
+            return False, 1.2
+        if "vintage" in style or "warm" in style:
+            return False, 1.1
+        return False, 1.0
+
+    def apply(self, clip, zoom=None, style=None, overlay=None):
+        """
+        Replace the clip's frames with the fused kernel output.
+
+        Args:
+            clip: Source MoviePy clip (any size)
+            zoom: Optional t -> zoom factor (Ken Burns), 1.0 = cover-fit
+            style: Production style for grading
+            overlay: Optional RGBA numpy array at target size (text)
+        """
+        gray, gain = FrameEngine.style_grade(style)
+        kernel = FrameKernel(clip.size, self.target_size, zoom=zoom, gray=gray, gain=gain, overlay=overlay)
+        fused = clip.fl(lambda gf, t: kernel(gf(t), t), apply_to=[])
+        # Opaque full-frame output: the source mask no longer matches the new size
+        return fused.set_mask(None)
@@ -0,0 +1,79 @@
+"""
+Generation Pipeline - Submit every GENERATE job up front, collect as they finish
+As soon as the visuals are locked, each GENERATE scene's keyframe and video jobs are
+queued on ComfyUI (interleaved in timeline order), so the GPU works through the whole
+backlog while the studio records voiceovers, sources stock and retrieves finished clips.
+Results are collected in the background as jobs complete and handed out per scene,
+so the asset loop still builds the timeline in order.
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import COMFYUI_COLLECT_WORKERS
+
+
+class GenerationPipeline:
+    def __init__(self, art_dept, production, workers=COMFYUI_COLLECT_WORKERS):
+        self.art_dept = art_dept
+        self.production = production
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="comfy-collect")
+        self.jobs = {}  # scene index -> future of (keyframe_path, video_path)
+        self.lock = threading.Lock()
+        self.stats = {"submitted": 0, "keyframes": 0, "videos": 0, "failed": 0,
+                      "submit_s": 0.0, "first_result_s": None, "last_result_s": None}
+        self.started = None
+
+    def submit(self, scenes):
+        """Queue keyframe + video for every GENERATE scene. Returns the scene indices queued."""
+        if not self.art_dept.comfy.connected:
+            return []
+        self.started = time.time()
+        for i, scene in enumerate(scenes):
+            if scene.get('source_type', 'GENERATE') != "GENERATE":
+                continue
+            keyframe_id = self.art_dept.submit_keyframe(scene)
+            # The video workflow is text-to-video, so it does not wait on the keyframe
+            video_id = self.production.submit_scene(scene)
+            if not (keyframe_id or video_id):
+                continue
+            self.jobs[i] = self.pool.submit(self._collect, keyframe_id, video_id)
+            self.stats["submitted"] += 1
+        self.stats["submit_s"] = round(time.time() - self.started, 2)
+        if self.jobs:
+            print(f"   🚀 {len(self.jobs)} GENERATE scenes queued on ComfyUI ({self.stats['submit_s']}s)")
+        return sorted(self.jobs)
+
+    def _collect(self, keyframe_id, video_id):
+        keyframe = self.art_dept.collect_keyframe(keyframe_id) if keyframe_id else None
+        video = self.production.collect_scene(video_id) if video_id else None
+        with self.lock:
+            self.stats["keyframes"] += bool(keyframe)
+            self.stats["videos"] += bool(video)
+            self.stats["failed"] += not (keyframe or video)
+            done = round(time.time() - self.started, 2)
+            if self.stats["first_result_s"] is None:
+                self.stats["first_result_s"] = done
+            self.stats["last_result_s"] = done
+        return keyframe, video
+
+    def has(self, index):
+        return index in self.jobs
+
+    def result(self, index):
+        """(keyframe_path, video_path) for a queued scene, blocking until it is ready"""
+        future = self.jobs.get(index)
+        if future is None:
+            return None, None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"      ⚠️ Generated scene {index+1} failed: {e}")
+            return None, None
+
+    def report(self):
+        with self.lock:
+            return dict(self.stats)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
@@ -6,6 +6,11 @@ import json
 import time
 import requests
 from datetime import datetime
+from config import RETRIEVAL_MAX_EXAMPLES, KNOWLEDGE_MAX_ENTRIES
+from agents.brief_index import BriefIndex
+
+# Scene fields worth keeping for reuse (no per-run file paths)
+REUSABLE_SCENE_FIELDS = ("visual_prompt", "duration", "source_type", "voiceover", "text_overlay", "purpose", "pacing")
 
 class IntelligenceAgent:
     """
@@ -14,6 +19,7 @@ class IntelligenceAgent:
     def __init__(self):
         self.knowledge_base = self._load_knowledge()
         self.network_status = self._detect_network()
+        self._brief_index = None  # Built on first lookup, reset when knowledge changes
         
     def _load_knowledge(self):
         """Load learned patterns and preferences."""
@@ -191,9 +197,10 @@ class IntelligenceAgent:
                     print(f"   ❌ Failed after {max_attempts} attempts")
         return None
     
-    def learn_from_generation(self, prompt, script, success, assets_count):
+    def learn_from_generation(self, prompt, script, success, assets_count, plan=None):
         """
         Learn from each generation to improve future results.
+        Successful runs keep their accepted plan and script for similar future briefs.
         """
         entry = {
             "timestamp": datetime.now().isoformat(),
@@ -204,13 +211,22 @@ class IntelligenceAgent:
         }
         
         if success:
+            if plan:
+                entry["plan"] = {k: v for k, v in plan.items() if k != 'delegations'}
+            entry["script"] = {"scenes": [
+                {k: scene[k] for k in REUSABLE_SCENE_FIELDS if k in scene}
+                for scene in script.get('scenes', []) if isinstance(scene, dict)
+            ]}
             self.knowledge_base["successful_prompts"].append(entry)
+            self._brief_index = None
             # Update best practices
             if assets_count > 0:
                 avg = self.knowledge_base.get("avg_scene_count", 5)
                 self.knowledge_base["avg_scene_count"] = (avg + len(script.get('scenes', []))) / 2
         else:
             self.knowledge_base["failed_prompts"].append(entry)
+        for key in ("successful_prompts", "failed_prompts"):
+            self.knowledge_base[key] = self.knowledge_base[key][-KNOWLEDGE_MAX_ENTRIES:]
         
         # Save knowledge
         self._save_knowledge()
@@ -221,6 +237,19 @@ class IntelligenceAgent:
         with open(kb_path, 'w') as f:
             json.dump(self.knowledge_base, f, indent=2)
     
+    def similar_briefs(self, brief, k=RETRIEVAL_MAX_EXAMPLES, min_score=0.0):
+        """
+        Past successful briefs most similar to this one (TF-IDF cosine), best first.
+        Returns [{"score", "prompt", "plan", "script"}]; only entries with a stored plan or script.
+        """
+        if self._brief_index is None:
+            reusable = [e for e in self.knowledge_base.get("successful_prompts", []) if e.get("plan") or e.get("script")]
+            self._brief_index = BriefIndex(reusable)
+        return [
+            {"score": round(score, 3), "prompt": entry["prompt"], "plan": entry.get("plan"), "script": entry.get("script")}
+            for score, entry in self._brief_index.search(brief, k=k, min_score=min_score)
+        ]
+
     def get_smart_recommendations(self, user_prompt):
         """
         Provide intelligent suggestions based on learned patterns.
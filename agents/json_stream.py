@@ -0,0 +1,91 @@
+"""
+JSON Stream - Incremental parser for streamed LLM JSON
+Yields each element of a top-level array (e.g. "scenes") the moment its closing
+brace arrives, so downstream work on scene 1 starts while scene 6 is still being written.
+Tolerates markdown fences and chatter around the JSON; the caller still parses the
+full text at the end for the authoritative result.
+"""
+import json
+
+
+class JsonArrayStream:
+    """
+    Feed text chunks; get back newly completed items of `root[key]`.
+
+        stream = JsonArrayStream("scenes")
+        for chunk in deltas:
+            for index, item in stream.feed(chunk):
+                ...
+    """
+    def __init__(self, key="scenes"):
+        self.key = key
+        self.text = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.last_string = None
+        self.current_key = None
+        self.array_depth = None
+        self.item_start = None
+        self.items = []
+
+    def feed(self, chunk):
+        """Consume a chunk; returns [(index, item), ...] completed by it"""
+        self.text += chunk
+        completed = []
+        text = self.text
+        for i in range(self.pos, len(text)):
+            ch = text[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    self.last_string = text[self.string_start:i + 1]
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                self.string_start = i
+            elif ch == ':':
+                # Only keys of the root object matter
+                if self.depth == 1 and self.last_string is not None:
+                    try:
+                        self.current_key = json.loads(self.last_string)
+                    except ValueError:
+                        self.current_key = None
+            elif ch == ',':
+                if self.depth == 1:
+                    self.current_key = None
+            elif ch in '{[':
+                self.depth += 1
+                if ch == '[' and self.array_depth is None and self.depth == 2 and self.current_key == self.key:
+                    self.array_depth = self.depth
+                elif ch == '{' and self.array_depth is not None and self.depth == self.array_depth + 1:
+                    self.item_start = i
+            elif ch in '}]':
+                if ch == '}' and self.item_start is not None and self.depth == self.array_depth + 1:
+                    item = self._parse(text[self.item_start:i + 1])
+                    self.item_start = None
+                    if item is not None:
+                        completed.append((len(self.items), item))
+                        self.items.append(item)
+                elif ch == ']' and self.array_depth is not None and self.depth == self.array_depth:
+                    self.array_depth = -1  # Array closed: ignore any later arrays with the same key
+                self.depth = max(0, self.depth - 1)
+            if not ch.isspace() and ch != '"':
+                self.last_string = None  # A key is only a string directly followed by ':'
+        self.pos = len(text)
+        return completed
+
+    @staticmethod
+    def _parse(fragment):
+        try:
+            item = json.loads(fragment)
+        except ValueError:
+            return None
+        return item if isinstance(item, dict) else None
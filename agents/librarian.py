@@ -2,12 +2,14 @@ import os
 import requests
 import random
 from config import PEXELS_API_KEY, ASSETS_DIR
+from agents.singleflight import singleflight, atomic_download
 
 class LibrarianAgent:
     def __init__(self):
         self.api_key = PEXELS_API_KEY
         self.headers = {"Authorization": self.api_key}
         
+    @singleflight("pexels")
     def find_stock_footage(self, query):
         """
         Searches Pexels for 4K video matching the query.
@@ -35,11 +37,7 @@ class LibrarianAgent:
                 if not os.path.exists(save_path):
                     print(f"   ⬇️ Downloading stock footage...")
                     try:
-                        with requests.get(download_url, stream=True, verify=False, timeout=30) as r:
-                            r.raise_for_status()
-                            with open(save_path, 'wb') as f:
-                                for chunk in r.iter_content(chunk_size=8192):
-                                    f.write(chunk)
+                        atomic_download(download_url, save_path, verify=False, timeout=30)
                     except Exception as e:
                         print(f"      ❌ Download Error: {e}")
                         return None
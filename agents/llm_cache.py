@@ -0,0 +1,128 @@
+"""
+LLM Cache - Opt-in disk cache for LLM responses
+Re-running a brief (or a GUI retry) re-asks the same prompts; this answers them from disk.
+- Key: (provider, model, system, user, temperature, json_mode)
+- SQLite file, LRU eviction under a size cap, TTL expiry
+- Only successfully parsed results are stored (never errors or unparseable JSON)
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from config import LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_MAX_MB, LLM_CACHE_TTL_HOURS
+
+
+class LLMCache:
+    def __init__(self, path=LLM_CACHE_PATH, max_mb=LLM_CACHE_MAX_MB, ttl_hours=LLM_CACHE_TTL_HOURS):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl = ttl_hours * 3600 if ttl_hours else None
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses(accessed)")
+        self.db.commit()
+
+    @staticmethod
+    def make_key(provider, model, system_prompt, user_prompt, temperature, json_mode):
+        raw = json.dumps([provider, model, system_prompt, user_prompt, round(float(temperature), 3), bool(json_mode)])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Cached result or None (expired entries count as misses)"""
+        now = time.time()
+        with self.lock:
+            row = self.db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl and now - row[1] > self.ttl:
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.db.commit()
+                row = None
+            if not row:
+                self.stats["misses"] += 1
+                return None
+            self.db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.db.commit()
+            self.stats["hits"] += 1
+        return json.loads(row[0])
+
+    def get_any(self, keys):
+        """First cached result among several candidate keys (one hit or one miss)"""
+        for key in keys[:-1]:
+            with self.lock:
+                found = self.db.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            if found:
+                result = self.get(key)
+                if result is not None:
+                    return result
+        return self.get(keys[-1]) if keys else None
+
+    def put(self, key, result):
+        """Store a parsed result, then evict least-recently-used entries over the size cap"""
+        value = json.dumps(result)
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now)
+            )
+            self.stats["stores"] += 1
+            self._evict(now)
+            self.db.commit()
+
+    def _evict(self, now):
+        if self.ttl:
+            cur = self.db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self.stats["evictions"] += max(cur.rowcount, 0)
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY accessed ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.stats["evictions"] += 1
+
+    def report(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        with self.lock:
+            entries, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return dict(self.stats, enabled=True, entries=entries, size_kb=round(size / 1024, 1),
+                    hit_rate=round(self.stats["hits"] / lookups, 3) if lookups else 0.0)
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Process-wide LLMCache, or None when LLM_CACHE_ENABLED is off"""
+    global _shared_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMCache()
+        return _shared_cache
+
+
+def llm_cache_report():
+    """Hit/miss counters for the run report"""
+    cache = get_llm_cache()
+    return cache.report() if cache else {"enabled": False}
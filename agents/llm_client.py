@@ -1,6 +1,6 @@
 import os
+import copy
 import json
-import requests
 import time
 from config import (
     GROQ_API_KEY, 
@@ -8,18 +8,50 @@ from config import (
     OPENAI_API_KEY, 
     OLLAMA_BASE_URL, 
     OLLAMA_MODEL,
-    LLM_PROVIDER
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_USE_CHAT,
+    LLM_PROVIDER,
+    LLM_HEDGE_ENABLED
 )
+from agents.llm_transport import get_transport
+from agents.llm_cache import get_llm_cache
+from agents.json_stream import JsonArrayStream
+from agents.llm_router import get_router, HedgeCancelled
+from agents.provider_health import get_provider_health
+from agents.llm_schemas import validate, repair_json, fixup_prompt
+from agents.ollama_models import ollama_url
+from agents.llm_usage import get_usage_ledger, estimate_tokens
+from agents.singleflight import get_singleflight
+
+
+class JsonParseError(ValueError):
+    """LLM output that no parser could turn into JSON (keeps the raw text for a fix-up)"""
+    def __init__(self, message, text):
+        super().__init__(message)
+        self.text = text
+
 
 class LLMClient:
     """
     Centralized Client for all LLM interactions in Hollywood Studio.
     Supports: Ollama (Local), Groq, Anthropic, OpenAI.
     """
-    def __init__(self, provider=None):
+    def __init__(self, provider=None, agent=None):
         # Allow overriding provider, otherwise use config default
         self.provider = provider or os.getenv("LLM_PROVIDER", LLM_PROVIDER).lower()
+        # Calling agent, for per-agent token/latency accounting
+        self.agent = agent or "unknown"
         self.max_retries = 3
+        # Pooled keep-alive sessions + per-provider in-flight limits, shared process-wide
+        self.transport = get_transport()
+        # Opt-in disk cache of parsed responses (None when disabled)
+        self.cache = get_llm_cache()
+        # Latency-aware routing over LLM_MODELS, learned across all agents
+        self.router = get_router()
+        # Circuit breakers + adaptive timeouts, shared across agents
+        self.health = get_provider_health()
+        # Token/latency ledger shared by every agent
+        self.usage = get_usage_ledger()
         
         # Models Configuration
         self.models = {
@@ -38,83 +70,284 @@ class LLMClient:
             }
         }
     
-    def generate(self, system_prompt, user_prompt, temperature=0.7, json_mode=False, model=None):
+    def generate(self, system_prompt, user_prompt, temperature=0.7, json_mode=False, model=None,
+                 on_item=None, item_key="scenes", task=None, hedge=False, schema=None, cancel=None):
         """
         Generic generation method that handles provider differences.
         Returns: String (content) or Dict (if json_mode and parsed successfully)
+
+        on_item: optional callback(index, item). The response is streamed and every
+        completed element of the JSON array `item_key` is delivered as soon as it closes.
+        task: LLM_MODELS key (e.g. "super_director") selecting primary/fallback routes.
+        hedge: race a second route if the first runs past its p95 latency.
+        schema: JSON Schema (see llm_schemas) enforced natively where supported, else
+        validated after a tolerant parse; violations get one targeted fix-up request.
+        cancel: optional threading.Event; once set, the streaming call is aborted (freeing
+        the provider slot) and None is returned.
+        Identical concurrent requests (from any agent) share one provider call.
         """
-        # Auto-fallback to Ollama if keys are missing for cloud providers
-        if self.provider == "anthropic" and not ANTHROPIC_API_KEY:
-            print("⚠️ Claude API Key missing. Falling back to Ollama.")
-            self.provider = "ollama"
-        elif self.provider == "groq" and not GROQ_API_KEY:
-            print("⚠️ Groq API Key missing. Falling back to Ollama.")
-            self.provider = "ollama"
-        elif self.provider == "openai" and not OPENAI_API_KEY:
-             print("⚠️ OpenAI API Key missing. Falling back to Ollama.")
-             self.provider = "ollama"
-
-        print(f"🤖 AI Request [{self.provider.upper()}]...")
+        if cancel is not None:
+            # A caller that may abandon its call never shares it: cancelling must not fail the others
+            return self._generate(system_prompt, user_prompt, temperature, json_mode, model, on_item, item_key,
+                                  task, hedge, schema, cancel)
+        key = ("llm", self.provider, system_prompt, user_prompt, round(float(temperature), 3), bool(json_mode),
+               model, item_key, task, json.dumps(schema, sort_keys=True) if schema else None)
+        result, shared = get_singleflight().do(key, self._generate, system_prompt, user_prompt, temperature,
+                                               json_mode, model, on_item, item_key, task, hedge, schema)
+        # Callers mutate parsed results (scenes, plans): every caller gets its own copy
+        # and the shared original is never touched
+        if isinstance(result, (dict, list)):
+            result = copy.deepcopy(result)
+        if not shared:
+            return result
+        print(f"🤖 AI Request [{self.provider.upper()}] 🔗 joined an identical in-flight request")
+        if on_item and isinstance(result, dict):
+            for index, item in enumerate(result.get(item_key) or []):
+                on_item(index, item)
+        return result
+
+    def _generate(self, system_prompt, user_prompt, temperature, json_mode, model, on_item, item_key, task, hedge, schema,
+                  abandon=None):
+        """One generate() request: routing, cache, streaming, schema checks"""
+        # Skip routes without an API key or with an open circuit (self.provider is never changed)
+        routes = [r for r in self.router.routes(task, self.provider, model) if self._has_key(r.provider)]
+        if not self._has_key(self.provider):
+            print(f"⚠️ {self.provider} API key missing, using {routes[0].provider} for this request.")
+        healthy = [r for r in routes if self.health.available(r.provider)]
+        if not healthy:
+            print(f"❌ LLM Error: no healthy provider ({', '.join(sorted({r.provider for r in routes}))} circuits open)")
+            return None
+        routes = healthy
+
+        cache_keys = []
+        if self.cache:
+            # One key per candidate route: an answer from any of them is a valid replay
+            cache_keys = [self._cache_key(route, system_prompt, user_prompt, temperature, json_mode) for route in routes]
+            cached = self.cache.get_any(cache_keys)
+            if cached is not None:
+                print(f"🤖 AI Request [{routes[0].provider.upper()}] ⚡ cache hit")
+                # Served from disk: no provider quota or GPU time spent
+                self.usage.record(self.agent, routes[0].provider, self._model_name(routes[0]), 0, 0, 0.0, cache="hit")
+                if on_item and isinstance(cached, dict):
+                    for index, item in enumerate(cached.get(item_key) or []):
+                        on_item(index, item)
+                return cached
+
+        print(f"🤖 AI Request [{routes[0].provider.upper()}]{' (hedged)' if hedge else ''}...")
+
+        items = JsonArrayStream(item_key) if on_item else None
+        claimed = []  # Under hedging, only the first route to stream owns on_item
+
+        def call(route, cancel):
+            # cancel: this route lost a hedged race; abandon: the caller gave up on the request
+            if abandon is not None and abandon.is_set():
+                raise HedgeCancelled()
+            on_delta = None
+            if items or cancel or abandon:
+                def on_delta(text):
+                    if any(event is not None and event.is_set() for event in (cancel, abandon)):
+                        raise HedgeCancelled()
+                    if items:
+                        if not claimed:
+                            claimed.append(route)
+                        if claimed[0] == route:
+                            for index, item in items.feed(text):
+                                on_item(index, item)
+            try:
+                result = self._dispatch(route, system_prompt, user_prompt, temperature, json_mode, on_delta, schema,
+                                        cache="miss" if self.cache else None)
+            except JsonParseError as e:
+                if not schema:
+                    raise
+                return self._fix_up(route, schema, [f"$: not valid JSON ({e})"], e.text, None)
+            if schema and json_mode:
+                errors = validate(result, schema)
+                if errors:
+                    return self._fix_up(route, schema, errors, json.dumps(result, indent=2), result)
+            return result
 
         try:
-            if self.provider == "ollama":
-                return self._call_ollama(system_prompt, user_prompt, temperature, json_mode, model)
-            elif self.provider == "groq":
-                return self._call_open_ai_compat(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    GROQ_API_KEY,
-                    system_prompt, user_prompt, temperature, json_mode, 
-                    model or self.models['groq']['default']
-                )
-            elif self.provider == "openai":
-                return self._call_open_ai_compat(
-                    "https://api.openai.com/v1/chat/completions",
-                    OPENAI_API_KEY,
-                    system_prompt, user_prompt, temperature, json_mode,
-                    model or self.models['openai']['default']
-                )
-            elif self.provider == "anthropic":
-                return self._call_anthropic(system_prompt, user_prompt, temperature, json_mode, model)
-            else:
-                # Default fallback
-                return self._call_ollama(system_prompt, user_prompt, temperature, json_mode, model)
-                
+            route, result = self.router.execute(routes, call, hedge=hedge and LLM_HEDGE_ENABLED)
+        except HedgeCancelled:
+            return None  # Abandoned by the caller: nothing to report
         except Exception as e:
-            print(f"❌ LLM Error ({self.provider}): {e}")
-            if self.provider != "ollama":
-                print("🔄 Attempting Fallback to Ollama...")
-                try:
-                    return self._call_ollama(system_prompt, user_prompt, temperature, json_mode, model)
-                except Exception as e2:
-                    print(f"❌ Fallback Failed: {e2}")
+            print(f"❌ LLM Error (all routes): {e}")
             return None
+        # Only successful, parsed (and schema-valid) results are worth replaying
+        valid = not json_mode or (isinstance(result, (dict, list)) and not (schema and validate(result, schema)))
+        if self.cache and result and valid:
+            self.cache.put(self._cache_key(route, system_prompt, user_prompt, temperature, json_mode), result)
+        return result
 
-    def _call_ollama(self, system_prompt, user_prompt, temperature, json_mode, model):
-        """Call Local Ollama Instance"""
-        url = OLLAMA_BASE_URL
-        prompt_content = f"System: {system_prompt}\nUser: {user_prompt}"
-        
-        # Ollama JSON mode enforcement
-        format_param = "json" if json_mode else None
-        if json_mode and "JSON" not in prompt_content:
-             prompt_content += "\nRESPONSE MUST BE VALID JSON."
+    def _fix_up(self, route, schema, errors, content, fallback):
+        """
+        Targeted repair: send the validator's errors and the broken JSON back, instead
+        of regenerating from the original brief. Returns the best result available.
+        """
+        print(f"   🩹 Output failed schema check ({len(errors)} issues: {errors[0]}), requesting targeted fix...")
+        try:
+            fixed = self._dispatch(route, "You repair JSON documents. Output valid JSON only.",
+                                   fixup_prompt(errors, content), 0.2, True, None, schema,
+                                   cache="miss" if self.cache else None)
+        except ValueError as e:
+            fixed = None
+            print(f"   ⚠️ Fix-up returned unusable JSON: {e}")
+        if fixed is not None:
+            remaining = validate(fixed, schema)
+            if not remaining or fallback is None:
+                print(f"   ✅ Fix-up {'resolved all issues' if not remaining else 'partially applied'}")
+                return fixed
+            print(f"   ⚠️ Fix-up left {len(remaining)} issues, keeping original")
+        if fallback is None:
+            raise JsonParseError("unrepairable JSON output", content)
+        return fallback
+
+    def _has_key(self, provider):
+        return {"anthropic": ANTHROPIC_API_KEY, "groq": GROQ_API_KEY, "openai": OPENAI_API_KEY}.get(provider, True)
+
+    def _model_name(self, route):
+        return route.model or self.models.get(route.provider, self.models['ollama'])['default']
+
+    def _cache_key(self, route, system_prompt, user_prompt, temperature, json_mode):
+        return self.cache.make_key(route.provider, self._model_name(route), system_prompt, user_prompt, temperature, json_mode)
+
+    def _dispatch(self, route, system_prompt, user_prompt, temperature, json_mode, on_delta=None, schema=None, cache=None):
+        """Send one request over a route (streamed when on_delta is given) and record its usage"""
+        provider, model = route
+        breaker = self.health.breaker(provider)
+        breaker.acquire()
+        start = time.time()
+        # Filled by the provider call: token counts from the response, and ttft where known
+        usage = {}
+        streamed = []
+
+        def timed_delta(text):
+            if "ttft" not in usage:
+                usage["ttft"] = time.time() - start
+            streamed.append(text)
+            on_delta(text)
+
+        result, status = None, "ok"
+        try:
+            result = self._call_provider(provider, model, system_prompt, user_prompt, temperature,
+                                         json_mode, timed_delta if on_delta else None, breaker.timeout(), schema, usage)
+        except HedgeCancelled:
+            status = "cancelled"
+            breaker.release()
+            raise
+        except JsonParseError as e:
+            # Unparseable output is the model's fault, not the provider's: the call itself worked.
+            # Other decode errors (HTML/proxy page on a 200, malformed stream chunk) are provider failures.
+            result = getattr(e, 'text', None)
+            breaker.record_success(time.time() - start)
+            raise
+        except Exception as e:
+            status = "error"
+            breaker.record_failure(e)
+            raise
+        else:
+            breaker.record_success(time.time() - start)
+        finally:
+            if result is None and streamed:
+                result = "".join(streamed)
+            estimated = "completion_tokens" not in usage
+            self.usage.record(
+                self.agent, provider, self._model_name(route),
+                usage.get("prompt_tokens") or estimate_tokens(system_prompt + user_prompt),
+                usage.get("completion_tokens") if not estimated else estimate_tokens(result),
+                time.time() - start, ttft=usage.get("ttft"), cache=cache, status=status,
+                estimated=estimated or "prompt_tokens" not in usage
+            )
+        return result
+
+    def _call_provider(self, provider, model, system_prompt, user_prompt, temperature, json_mode, on_delta, timeout, schema=None, usage=None):
+        if json_mode and schema and provider in ("groq", "anthropic"):
+            # No native schema support here: describe it, then rely on repair + validation
+            system_prompt += f"\nThe JSON must follow this JSON Schema:\n{json.dumps(schema)}"
+        if provider == "groq":
+            return self._call_open_ai_compat(
+                "groq",
+                "https://api.groq.com/openai/v1/chat/completions",
+                GROQ_API_KEY,
+                system_prompt, user_prompt, temperature, json_mode, 
+                model or self.models['groq']['default'], on_delta, timeout, usage=usage
+            )
+        elif provider == "openai":
+            return self._call_open_ai_compat(
+                "openai",
+                "https://api.openai.com/v1/chat/completions",
+                OPENAI_API_KEY,
+                system_prompt, user_prompt, temperature, json_mode,
+                model or self.models['openai']['default'], on_delta, timeout, schema, usage
+            )
+        elif provider == "anthropic":
+            return self._call_anthropic(system_prompt, user_prompt, temperature, json_mode, model, on_delta, timeout, usage)
+        else:
+            return self._call_ollama(system_prompt, user_prompt, temperature, json_mode, model, on_delta, timeout, schema, usage)
+
+    async def agenerate(self, system_prompt, user_prompt, temperature=0.7, json_mode=False, model=None):
+        """Async generate: same pooled transport and provider limits as generate()"""
+        return await self.transport.run(self.generate, system_prompt, user_prompt, temperature, json_mode, model)
+
+    def _call_ollama(self, system_prompt, user_prompt, temperature, json_mode, model, on_delta=None, timeout=300, schema=None, usage=None):
+        """
+        Call Local Ollama Instance.
+        With OLLAMA_USE_CHAT the system prompt goes out as its own leading chat message, so
+        agents that repeat one system prompt (Cinematographer, per-scene stages) send a
+        byte-identical prefix and Ollama only evaluates the new user turn.
+        """
+        # Ollama JSON mode enforcement (a JSON Schema constrains decoding to that shape)
+        format_param = (schema or "json") if json_mode else None
+        if json_mode and "JSON" not in system_prompt + user_prompt:
+            # Appended to the user turn so the shared system prefix stays unchanged
+            user_prompt += "\nRESPONSE MUST BE VALID JSON."
 
         payload = {
             "model": model or self.models['ollama']['default'],
-            "prompt": prompt_content,
-            "stream": False,
+            "stream": bool(on_delta),
             "format": format_param,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
             "options": {
                 "temperature": temperature
             }
         }
+        if OLLAMA_USE_CHAT:
+            url = ollama_url("chat")
+            payload["messages"] = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+        else:
+            url = OLLAMA_BASE_URL
+            payload["prompt"] = f"System: {system_prompt}\nUser: {user_prompt}"
         print(f"   📤 Sending to Ollama (Model: {payload['model']})...")
         
         try:
-            response = requests.post(url, json=payload, timeout=300) # Increased timeout for slow local generation
+            if on_delta:
+                # NDJSON: one {"response": "..."} (generate) or {"message": {"content": "..."}} (chat) per line
+                with self.transport.stream("ollama", url, json=payload, timeout=timeout) as response:
+                    if response.status_code != 200:
+                        raise Exception(f"Ollama status {response.status_code}: {response.text}")
+                    parts = []
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        text = self._ollama_text(chunk)
+                        if text:
+                            parts.append(text)
+                            on_delta(text)
+                        if chunk.get('done'):
+                            self._ollama_usage(chunk, usage)
+                            break
+                content = "".join(parts)
+                return self._clean_and_parse_json(content) if json_mode else content
+
+            response = self.transport.post("ollama", url, json=payload, timeout=timeout) # Adaptive: slow local generation gets a long read timeout
             if response.status_code == 200:
                 res_json = response.json()
-                content = res_json.get('response', '')
+                self._ollama_usage(res_json, usage)
+                content = self._ollama_text(res_json)
                 if json_mode:
                     return self._clean_and_parse_json(content)
                 return content
@@ -126,7 +359,26 @@ class LLMClient:
             print(f"   ❌ Ollama Exception: {e}")
             raise e
 
-    def _call_open_ai_compat(self, url, key, system_prompt, user_prompt, temperature, json_mode, model):
+    @staticmethod
+    def _ollama_text(body):
+        """Generated text from an /api/generate or /api/chat response (or stream chunk)"""
+        if 'message' in body:
+            return (body.get('message') or {}).get('content', '')
+        return body.get('response', '')
+
+    @staticmethod
+    def _ollama_usage(body, usage):
+        """Token counts (and, for non-streamed calls, load + prompt eval time as ttft) from Ollama's final stats"""
+        if usage is None:
+            return
+        if 'prompt_eval_count' in body:
+            usage["prompt_tokens"] = body['prompt_eval_count']
+        if 'eval_count' in body:
+            usage["completion_tokens"] = body['eval_count']
+        if "ttft" not in usage and 'prompt_eval_duration' in body:
+            usage["ttft"] = (body.get('load_duration', 0) + body['prompt_eval_duration']) / 1e9
+
+    def _call_open_ai_compat(self, provider, url, key, system_prompt, user_prompt, temperature, json_mode, model, on_delta=None, timeout=60, schema=None, usage=None):
         """Generic OpenAI-Compatible API Call (Groq, OpenAI)"""
         headers = {
             "Authorization": f"Bearer {key}",
@@ -143,20 +395,53 @@ class LLMClient:
             "max_tokens": 4000
         }
         
-        if json_mode:
+        if json_mode and schema and provider == "openai":
+             payload["response_format"] = {
+                 "type": "json_schema",
+                 "json_schema": {"name": "studio_output", "schema": schema, "strict": False}
+             }
+        elif json_mode:
              payload["response_format"] = {"type": "json_object"}
         
-        response = requests.post(url, headers=headers, json=payload, verify=False, timeout=60)
+        if on_delta:
+            payload["stream"] = True
+            if provider == "openai":
+                payload["stream_options"] = {"include_usage": True}
+            with self.transport.stream(provider, url, headers=headers, json=payload, verify=False, timeout=timeout) as response:
+                if response.status_code != 200:
+                    raise Exception(f"API status {response.status_code}: {response.text}")
+                parts = []
+                for event in self._sse_events(response):
+                    # OpenAI sends usage on the last chunk; Groq under x_groq
+                    self._openai_usage(event.get('usage') or (event.get('x_groq') or {}).get('usage'), usage)
+                    choices = event.get('choices') or [{}]
+                    delta = choices[0].get('delta', {}).get('content')
+                    if delta:
+                        parts.append(delta)
+                        on_delta(delta)
+            content = "".join(parts)
+            return self._clean_and_parse_json(content) if json_mode else content
+        
+        response = self.transport.post(provider, url, headers=headers, json=payload, verify=False, timeout=timeout)
         
         if response.status_code == 200:
-            content = response.json()['choices'][0]['message']['content']
+            res_json = response.json()
+            self._openai_usage(res_json.get('usage'), usage)
+            content = res_json['choices'][0]['message']['content']
             if json_mode:
                 return self._clean_and_parse_json(content)
             return content
         else:
             raise Exception(f"API status {response.status_code}: {response.text}")
 
-    def _call_anthropic(self, system_prompt, user_prompt, temperature, json_mode, model):
+    @staticmethod
+    def _openai_usage(reported, usage):
+        if usage is None or not reported:
+            return
+        usage["prompt_tokens"] = reported.get('prompt_tokens', 0)
+        usage["completion_tokens"] = reported.get('completion_tokens', 0)
+
+    def _call_anthropic(self, system_prompt, user_prompt, temperature, json_mode, model, on_delta=None, timeout=60, usage=None):
         """Call Anthropic API (Claude)"""
         url = "https://api.anthropic.com/v1/messages"
         headers = {
@@ -180,10 +465,37 @@ class LLMClient:
             "temperature": temperature
         }
         
-        response = requests.post(url, headers=headers, json=payload, timeout=60)
+        if on_delta:
+            payload["stream"] = True
+            with self.transport.stream("anthropic", url, headers=headers, json=payload, timeout=timeout) as response:
+                if response.status_code != 200:
+                    raise Exception(f"Anthropic status {response.status_code}: {response.text}")
+                parts = []
+                for event in self._sse_events(response):
+                    if event.get('type') == 'content_block_delta':
+                        delta = event.get('delta', {}).get('text')
+                        if delta:
+                            parts.append(delta)
+                            on_delta(delta)
+                    elif event.get('type') == 'message_start' and usage is not None:
+                        reported = event.get('message', {}).get('usage', {})
+                        usage["prompt_tokens"] = reported.get('input_tokens', 0)
+                        usage["completion_tokens"] = reported.get('output_tokens', 0)
+                    elif event.get('type') == 'message_delta' and usage is not None:
+                        # Cumulative output count for the message so far
+                        usage["completion_tokens"] = event.get('usage', {}).get('output_tokens', usage.get("completion_tokens", 0))
+                    elif event.get('type') == 'error':
+                        raise Exception(f"Anthropic stream error: {event.get('error')}")
+            content = "".join(parts)
+            return self._clean_and_parse_json(content) if json_mode else content
+        
+        response = self.transport.post("anthropic", url, headers=headers, json=payload, timeout=timeout)
         
         if response.status_code == 200:
             res_json = response.json()
+            if usage is not None and 'usage' in res_json:
+                usage["prompt_tokens"] = res_json['usage'].get('input_tokens', 0)
+                usage["completion_tokens"] = res_json['usage'].get('output_tokens', 0)
             content = res_json['content'][0]['text']
             if json_mode:
                 return self._clean_and_parse_json(content)
@@ -191,6 +503,17 @@ class LLMClient:
         else:
             raise Exception(f"Anthropic status {response.status_code}: {response.text}")
 
+    def _sse_events(self, response):
+        """Decode a Server-Sent Events body into JSON payloads"""
+        response.encoding = response.encoding or 'utf-8'
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                return
+            yield json.loads(data)
+
     def _clean_and_parse_json(self, text):
         """Helper to clean markdown JSON blocks"""
         print(f"   🐛 RAW LLM OUTPUT: {text[:200]}...") # Debug print
@@ -208,8 +531,15 @@ class LLMClient:
             cleaned = cleaned.strip()
             try:
                 return json.loads(cleaned)
-            except json.JSONDecodeError as e:
+            except json.JSONDecodeError:
+                pass
+            # Tolerant repair: chatter around the object, trailing commas, truncation
+            try:
+                repaired = repair_json(cleaned)
+                print("   🩹 Repaired malformed JSON output")
+                return repaired
+            except ValueError as e:
                 print(f"   ❌ JSON PARSE ERROR: {e}")
                 print(f"   ❌ OFFENDING CONTENT: {cleaned}")
-                raise e
+                raise JsonParseError(str(e), text)
 
@@ -0,0 +1,190 @@
+"""
+LLM Router - Latency-aware provider/model selection (driven by config.LLM_MODELS)
+- Every (provider, model) route keeps a latency window, EWMA latency and error rate
+- Requests go to the fastest healthy route first, with the rest as ordered failover
+- Latency-critical calls can hedge: after the primary's p95 a second route is started,
+  the first good answer wins and the loser's stream is cancelled
+"""
+import time
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config import LLM_MODELS, LLM_HEDGE_DEFAULT_DELAY, LLM_HEDGE_MIN_DELAY
+from agents.provider_health import CircuitOpen
+
+Route = namedtuple("Route", ["provider", "model"])
+
+# Assumed latency for routes with no history; later fallbacks rank behind earlier ones
+PRIOR_LATENCY = 5.0
+MIN_SAMPLES = 3
+
+
+class HedgeCancelled(Exception):
+    """Raised inside a hedged request that lost the race"""
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = deque(maxlen=50)
+        self.ewma = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+
+    def record(self, latency, ok):
+        self.calls += 1
+        self.error_rate = 0.8 * self.error_rate + (0.0 if ok else 0.2)
+        if ok:
+            self.latencies.append(latency)
+            self.ewma = latency if self.ewma is None else 0.7 * self.ewma + 0.3 * latency
+        else:
+            self.failures += 1
+
+    def p95(self):
+        if len(self.latencies) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+class LLMRouter:
+    def __init__(self, models=None):
+        self.models = LLM_MODELS if models is None else models
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+
+    def _stats(self, route):
+        with self.lock:
+            return self.stats.setdefault(route, RouteStats())
+
+    def routes(self, task, provider, model=None):
+        """
+        Candidate routes for a request, best first.
+        Uses LLM_MODELS[task] when defined, else the client's provider; Ollama is always
+        the last resort for cloud providers.
+        """
+        spec = self.models.get(task) if task else None
+        if spec and not model:
+            candidates = [Route(*spec['primary'])] + [Route(*r) for r in spec.get('fallback', [])]
+        else:
+            candidates = [Route(provider, model)]
+        if not any(r.provider == "ollama" for r in candidates):
+            candidates.append(Route("ollama", None))
+
+        def score(indexed):
+            position, route = indexed
+            stats = self._stats(route)
+            latency = stats.ewma if stats.ewma is not None else PRIOR_LATENCY * (1 + position)
+            return latency * (1 + 4 * stats.error_rate)
+
+        return [route for _, route in sorted(enumerate(candidates), key=score)]
+
+    def record(self, route, latency, ok):
+        self._stats(route).record(latency, ok)
+
+    def hedge_delay(self, route):
+        p95 = self._stats(route).p95()
+        return max(LLM_HEDGE_MIN_DELAY, p95) if p95 is not None else LLM_HEDGE_DEFAULT_DELAY
+
+    def execute(self, routes, call, hedge=False):
+        """
+        Run call(route, cancel_event) over the routes: ordered failover, or a hedged race.
+        Returns (route, result); raises the last error if every route fails.
+        """
+        if hedge and len(routes) > 1:
+            return self._execute_hedged(routes, call)
+        last_error = None
+        for route in routes:
+            try:
+                return route, self._timed(route, call, None)
+            except HedgeCancelled:
+                # The caller abandoned the request: no other route should take it up
+                raise
+            except Exception as e:
+                last_error = e
+                print(f"   ↪️ Route {route.provider}/{route.model or 'default'} failed: {e}")
+        raise last_error or Exception("No LLM routes available")
+
+    def _timed(self, route, call, cancel):
+        start = time.time()
+        try:
+            result = call(route, cancel)
+        except HedgeCancelled:
+            # Lost the race: its latency is at least this long
+            self.record(route, time.time() - start, True)
+            raise
+        except CircuitOpen:
+            # Refused before any request was sent: says nothing about the route's latency or errors
+            raise
+        except Exception:
+            self.record(route, time.time() - start, False)
+            raise
+        self.record(route, time.time() - start, True)
+        return result
+
+    def _execute_hedged(self, routes, call):
+        cancels = {}
+        futures = {}
+        remaining = list(routes)
+
+        def launch():
+            route = remaining.pop(0)
+            cancels[route] = threading.Event()
+            futures[self.pool.submit(self._timed, route, call, cancels[route])] = route
+
+        launch()
+        delay = self.hedge_delay(routes[0])
+        last_error = None
+        while futures:
+            done, _ = wait(list(futures), timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                # Primary is past its p95: race a second route
+                if remaining:
+                    print(f"   🏁 Hedging after {delay:.1f}s -> {remaining[0].provider}")
+                    launch()
+                delay = None
+                continue
+            for future in done:
+                route = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    print(f"   ↪️ Route {route.provider}/{route.model or 'default'} failed: {e}")
+                    if remaining and not futures:
+                        launch()
+                    continue
+                for other in futures.values():
+                    cancels[other].set()
+                return route, result
+        raise last_error or Exception("No LLM routes available")
+
+    def report(self):
+        """Per-route latency/error summary for the run report"""
+        with self.lock:
+            items = list(self.stats.items())
+        return {
+            f"{route.provider}/{route.model or 'default'}": {
+                "calls": s.calls,
+                "failures": s.failures,
+                "ewma_latency_s": round(s.ewma, 2) if s.ewma is not None else None,
+                "p95_latency_s": round(s.p95(), 2) if s.p95() is not None else None,
+                "error_rate": round(s.error_rate, 3)
+            }
+            for route, s in items
+        }
+
+
+_shared_router = None
+_shared_lock = threading.Lock()
+
+
+def get_router():
+    """Process-wide LLMRouter, so every agent learns from every call"""
+    global _shared_router
+    with _shared_lock:
+        if _shared_router is None:
+            _shared_router = LLMRouter()
+        return _shared_router
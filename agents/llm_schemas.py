@@ -0,0 +1,210 @@
+"""
+LLM Schemas - JSON Schemas for structured agent output, plus validation and repair
+- Schemas for the Screenwriter script (and plan-derived scene fill-in), SuperDirector plan and critiques (single and batched)
+- Sent to providers with structured output (Ollama `format`, OpenAI `json_schema`)
+- validate(): small JSON Schema subset (type, required, properties, items, enum, minItems)
+- repair_json(): tolerant parse for the rest (fences, chatter, trailing commas, truncation)
+"""
+import json
+
+SCRIPT_SCHEMA = {
+    "type": "object",
+    "required": ["scenes"],
+    "properties": {
+        "scenes": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["visual_prompt"],
+                "properties": {
+                    "visual_prompt": {"type": "string"},
+                    "text_overlay": {"type": "string"},
+                    "voiceover": {"type": "string"},
+                    "duration": {"type": "number"},
+                    "source_type": {"type": "string", "enum": ["STOCK", "GENERATE"]}
+                }
+            }
+        }
+    }
+}
+
+SCENE_FILL_SCHEMA = {
+    "type": "object",
+    "required": ["scenes"],
+    "properties": {
+        "scenes": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["index"],
+                "properties": {
+                    "index": {"type": "integer"},
+                    "voiceover": {"type": "string"},
+                    "text_overlay": {"type": "string"}
+                }
+            }
+        }
+    }
+}
+
+PLAN_SCHEMA = {
+    "type": "object",
+    "required": ["vision", "style", "shots"],
+    "properties": {
+        "vision": {"type": "string"},
+        "duration": {"type": "number"},
+        "style": {"type": "string"},
+        "shots": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["visual", "duration"],
+                "properties": {
+                    "number": {"type": "integer"},
+                    "duration": {"type": "number"},
+                    "visual": {"type": "string"},
+                    "purpose": {"type": "string"},
+                    "pacing": {"type": "string", "enum": ["slow", "medium", "fast"]},
+                    "technical": {"type": "string"},
+                    "source_type": {"type": "string", "enum": ["STOCK", "GENERATE"]}
+                }
+            }
+        }
+    }
+}
+
+CRITIQUE_SCHEMA = {
+    "type": "object",
+    "required": ["needs_revision", "reason", "feedback"],
+    "properties": {
+        "needs_revision": {"type": "boolean"},
+        "reason": {"type": "string"},
+        "feedback": {"type": "string"}
+    }
+}
+
+BATCH_CRITIQUE_SCHEMA = {
+    "type": "object",
+    "required": ["reviews"],
+    "properties": {
+        "reviews": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["index", "score", "feedback"],
+                "properties": {
+                    "index": {"type": "integer"},
+                    "score": {"type": "number"},
+                    "reason": {"type": "string"},
+                    "feedback": {"type": "string"}
+                }
+            }
+        }
+    }
+}
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "integer": int,
+    "number": (int, float),
+    "null": type(None),
+}
+
+
+def validate(data, schema, path="$"):
+    """Return a list of human-readable validation errors (empty when valid)"""
+    errors = []
+    expected = schema.get("type")
+    if expected:
+        kind = _TYPES[expected]
+        # bool is an int subclass in Python, but not a JSON number
+        if not isinstance(data, kind) or (expected in ("integer", "number") and isinstance(data, bool)):
+            return [f"{path}: expected {expected}, got {type(data).__name__}"]
+    if "enum" in schema and data not in schema["enum"]:
+        errors.append(f"{path}: {data!r} is not one of {schema['enum']}")
+    if isinstance(data, dict):
+        for key in schema.get("required", []):
+            if key not in data:
+                errors.append(f"{path}: missing required field '{key}'")
+        for key, sub in schema.get("properties", {}).items():
+            if key in data:
+                errors.extend(validate(data[key], sub, f"{path}.{key}"))
+    if isinstance(data, list):
+        if len(data) < schema.get("minItems", 0):
+            errors.append(f"{path}: needs at least {schema['minItems']} items")
+        if "items" in schema:
+            for i, item in enumerate(data):
+                errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+def repair_json(text):
+    """
+    Best-effort parse of almost-JSON. Handles markdown fences, prose around the
+    object, trailing commas and output cut off mid-stream. Raises ValueError if
+    nothing usable can be recovered.
+    """
+    start = min([i for i in (text.find('{'), text.find('[')) if i >= 0], default=-1)
+    if start < 0:
+        raise ValueError("No JSON object found")
+
+    out = []
+    stack = []
+    cuts = []  # (len(out), stack copy) at each top-level-safe comma, for truncation recovery
+    in_string = escape = False
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+        elif ch in '}]':
+            while out and (out[-1].isspace() or out[-1] == ','):
+                out.pop()  # Trailing comma before a closer
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                break  # Root closed: ignore anything after it
+            continue
+        elif ch == ',':
+            cuts.append((len(out), list(stack)))
+        out.append(ch)
+
+    if in_string:
+        out.append('"')
+    candidates = [("".join(out), stack)] + [("".join(out[:n]), s) for n, s in reversed(cuts)]
+    for body, open_stack in candidates:
+        body = body.rstrip().rstrip(',:').rstrip()
+        try:
+            return json.loads(body + "".join(reversed(open_stack)))
+        except ValueError:
+            continue
+    raise ValueError("Could not repair JSON")
+
+
+def fixup_prompt(errors, content):
+    """Targeted repair request: show the validator's complaints, not the whole brief again"""
+    listed = "\n".join(f"- {e}" for e in errors[:20])
+    return f"""This JSON does not match the required schema:
+{listed}
+
+JSON:
+{content}
+
+Fix ONLY these problems, keep everything else unchanged, and return the corrected JSON."""
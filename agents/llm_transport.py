@@ -0,0 +1,104 @@
+"""
+LLM Transport - One pooled HTTP layer for every LLM call in the process
+- One keep-alive requests.Session per provider (TCP/TLS reused across agents)
+- Per-provider in-flight limits so parallel agents can't flood a local Ollama
+- Sync (post), streaming (stream) and async (apost) paths share the same sessions and limits
+"""
+import asyncio
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import LLM_MAX_IN_FLIGHT
+
+DEFAULT_IN_FLIGHT = 4
+
+
+class LLMTransport:
+    def __init__(self, limits=None):
+        self.limits = dict(LLM_MAX_IN_FLIGHT if limits is None else limits)
+        self.sessions = {}
+        self.semaphores = {}
+        self.lock = threading.Lock()
+        # Async callers run the pooled sync path here; sized to the total in-flight budget
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(4, sum(self.limits.values()) or DEFAULT_IN_FLIGHT),
+            thread_name_prefix="llm"
+        )
+
+    def _limit(self, provider):
+        return max(1, int(self.limits.get(provider, DEFAULT_IN_FLIGHT)))
+
+    def session(self, provider):
+        """Keep-alive session for a provider (created on first use)"""
+        with self.lock:
+            session = self.sessions.get(provider)
+            if session is None:
+                limit = self._limit(provider)
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=limit)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.sessions[provider] = session
+                self.semaphores[provider] = threading.BoundedSemaphore(limit)
+            return session
+
+    def post(self, provider, url, json=None, headers=None, timeout=60, verify=True):
+        """
+        POST through the provider's pooled session, blocking while the provider
+        is at its in-flight limit. The body is read inside the slot so the
+        connection goes straight back to the pool.
+        """
+        session = self.session(provider)
+        with self.semaphores[provider]:
+            response = session.post(url, json=json, headers=headers, timeout=timeout, verify=verify)
+            response.content
+            return response
+
+    @contextmanager
+    def stream(self, provider, url, json=None, headers=None, timeout=60, verify=True):
+        """
+        Streaming POST. The provider's in-flight slot is held until the caller
+        leaves the `with` block, i.e. until the stream has been consumed.
+        """
+        session = self.session(provider)
+        with self.semaphores[provider]:
+            response = session.post(url, json=json, headers=headers, timeout=timeout,
+                                    verify=verify, stream=True)
+            try:
+                yield response
+            finally:
+                response.close()
+
+    async def apost(self, provider, url, **kwargs):
+        """Async POST: same sessions and limits, run on the transport's executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: self.post(provider, url, **kwargs))
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking LLM call (e.g. LLMClient.generate) on the shared executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: func(*args, **kwargs))
+
+    def close(self):
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+        self.executor.shutdown(wait=False)
+
+
+_shared_transport = None
+_shared_lock = threading.Lock()
+
+
+def get_transport():
+    """Process-wide LLMTransport shared by every LLMClient"""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = LLMTransport()
+        return _shared_transport
@@ -0,0 +1,143 @@
+"""
+LLM Usage - Per-agent token and latency accounting
+Every provider request made through LLMClient is recorded with the calling agent,
+provider, model, token counts, time to first token, latency and cache outcome.
+- report(): this run's totals by agent and by route (for the workflow report)
+- flush(): adds this run to a cumulative JSON ledger, to spot the expensive agents over time
+Token counts come from the provider response; when it has none (older Ollama builds,
+cancelled streams) they are estimated from the text at ~4 characters per token.
+"""
+import os
+import json
+import time
+import threading
+
+from config import LLM_USAGE_LEDGER_PATH
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Rough token count for text (or a parsed JSON result)"""
+    if text is None:
+        return 0
+    if not isinstance(text, str):
+        text = json.dumps(text)
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def _empty_totals():
+    return {"calls": 0, "errors": 0, "cache_hits": 0, "prompt_tokens": 0,
+            "completion_tokens": 0, "estimated_calls": 0, "latency_s": 0.0}
+
+
+def _add(totals, record):
+    totals["calls"] += 1
+    totals["errors"] += record["status"] == "error"
+    totals["cache_hits"] += record["cache"] == "hit"
+    totals["prompt_tokens"] += record["prompt_tokens"]
+    totals["completion_tokens"] += record["completion_tokens"]
+    totals["estimated_calls"] += record["estimated"]
+    totals["latency_s"] = round(totals["latency_s"] + record["latency_s"], 3)
+
+
+class UsageLedger:
+    def __init__(self, path=LLM_USAGE_LEDGER_PATH):
+        self.path = path
+        self.calls = []
+        self.flushed = 0
+        self.lock = threading.Lock()
+
+    def record(self, agent, provider, model, prompt_tokens, completion_tokens, latency,
+               ttft=None, cache=None, status="ok", estimated=False):
+        """One provider request (or cache hit). cache: "hit", "miss" or None when disabled"""
+        entry = {
+            "time": time.time(),
+            "agent": agent,
+            "provider": provider,
+            "model": model,
+            "prompt_tokens": int(prompt_tokens or 0),
+            "completion_tokens": int(completion_tokens or 0),
+            "estimated": bool(estimated),
+            "ttft_s": round(ttft, 3) if ttft is not None else None,
+            "latency_s": round(latency, 3),
+            "cache": cache,
+            "status": status
+        }
+        with self.lock:
+            self.calls.append(entry)
+        return entry
+
+    def report(self):
+        """This run's usage, grouped by agent and by provider/model"""
+        with self.lock:
+            calls = list(self.calls)
+        by_agent, by_route = {}, {}
+        for record in calls:
+            _add(by_agent.setdefault(record["agent"], _empty_totals()), record)
+            _add(by_route.setdefault(f"{record['provider']}/{record['model']}", _empty_totals()), record)
+
+        for agent, totals in by_agent.items():
+            ttfts = [r["ttft_s"] for r in calls if r["agent"] == agent and r["ttft_s"] is not None]
+            totals["avg_ttft_s"] = round(sum(ttfts) / len(ttfts), 3) if ttfts else None
+        total = _empty_totals()
+        for record in calls:
+            _add(total, record)
+        return {"total": total, "by_agent": by_agent, "by_route": by_route}
+
+    def flush(self):
+        """Merge calls recorded since the last flush into the cumulative ledger file"""
+        with self.lock:
+            pending = self.calls[self.flushed:]
+            self.flushed = len(self.calls)
+        if not pending:
+            return None
+
+        ledger = {"runs": 0, "total": _empty_totals(), "by_agent": {}, "by_route": {}}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    ledger.update(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"   ⚠️ Usage ledger unreadable, starting a new one: {e}")
+
+        ledger["runs"] += 1
+        ledger["updated"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        for record in pending:
+            _add(ledger["total"], record)
+            _add(ledger["by_agent"].setdefault(record["agent"], _empty_totals()), record)
+            _add(ledger["by_route"].setdefault(f"{record['provider']}/{record['model']}", _empty_totals()), record)
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(ledger, f, indent=2)
+        os.replace(tmp_path, self.path)
+        return ledger
+
+    def print_summary(self, report=None):
+        report = report or self.report()
+        if not report["by_agent"]:
+            return
+        print("   🧾 LLM usage by agent:")
+        ranked = sorted(report["by_agent"].items(),
+                        key=lambda kv: kv[1]["prompt_tokens"] + kv[1]["completion_tokens"], reverse=True)
+        for agent, totals in ranked:
+            tokens = totals["prompt_tokens"] + totals["completion_tokens"]
+            approx = "~" if totals["estimated_calls"] else ""
+            print(f"      {agent}: {totals['calls']} calls, {approx}{tokens} tokens, {totals['latency_s']:.1f}s")
+
+
+_shared_ledger = None
+_shared_lock = threading.Lock()
+
+
+def get_usage_ledger():
+    """Process-wide UsageLedger"""
+    global _shared_ledger
+    with _shared_lock:
+        if _shared_ledger is None:
+            _shared_ledger = UsageLedger()
+        return _shared_ledger
@@ -43,7 +43,7 @@ class MarketingAgent:
 
     def _generate_copy(self, script):
         """Uses LLM to write marketing copy"""
-        from config import OLLAMA_BASE_URL, OLLAMA_MODEL
+        from config import OLLAMA_BASE_URL, OLLAMA_MODEL, OLLAMA_KEEP_ALIVE
         import requests
 
         prompt = f"""You are a Hollywood Marketing Executive.
@@ -66,7 +66,8 @@ Make it hype!"""
                 payload = {
                     "model": OLLAMA_MODEL,
                     "prompt": prompt,
-                    "stream": False
+                    "stream": False,
+                    "keep_alive": OLLAMA_KEEP_ALIVE
                 }
                 response = requests.post(OLLAMA_BASE_URL, json=payload)
                 if response.status_code == 200:
@@ -0,0 +1,79 @@
+"""
+Ollama Models - Keep the local model hot
+- Background preload at startup so the first planning call skips the 10-30s model load
+- keep_alive on every request so the model stays resident between stages
+- Residency (/api/ps) for the provider health report
+"""
+import threading
+
+from config import OLLAMA_BASE_URL, OLLAMA_MODEL, OLLAMA_KEEP_ALIVE, LLM_MODELS, LLM_CONNECT_TIMEOUT
+
+
+def ollama_url(path):
+    """Build an Ollama API URL from OLLAMA_BASE_URL (which points at /api/generate)"""
+    root = OLLAMA_BASE_URL.split("/api/")[0].rstrip("/")
+    return f"{root}/api/{path}"
+
+
+def configured_models():
+    """Every Ollama model the studio may call: the default plus LLM_MODELS routes"""
+    models = [OLLAMA_MODEL]
+    for spec in LLM_MODELS.values():
+        for provider, model in [spec.get('primary')] + list(spec.get('fallback', [])):
+            if provider == "ollama" and model and model not in models:
+                models.append(model)
+    return models
+
+
+def preload_models(models=None, background=True):
+    """
+    Load models into memory with an empty-prompt request (Ollama's documented preload).
+    Runs on a daemon thread by default; connection failures trip the Ollama breaker.
+    """
+    models = models or configured_models()
+
+    def run():
+        from agents.llm_transport import get_transport
+        from agents.provider_health import get_provider_health
+        breaker = get_provider_health().breaker("ollama")
+        for model in models:
+            try:
+                response = get_transport().post(
+                    "ollama", ollama_url("generate"),
+                    json={"model": model, "prompt": "", "keep_alive": OLLAMA_KEEP_ALIVE, "stream": False},
+                    timeout=(LLM_CONNECT_TIMEOUT, 300)
+                )
+                if response.status_code == 200:
+                    print(f"   🔥 Ollama: {model} loaded (keep_alive {OLLAMA_KEEP_ALIVE})")
+                else:
+                    print(f"   ⚠️ Ollama warm-up for {model}: status {response.status_code}")
+            except Exception as e:
+                print(f"   ⚠️ Ollama warm-up skipped ({e.__class__.__name__}): is `ollama serve` running?")
+                breaker.record_failure(e)
+                return
+
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name="ollama-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def residency():
+    """Models currently loaded in Ollama (/api/ps), or None if Ollama is unreachable"""
+    from agents.llm_transport import get_transport
+    try:
+        response = get_transport().session("ollama").get(ollama_url("ps"), timeout=LLM_CONNECT_TIMEOUT)
+        if response.status_code != 200:
+            return None
+        return [
+            {
+                "name": m.get("name"),
+                "size_vram_mb": round(m.get("size_vram", 0) / 1e6),
+                "expires_at": m.get("expires_at")
+            }
+            for m in response.json().get("models", [])
+        ]
+    except Exception:
+        return None
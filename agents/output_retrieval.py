@@ -0,0 +1,181 @@
+"""
+Output Retrieval - Bring ComfyUI outputs (images, gifs, videos) into OUTPUT_DIR
+- Co-located server: the file is already on this disk, so it is hardlinked into place
+  (or moved when the output folder is on another filesystem). No bytes are copied.
+- Remote server: chunked /view download into a .part file that survives failures;
+  retries resume with an HTTP Range request (If-Range guards against a changed file).
+  The result is checked against the advertised length and, when the server sends one,
+  its Digest / Content-MD5, then renamed into place atomically.
+Every output entry ({"filename", "subfolder", "type"}) is handled the same way.
+"""
+import os
+import time
+import base64
+import socket
+import hashlib
+import shutil
+import threading
+import urllib.parse
+
+from config import OUTPUT_DIR, COMFYUI_OUTPUT_DIR, COMFYUI_DOWNLOAD_RETRIES
+
+CHUNK_SIZE = 1024 * 1024
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1", "0.0.0.0", socket.gethostname().lower()}
+
+
+class RetrievalError(Exception):
+    """An output could not be fetched intact"""
+
+
+def _digests(headers):
+    """Expected {algorithm: base64 digest} from Digest / Content-MD5 response headers"""
+    expected = {}
+    for part in headers.get("Digest", "").split(","):
+        algorithm, _, value = part.strip().partition("=")
+        if value:
+            expected[algorithm.lower().replace("-", "")] = value
+    if headers.get("Content-MD5"):
+        expected["md5"] = headers["Content-MD5"]
+    return {a: v for a, v in expected.items() if a in ("sha256", "md5")}
+
+
+class OutputRetriever:
+    def __init__(self, local_root=COMFYUI_OUTPUT_DIR, retries=COMFYUI_DOWNLOAD_RETRIES):
+        self.local_root = local_root
+        self.retries = retries
+        self.lock = threading.Lock()
+        self.stats = {"linked": 0, "moved": 0, "downloaded": 0, "resumed": 0,
+                      "bytes_downloaded": 0, "failed": 0}
+
+    def retrieve(self, entry, base_url, dest_dir=OUTPUT_DIR, name=None):
+        """
+        Local path of an output entry in dest_dir (saved as `name`, default its ComfyUI filename).
+        Raises RetrievalError.
+        """
+        target = os.path.join(dest_dir, os.path.basename(name or entry["filename"]))
+        os.makedirs(dest_dir, exist_ok=True)
+        source = self.local_source(entry, base_url)
+        try:
+            if source:
+                return self._place_local(source, target)
+            return self._download(entry, base_url, target)
+        except RetrievalError:
+            self._count("failed")
+            raise
+
+    def local_source(self, entry, base_url):
+        """Path of the output on this disk when the server runs here, else None"""
+        host = (urllib.parse.urlparse(base_url).hostname or "").lower()
+        if host not in LOCAL_HOSTS:
+            return None
+        root = self.local_root
+        if entry.get("type", "output") != "output":
+            root = os.path.join(os.path.dirname(root), entry["type"])
+        path = os.path.join(root, entry.get("subfolder", ""), entry["filename"])
+        return path if os.path.isfile(path) else None
+
+    def _place_local(self, source, target):
+        if os.path.exists(target) and os.path.samefile(source, target):
+            return target
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.link"
+        try:
+            os.link(source, tmp_path)
+            os.replace(tmp_path, target)
+            self._count("linked")
+        except OSError:
+            # Different filesystem (or no hardlinks): take the file instead of duplicating it
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            shutil.move(source, target)
+            self._count("moved")
+        return target
+
+    def _download(self, entry, base_url, target):
+        import requests
+        query = urllib.parse.urlencode({"filename": entry["filename"], "subfolder": entry.get("subfolder", ""),
+                                        "type": entry.get("type", "output")})
+        url = f"{base_url}/view?{query}"
+        part_path = f"{target}.part"
+        etag, last_error = None, None
+        for attempt in range(self.retries):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                if etag:
+                    headers["If-Range"] = etag
+            try:
+                with requests.get(url, headers=headers, stream=True, timeout=(5, 60)) as response:
+                    if response.status_code == 416:
+                        # Nothing left past our offset: the .part is complete (or stale) - start over once
+                        os.remove(part_path)
+                        continue
+                    response.raise_for_status()
+                    resumed = response.status_code == 206
+                    if not resumed:
+                        offset = 0
+                    etag = response.headers.get("ETag", etag)
+                    total = self._expected_size(response, offset)
+                    # A 206's Content-MD5 covers only the range: check digests on full responses
+                    digests = {} if resumed else _digests(response.headers)
+                    with open(part_path, "ab" if resumed else "wb") as f:
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            f.write(chunk)
+                            self._count("bytes_downloaded", len(chunk))
+                if resumed:
+                    self._count("resumed")
+                self._verify(part_path, total, digests)
+                os.replace(part_path, target)
+                self._count("downloaded")
+                return target
+            except RetrievalError as e:
+                # Corrupt: keep nothing, the next attempt starts from zero
+                last_error = e
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+            except (requests.RequestException, OSError) as e:
+                last_error = e  # Keep the .part: the next attempt resumes from its end
+            time.sleep(min(2 ** attempt, 10))
+        raise RetrievalError(f"Could not retrieve {entry['filename']} from {base_url}: {last_error}")
+
+    @staticmethod
+    def _expected_size(response, offset):
+        content_range = response.headers.get("Content-Range", "")
+        if "/" in content_range and not content_range.endswith("*"):
+            return int(content_range.rsplit("/", 1)[1])
+        length = response.headers.get("Content-Length")
+        return offset + int(length) if length and length.isdigit() else None
+
+    @staticmethod
+    def _verify(path, total, digests):
+        size = os.path.getsize(path)
+        if total is not None and size != total:
+            raise RetrievalError(f"size mismatch ({size} of {total} bytes)")
+        for algorithm, expected in digests.items():
+            h = hashlib.new(algorithm)
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    h.update(block)
+            if base64.b64encode(h.digest()).decode() != expected and h.hexdigest() != expected.lower():
+                raise RetrievalError(f"{algorithm} checksum mismatch")
+
+    def _count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def report(self):
+        with self.lock:
+            return dict(self.stats)
+
+
+_shared_retriever = None
+_shared_lock = threading.Lock()
+
+
+def get_output_retriever():
+    """Process-wide OutputRetriever"""
+    global _shared_retriever
+    with _shared_lock:
+        if _shared_retriever is None:
+            _shared_retriever = OutputRetriever()
+        return _shared_retriever
@@ -1,6 +1,7 @@
 import os
 import requests
 from config import ASSETS_DIR
+from agents.singleflight import singleflight, atomic_download
 
 class PixabayAgent:
     """
@@ -11,6 +12,7 @@ class PixabayAgent:
         self.api_key = "demo"  # Free key available at pixabay.com/api/docs/
         self.base_url = "https://pixabay.com/api"
         
+    @singleflight("pixabay_video")
     def search_video(self, query):
         """
         Searches for HD/4K videos.
@@ -50,10 +52,7 @@ class PixabayAgent:
                         
                         if not os.path.exists(save_path):
                             print(f"   ⬇️ Downloading video from Pixabay...")
-                            vid_response = requests.get(download_url, stream=True)
-                            with open(save_path, 'wb') as f:
-                                for chunk in vid_response.iter_content(chunk_size=8192):
-                                    f.write(chunk)
+                            atomic_download(download_url, save_path)
                             print(f"   ✅ Video acquired from Pixabay")
                             return save_path
                         else:
@@ -69,6 +68,7 @@ class PixabayAgent:
             print(f"   ❌ Pixabay Error: {e}")
             return None
     
+    @singleflight("pixabay_image")
     def search_image(self, query):
         """
         Searches for high-quality images.
@@ -95,9 +95,7 @@ class PixabayAgent:
                     save_path = os.path.join(ASSETS_DIR, filename)
                     
                     if not os.path.exists(save_path):
-                        img_response = requests.get(download_url)
-                        with open(save_path, 'wb') as f:
-                            f.write(img_response.content)
+                        atomic_download(download_url, save_path)
                         return save_path
                     else:
                         return save_path
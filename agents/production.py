@@ -1,26 +1,18 @@
 import os
-import json
-import time
-import urllib.request
-import urllib.parse
-import uuid
-import threading
-try:
-    import websocket # Requires websocket-client
-except ImportError:
-    websocket = None
 
-from config import COMFYUI_HOST, COMFYUI_PORT, OUTPUT_DIR, VIDEO_MODEL, WORKFLOWS_DIR
+from config import OUTPUT_DIR, VIDEO_MODEL, COMFYUI_JOB_TIMEOUT
+from comfy_client import ComfyClient
+from agents.workflow_registry import get_workflow_registry
 
 class ProductionAgent:
     def __init__(self):
-        self.server_address = f"{COMFYUI_HOST}:{COMFYUI_PORT}"
-        self.client_id = str(uuid.uuid4())
+        # Shares the process-wide ComfyUI event stream and client ID with the other agents
+        self.comfy = ComfyClient(auto_start=False)
         print(f"🎬 Production Agent initialized (Video Model: {VIDEO_MODEL})")
         
-    def shoot_scene(self, scene_data, keyframe_path=None):
+    def submit_scene(self, scene_data, keyframe_path=None):
         """
-        Generates a video clip for the scene using ComfyUI.
+        Queues the scene's video job on ComfyUI without waiting. Returns the prompt_id or None.
         """
         # If no keyframe, we can't do image-to-video efficiently yet without more complex workflows
         # But for now let's assume we might generate T2V if no keyframe, or I2V if keyframe exists.
@@ -44,116 +36,53 @@ class ProductionAgent:
         # 3. Queue Prompt
         print("      🚀 Sending to ComfyUI...")
         try:
-            prompt_id = self._queue_prompt(workflow)
-            
+            prompt_id = self.comfy.queue_prompt(workflow)['prompt_id']
+        except Exception as e:
+            print(f"      ❌ ComfyUI Error: {e}")
+            return self._create_placeholder(prompt)
+        return prompt_id
+
+    def shoot_scene(self, scene_data, keyframe_path=None):
+        """
+        Generates a video clip for the scene using ComfyUI (submit + wait).
+        """
+        prompt_id = self.submit_scene(scene_data, keyframe_path)
+        return self.collect_scene(prompt_id) if prompt_id else None
+
+    def collect_scene(self, prompt_id):
+        """
+        Wait for a submitted scene and retrieve its video. Returns the local path or None.
+        """
+        try:
             # 4. Wait for completion (with timeout)
-            video_filename = self._wait_for_completion(prompt_id)
+            print("      ⏳ Rendering...")
+            outputs = self.comfy.wait_for_outputs(prompt_id, max_wait=COMFYUI_JOB_TIMEOUT)
+            video = self.comfy.first_output(outputs, kinds=("gifs", "videos"))
             
-            if video_filename:
-                # Move to output dir if not already there (ComfyUI saves to its own output usually)
-                # But our helper returns the filename in ComfyUI output. 
-                # We need to find the file.
-                return self._retrieve_video(video_filename)
+            if video:
+                # Hardlinked from a local ComfyUI, or downloaded (resumable, verified) from a remote one
+                return self.comfy.fetch_output(prompt_id, video, OUTPUT_DIR)
         except Exception as e:
             print(f"      ❌ ComfyUI Error: {e}")
             
-        return self._create_placeholder(prompt)
+        return self._create_placeholder(prompt_id)
         
     def _check_comfyui_connection(self):
-        try:
-            url = f"http://{self.server_address}/system_stats"
-            req = urllib.request.Request(url)
-            with urllib.request.urlopen(req) as response:
-                return response.status == 200
-        except:
-            return False
+        return self.comfy.ping()
 
     def _load_workflow(self, model_name):
-        filename = f"{model_name}_workflow_api.json"
-        path = os.path.join(WORKFLOWS_DIR, filename)
-        if not os.path.exists(path):
-            print(f"      ❌ Workflow file not found: {path}")
+        # Loaded and validated once per process, shared with the other agents
+        try:
+            return get_workflow_registry().get(model_name)
+        except (OSError, ValueError) as e:
+            print(f"      ❌ Workflow unavailable: {e}")
             return None
             
-        with open(path, 'r') as f:
-            return json.load(f)
-            
-    def _prepare_workflow(self, workflow, prompt, keyframe, duration):
-        # This is heuristics-based modification of the API JSON
-        # We look for nodes that look like they take text or images
-        
-        for node_id, node in workflow.items():
-            inputs = node.get("inputs", {})
-            class_type = node.get("class_type", "")
-            
-            # Update Prompt
-            if class_type in ["CLIPTextEncode", "HunyuanVideoPrompt"]:
-                if "text" in inputs:
-                    inputs["text"] = prompt
-            
-            # Update Image (if Keyframe provided and node expects image)
-            if keyframe and class_type == "LoadImage":
-                # ComfyUI usually expects image in input folder. config.ASSETS_DIR? 
-                # For now, we assume user must manually put it there or we copy it.
-                # Actually, specialized nodes need full paths or relative to input.
-                # Simplest hack: Copy keyframe to ComfyUI input folder? 
-                # For this implementation, we will assume T2V for now unless we implement proper upload.
-                pass 
-                
-        return workflow
-
-    def _queue_prompt(self, workflow):
-        p = {"prompt": workflow, "client_id": self.client_id}
-        data = json.dumps(p).encode('utf-8')
-        url = f"http://{self.server_address}/prompt"
-        req = urllib.request.Request(url, data=data)
-        with urllib.request.urlopen(req) as response:
-            return json.loads(response.read())['prompt_id']
-
-    def _wait_for_completion(self, prompt_id):
-        if websocket is None:
-            print("      ⚠️ WebSocket lib missing. Waiting blindly (30s)...")
-            time.sleep(30)
-            return None # Can't know filename without WS
-            
-        ws = websocket.WebSocket()
-        ws.connect(f"ws://{self.server_address}/ws?clientId={self.client_id}")
-        
-        print("      ⏳ Rendering...")
-        while True:
-            out = ws.recv()
-            if isinstance(out, str):
-                message = json.loads(out)
-                if message['type'] == 'executing':
-                    data = message['data']
-                    if data['node'] is None and data['prompt_id'] == prompt_id:
-                        # Execution finished
-                        break
-        
-        # Get history to find output filename
-        with urllib.request.urlopen(f"http://{self.server_address}/history/{prompt_id}") as response:
-            history = json.loads(response.read())[prompt_id]
-            outputs = history['outputs']
-            
-            # Extract video filename from outputs
-            for node_id, output_data in outputs.items():
-                if 'gifs' in output_data:
-                    return output_data['gifs'][0]['filename']
-                if 'videos' in output_data:
-                    return output_data['videos'][0]['filename']
-        return None
-
-    def _retrieve_video(self, filename):
-        # We need to compute where ComfyUI saved it. 
-        # Usually defaults to ComfyUI/output.
-        # We will attempt to find it or download it from view endpoint
-        
-        url = f"http://{self.server_address}/view?filename={filename}&type=output"
-        
-        # Save to our output dir
-        target_path = os.path.join(OUTPUT_DIR, filename)
-        urllib.request.urlretrieve(url, target_path)
-        return target_path
+    def _prepare_workflow(self, template, prompt, keyframe, duration):
+        # Fresh job graph: the positive prompt only (the negative stays), frames if the workflow has them
+        # Keyframe: ComfyUI expects images in its input folder, which needs an upload step.
+        # For this implementation, we will assume T2V for now unless we implement proper upload.
+        return template.instantiate(prompt=prompt, frames=int(float(duration) * 24))
 
     def _create_placeholder(self, prompt):
         # Simply return None so the system knows to skip or use static image
@@ -0,0 +1,164 @@
+"""
+Provider Health - Circuit breakers and adaptive timeouts for LLM providers
+One registry per process, so when Ollama is down or a key is rate-limited the
+first agent to notice trips the breaker and every other agent skips that provider
+in milliseconds instead of waiting out its own timeout.
+- CLOSED: requests flow; consecutive failures are counted
+- OPEN: requests are refused until the cool-down has passed
+- HALF_OPEN: one probe request decides between CLOSED and OPEN again
+Read timeouts follow observed response times instead of a fixed 60s/300s.
+"""
+import time
+import threading
+from collections import deque
+
+from config import (LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN, LLM_CONNECT_TIMEOUT,
+                    LLM_TIMEOUT_MIN, LLM_TIMEOUT_MAX)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a provider whose breaker is open"""
+
+
+class CircuitBreaker:
+    def __init__(self, provider, failure_threshold=LLM_BREAKER_FAILURES, cooldown=LLM_BREAKER_COOLDOWN):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.last_error = None
+        self.latencies = deque(maxlen=50)
+        self.lock = threading.Lock()
+
+    def available(self):
+        """Would a request be let through right now? (no side effects)"""
+        with self.lock:
+            if self.state == OPEN:
+                return time.time() - self.opened_at >= self.cooldown
+            if self.state == HALF_OPEN:
+                return not self.probe_in_flight
+            return True
+
+    def acquire(self):
+        """Admit a request or raise CircuitOpen"""
+        with self.lock:
+            if self.state == OPEN:
+                remaining = self.cooldown - (time.time() - self.opened_at)
+                if remaining > 0:
+                    raise CircuitOpen(f"{self.provider} circuit open ({remaining:.0f}s cool-down left): {self.last_error}")
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == HALF_OPEN:
+                if self.probe_in_flight:
+                    raise CircuitOpen(f"{self.provider} circuit half-open, probe in flight")
+                self.probe_in_flight = True
+                print(f"   🩺 {self.provider}: half-open, sending probe request")
+
+    def record_success(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+            if self.state != CLOSED:
+                print(f"   ✅ {self.provider}: circuit closed (recovered)")
+            self.state = CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+
+    def record_failure(self, error):
+        with self.lock:
+            self.last_error = str(error)[:200]
+            self.failures += 1
+            self.probe_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"   ⛔ {self.provider}: circuit OPEN for {self.cooldown:.0f}s ({self.last_error[:80]})")
+                self.state = OPEN
+                self.opened_at = time.time()
+
+    def release(self):
+        """Request ended without a verdict on provider health (e.g. cancelled)"""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def read_timeout(self):
+        """
+        Read timeout from observed latency, clamped per provider.
+        Based on the slowest recent response (not p95): short DP calls and long script
+        calls share a provider, and a non-streamed read waits for the whole answer.
+        """
+        ceiling = LLM_TIMEOUT_MAX.get(self.provider, LLM_TIMEOUT_MAX.get("default", 60))
+        with self.lock:
+            samples = list(self.latencies)
+        if len(samples) < 3:
+            return ceiling
+        return max(LLM_TIMEOUT_MIN, min(ceiling, 3 * max(samples) + 10))
+
+    def timeout(self):
+        """(connect, read) tuple for requests"""
+        return (LLM_CONNECT_TIMEOUT, self.read_timeout())
+
+    def report(self):
+        with self.lock:
+            state, failures, last_error = self.state, self.failures, self.last_error
+            samples = list(self.latencies)
+        return {
+            "state": state,
+            "consecutive_failures": failures,
+            "last_error": last_error,
+            "samples": len(samples),
+            "read_timeout_s": round(self.read_timeout(), 1)
+        }
+
+
+class ProviderHealth:
+    """Registry of breakers, shared by every LLMClient in the process"""
+    def __init__(self):
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def breaker(self, provider):
+        with self.lock:
+            if provider not in self.breakers:
+                self.breakers[provider] = CircuitBreaker(provider)
+            return self.breakers[provider]
+
+    def available(self, provider):
+        return self.breaker(provider).available()
+
+    def report(self):
+        with self.lock:
+            providers = list(self.breakers)
+        report = {provider: self.breaker(provider).report() for provider in providers}
+        if "ollama" in report:
+            from agents.ollama_models import residency
+            report["ollama"]["resident_models"] = residency()
+        return report
+
+    def print_status(self, report=None):
+        report = report or self.report()
+        if not report:
+            return
+        print("   🩺 LLM provider health:")
+        for provider, status in report.items():
+            icon = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}[status['state']]
+            print(f"      {icon} {provider}: {status['state']} (timeout {status['read_timeout_s']}s)")
+            if status.get('resident_models'):
+                names = ", ".join(m['name'] for m in status['resident_models'])
+                print(f"         🔥 Resident: {names}")
+
+
+_shared_health = None
+_shared_lock = threading.Lock()
+
+
+def get_provider_health():
+    """Process-wide ProviderHealth"""
+    global _shared_health
+    with _shared_lock:
+        if _shared_health is None:
+            _shared_health = ProviderHealth()
+        return _shared_health
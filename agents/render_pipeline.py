@@ -0,0 +1,314 @@
+"""
+Pipelined Renderer - Shared-memory frame pipeline for the Editor
+Decode, effects and encode run in separate processes so they overlap instead of
+contending for one GIL:
+- Decoder workers write raw RGB frames straight into a shared-memory ring buffer
+- Effect workers grade/overlay each frame in place (fused FrameKernel)
+- One encoder process streams ring slots to ffmpeg with zero copies
+A slot is only reused after the encoder has consumed it, so memory stays bounded
+at RENDER_RING_SLOTS frames regardless of timeline length.
+"""
+import subprocess
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait as wait_for_exit
+
+import numpy as np
+
+from config import RESOLUTION, FPS, RENDER_RING_SLOTS, RENDER_DECODERS, RENDER_EFFECT_WORKERS
+
+# Slot states
+FREE, DECODED, READY = 0, 1, 2
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def ffmpeg_exe():
+    """ffmpeg binary bundled with MoviePy (imageio-ffmpeg), else the one on PATH"""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return "ffmpeg"
+
+
+def build_kernel(spec, src_size=None):
+    """Build a segment's FrameKernel inside a worker process"""
+    from agents.frame_engine import FrameEngine, FrameKernel, render_text_overlay
+    gray, gain = FrameEngine.style_grade(spec.get('style'))
+    text = spec.get('text')
+    overlay = render_text_overlay(text, RESOLUTION) if text and len(text) >= 2 else None
+    return FrameKernel(src_size or RESOLUTION, RESOLUTION, zoom=spec.get('zoom'),
+                       gray=gray, gain=gain, overlay=overlay)
+
+
+class _Ring:
+    """Process-local view of the shared ring buffer and its slot table"""
+    def __init__(self, shm_name, slots, state, slot_seq, cond, abort):
+        self.shm = shared_memory.SharedMemory(name=shm_name)
+        self.frame_bytes = RESOLUTION[0] * RESOLUTION[1] * 3
+        self.frames = np.ndarray((slots, RESOLUTION[1], RESOLUTION[0], 3), dtype=np.uint8, buffer=self.shm.buf)
+        self.slots = slots
+        self.state = state
+        self.slot_seq = slot_seq
+        self.cond = cond
+        self.abort = abort
+
+    def slot_view(self, slot):
+        """Raw bytes of one slot (for readinto / pipe writes)"""
+        start = slot * self.frame_bytes
+        return self.shm.buf[start:start + self.frame_bytes]
+
+    def wait(self, predicate):
+        """Block until predicate() holds; returns False if the render was aborted"""
+        with self.cond:
+            while not predicate():
+                if self.abort.value:
+                    return False
+                self.cond.wait(0.5)
+        return not self.abort.value
+
+    def mark(self, slot, state, seq=None):
+        with self.cond:
+            if seq is not None:
+                self.slot_seq[slot] = seq
+            self.state[slot] = state
+            self.cond.notify_all()
+
+    def fail(self):
+        with self.cond:
+            self.abort.value = 1
+            self.cond.notify_all()
+
+    def close(self):
+        del self.frames
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # A worker-local frame view is still alive; the OS reclaims it on exit
+
+
+def _abort(ring_args):
+    """Flag the render as failed when the ring itself could not be attached"""
+    cond, abort = ring_args[4], ring_args[5]
+    with cond:
+        abort.value = 1
+        cond.notify_all()
+
+
+def _decoder_worker(ring_args, segments, jobs, effect_queue):
+    """Decode whole segments into ring slots, in timeline order per segment"""
+    ring = None
+    try:
+        ring = _Ring(*ring_args)
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            seg_index, first_seq = job
+            spec = segments[seg_index]
+            n_frames = spec['frames']
+
+            if spec['path'].lower().endswith(IMAGE_EXTENSIONS):
+                # Stills: the fused kernel renders zoom + grade + text directly into the slot
+                from PIL import Image
+                image = np.asarray(Image.open(spec['path']).convert('RGB'))
+                kernel = build_kernel(spec, (image.shape[1], image.shape[0]))
+                for k in range(n_frames):
+                    seq = first_seq + k
+                    slot = seq % ring.slots
+                    if not ring.wait(lambda: ring.state[slot] == FREE and ring.slot_seq[slot] == seq - ring.slots):
+                        return
+                    kernel(image, k / FPS, out=ring.frames[slot])
+                    ring.mark(slot, READY, seq)
+                continue
+
+            # Video: ffmpeg does cover-fit scale + crop + fps and loops short sources
+            w, h = RESOLUTION
+            cmd = [ffmpeg_exe(), "-v", "error", "-stream_loop", "-1",
+                   "-ss", f"{spec.get('start', 0):.3f}", "-i", spec['path'],
+                   "-t", f"{spec['duration']:.3f}", "-an",
+                   "-vf", f"scale={w}:{h}:force_original_aspect_ratio=increase,crop={w}:{h},fps={FPS}",
+                   "-f", "rawvideo", "-pix_fmt", "rgb24", "-"]
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            try:
+                for k in range(n_frames):
+                    seq = first_seq + k
+                    slot = seq % ring.slots
+                    if not ring.wait(lambda: ring.state[slot] == FREE and ring.slot_seq[slot] == seq - ring.slots):
+                        return
+                    view = ring.slot_view(slot)
+                    filled = 0
+                    while filled < ring.frame_bytes:
+                        n = proc.stdout.readinto(view[filled:])
+                        if not n:
+                            break
+                        filled += n
+                    if filled < ring.frame_bytes:
+                        ring.frames[slot].fill(0)  # Source ran dry: pad with black
+                    view.release()
+                    ring.mark(slot, DECODED, seq)
+                    effect_queue.put((seq, seg_index, k / FPS))
+            finally:
+                proc.stdout.close()
+                proc.kill()
+                proc.wait()
+    except Exception as e:
+        print(f"      ❌ Decoder worker failed: {e}")
+        _abort(ring_args)
+    finally:
+        if ring:
+            ring.close()
+
+
+def _effect_worker(ring_args, segments, effect_queue):
+    """Grade and overlay decoded frames in place"""
+    ring = None
+    kernels = {}
+    try:
+        ring = _Ring(*ring_args)
+        while True:
+            item = effect_queue.get()
+            if item is None:
+                break
+            seq, seg_index, t = item
+            slot = seq % ring.slots
+            if seg_index not in kernels:
+                kernels[seg_index] = build_kernel(segments[seg_index])
+            frame = ring.frames[slot]
+            kernels[seg_index](frame, t, out=frame)
+            ring.mark(slot, READY)
+    except Exception as e:
+        print(f"      ❌ Effect worker failed: {e}")
+        _abort(ring_args)
+    finally:
+        if ring:
+            ring.close()
+
+
+def _encoder_worker(ring_args, total_frames, output_path, audio_path, preset, result):
+    """Stream ready slots to ffmpeg in timeline order (zero-copy pipe writes)"""
+    w, h = RESOLUTION
+    cmd = [ffmpeg_exe(), "-y", "-v", "error",
+           "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{w}x{h}", "-r", str(FPS), "-i", "-"]
+    if audio_path:
+        cmd += ["-i", audio_path, "-c:a", "aac", "-shortest"]
+    cmd += ["-c:v", "libx264", "-preset", preset, "-pix_fmt", "yuv420p", output_path]
+    ring, proc = None, None
+    try:
+        ring = _Ring(*ring_args)
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        for seq in range(total_frames):
+            slot = seq % ring.slots
+            if not ring.wait(lambda: ring.state[slot] == READY and ring.slot_seq[slot] == seq):
+                break
+            view = ring.slot_view(slot)
+            proc.stdin.write(view)
+            view.release()
+            ring.mark(slot, FREE)
+        else:
+            result.value = 1
+    except Exception as e:
+        print(f"      ❌ Encoder failed: {e}")
+        result.value = 0
+        _abort(ring_args)
+    finally:
+        if proc:
+            proc.stdin.close()
+            if proc.wait() != 0:
+                result.value = 0
+        if ring:
+            ring.close()
+
+
+class PipelinedRenderer:
+    """
+    Renders a list of segment specs to an MP4 using the shared-memory pipeline.
+
+    Segment spec keys:
+        path, duration, start (video in-point), zoom (KenBurns or None),
+        style (grading), text (overlay headline)
+    """
+    def __init__(self, slots=RENDER_RING_SLOTS, decoders=RENDER_DECODERS, effect_workers=RENDER_EFFECT_WORKERS):
+        self.slots = slots
+        self.decoders = decoders
+        self.effect_workers = effect_workers
+
+    def render(self, segments, output_path, audio_path=None, preset="medium"):
+        for spec in segments:
+            spec['frames'] = max(1, int(round(spec['duration'] * FPS)))
+        total_frames = sum(spec['frames'] for spec in segments)
+        frame_bytes = RESOLUTION[0] * RESOLUTION[1] * 3
+
+        print(f"      ⚙️ Pipelined render: {total_frames} frames, {self.slots}-slot ring "
+              f"({self.slots * frame_bytes / 1e6:.0f} MB), {self.decoders} decoders, "
+              f"{self.effect_workers} effect workers")
+
+        shm = shared_memory.SharedMemory(create=True, size=self.slots * frame_bytes)
+        try:
+            state = mp.Array('i', [FREE] * self.slots, lock=False)
+            # Slot i starts as "released by seq i - slots" so seq i may claim it
+            slot_seq = mp.Array('q', [i - self.slots for i in range(self.slots)], lock=False)
+            cond = mp.Condition()
+            abort = mp.Value('i', 0, lock=False)
+            result = mp.Value('i', 0, lock=False)
+            ring_args = (shm.name, self.slots, state, slot_seq, cond, abort)
+
+            jobs = mp.Queue()
+            effect_queue = mp.Queue(maxsize=self.slots)
+            first_seq = 0
+            for i, spec in enumerate(segments):
+                jobs.put((i, first_seq))
+                first_seq += spec['frames']
+            for _ in range(self.decoders):
+                jobs.put(None)
+
+            encoder = mp.Process(target=_encoder_worker,
+                                 args=(ring_args, total_frames, output_path, audio_path, preset, result))
+            effects = [mp.Process(target=_effect_worker, args=(ring_args, segments, effect_queue))
+                       for _ in range(self.effect_workers)]
+            decoders = [mp.Process(target=_decoder_worker, args=(ring_args, segments, jobs, effect_queue))
+                        for _ in range(self.decoders)]
+            everyone = [encoder] + effects + decoders
+            for proc in everyone:
+                proc.start()
+
+            ok = self._join(decoders, everyone, cond, abort)
+            if ok:
+                for _ in effects:
+                    effect_queue.put(None)
+                ok = self._join(effects + [encoder], everyone, cond, abort)
+
+            if not ok or not result.value or abort.value:
+                print("      ❌ Pipelined render failed")
+                return None
+            return output_path
+        finally:
+            shm.close()
+            shm.unlink()
+
+    @staticmethod
+    def _join(procs, everyone, cond, abort, poll=0.5):
+        """
+        Wait for procs to exit. If any child crashed (non-zero exitcode: exception before
+        its try, OOM kill, segfault) or the render was aborted, flag the abort and stop
+        every remaining child instead of blocking on a worker that will never finish.
+        """
+        pending = list(procs)
+        while pending:
+            wait_for_exit([p.sentinel for p in pending], timeout=poll)
+            pending = [p for p in pending if p.is_alive()]
+            crashed = [p for p in everyone if p.exitcode not in (None, 0)]
+            if crashed or abort.value:
+                for p in crashed:
+                    print(f"      ❌ Render worker {p.name} exited with code {p.exitcode}")
+                with cond:
+                    abort.value = 1
+                    cond.notify_all()
+                for p in everyone:
+                    if p.is_alive():
+                        p.terminate()
+                for p in everyone:
+                    p.join(timeout=5)
+                return False
+        return True
@@ -3,21 +3,34 @@ import json
 import requests
 import urllib3
 from config import GROQ_API_KEY, LLM_MODEL
+from agents.llm_schemas import SCRIPT_SCHEMA, SCENE_FILL_SCHEMA
 
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Fields the Super Director plan does not provide; the Screenwriter fills only these
+FILL_FIELDS = ("voiceover", "text_overlay")
+
+FILL_SYSTEM_PROMPT = """You are a WORLD-CLASS advertising copywriter.
+The shot list is final. For each numbered shot, write only what is asked:
+- "voiceover": compelling narration, 1-2 sentences, timed to the shot's duration
+- "text_overlay": brief catchy on-screen text or slogan, or "" for none
+Keep one voice and a clear arc across the shots (Hook -> Build -> Climax -> Resolution).
+Reply with JSON only:
+{"scenes": [{"index": 1, "voiceover": "...", "text_overlay": "..."}]}"""
+
 class ScreenwriterAgent:
     def __init__(self):
         self.api_key = GROQ_API_KEY
         self.model = LLM_MODEL
 
-    def write_script(self, user_prompt):
+    def write_script(self, user_prompt, on_scene=None):
         """
         Generates GEMINI VEO-LEVEL cinema-quality scripts.
+        on_scene: optional callback(index, scene), called as each scene finishes streaming.
         """
         from agents.llm_client import LLMClient
-        client = LLMClient()
+        client = LLMClient(agent="screenwriter")
 
         if client.provider == "ollama":
             # Ultra-Simplified Prompt for Local Models (Llama3)
@@ -110,7 +123,8 @@ Think: PREMIUM. ARTISTIC. MEMORABLE."""
         # Generate Script
         print(f"   ✍️ Screenwriter is writing ({client.provider})...")
         try:
-            result = client.generate(system_prompt, user_content, temperature=0.9, json_mode=True)
+            result = client.generate(system_prompt, user_content, temperature=0.9, json_mode=True,
+                                     on_item=on_scene, schema=SCRIPT_SCHEMA)
             if not result:
                 raise Exception("Empty response from LLM")
             return json.dumps(result) # Return as string for compatibility
@@ -120,6 +134,91 @@ Think: PREMIUM. ARTISTIC. MEMORABLE."""
             traceback.print_exc()
             raise e
 
+    def scenes_from_plan(self, plan):
+        """
+        Convert the Super Director's shot list into the downstream `scenes` format,
+        without an LLM call. Returns None if the plan has no usable shots.
+        """
+        scenes = []
+        for shot in plan.get('shots', []) if plan else []:
+            if not isinstance(shot, dict) or not str(shot.get('visual', '')).strip():
+                continue
+            visual = str(shot['visual']).strip()
+            technical = str(shot.get('technical', '') or '').strip()
+            try:
+                duration = float(shot.get('duration', 5)) or 5
+            except (TypeError, ValueError):
+                duration = 5
+            scene = {
+                "visual_prompt": f"{visual}, {technical}" if technical else visual,
+                "duration": duration,
+                # The plan picks the source; older plans without one keep the studio default (GENERATE)
+                "source_type": shot.get('source_type') if shot.get('source_type') in ("STOCK", "GENERATE") else "GENERATE",
+                "purpose": shot.get('purpose', ''),
+                "pacing": shot.get('pacing', '')
+            }
+            for field in FILL_FIELDS:
+                if shot.get(field):
+                    scene[field] = shot[field]
+            scenes.append(scene)
+        if not scenes:
+            return None
+        print(f"   📋 Screenwriter: {len(scenes)} scenes taken from the Super Director's plan")
+        return {"scenes": scenes}
+
+    def fill_missing(self, script, user_prompt, on_scene=None):
+        """
+        Fill only voiceover/text_overlay for scenes that lack them (one LLM call).
+        on_scene: optional callback(index, scene) with a copy of each scene as it completes.
+        Scenes that come back without copy keep what they have.
+        """
+        from agents.llm_client import LLMClient
+        client = LLMClient(agent="screenwriter")
+
+        scenes = script.get('scenes', [])
+        missing = [i for i, scene in enumerate(scenes) if any(not scene.get(f) for f in FILL_FIELDS)]
+        if not missing:
+            return script
+
+        shots = "\n".join(
+            f"{n}. ({scenes[i].get('duration', 5)}s, {scenes[i].get('purpose') or 'shot'}) {scenes[i].get('visual_prompt', '')}"
+            for n, i in enumerate(missing, start=1)
+        )
+        user_content = f"Brief: {user_prompt}\n\nWrite the copy for these {len(missing)} shots:\n{shots}"
+
+        def merge(entry, fallback_position):
+            try:
+                n = int(entry.get('index', fallback_position))
+            except (TypeError, ValueError):
+                n = fallback_position
+            if not 1 <= n <= len(missing):
+                return None
+            scene = scenes[missing[n - 1]]
+            for field in FILL_FIELDS:
+                if not scene.get(field) and isinstance(entry.get(field), str):
+                    scene[field] = entry[field].strip()
+            return missing[n - 1]
+
+        on_item = None
+        if on_scene:
+            def on_item(position, entry):
+                if isinstance(entry, dict):
+                    index = merge(entry, position + 1)
+                    if index is not None:
+                        on_scene(index, dict(scenes[index]))
+
+        print(f"   ✍️ Screenwriter is writing copy for {len(missing)} planned scenes ({client.provider})...")
+        result = client.generate(FILL_SYSTEM_PROMPT, user_content, temperature=0.8, json_mode=True,
+                                 on_item=on_item, schema=SCENE_FILL_SCHEMA)
+        entries = result.get('scenes', []) if isinstance(result, dict) else []
+        for position, entry in enumerate(entries, start=1):
+            if isinstance(entry, dict):
+                merge(entry, position)
+        still_missing = sum(1 for i in missing if not scenes[i].get('voiceover'))
+        if still_missing:
+            print(f"   ⚠️ {still_missing} scenes have no voiceover copy")
+        return script
+
     def _clean_json(self, text):
         """Removes Markdown formatting"""
         text = text.strip()
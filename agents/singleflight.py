@@ -0,0 +1,129 @@
+"""
+Singleflight - Coalesce identical in-flight requests, and write downloads atomically
+When scenes (or jobs sharing a process) ask for the same stock query, sound, TTS line
+or LLM prompt at the same time, only the first caller does the work; the others wait
+for it and share its result (or its exception). Nothing is cached once the call ends.
+Downloads go to a unique temp file and are renamed into place with os.replace, so two
+writers can never interleave bytes in the same ASSETS_DIR/OUTPUT_DIR file.
+"""
+import os
+import uuid
+import functools
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.stats = {"calls": 0, "shared": 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) once per key at a time.
+        Returns (result, shared): shared is True when the result came from another caller.
+        """
+        with self.lock:
+            self.stats["calls"] += 1
+            call = self.calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats["shared"] += 1
+                leader = False
+            else:
+                call = self.calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+    def report(self):
+        with self.lock:
+            return dict(self.stats, in_flight=len(self.calls))
+
+
+_shared_group = None
+_shared_lock = threading.Lock()
+
+
+def get_singleflight():
+    """Process-wide SingleFlight group (keys are namespaced per agent)"""
+    global _shared_group
+    with _shared_lock:
+        if _shared_group is None:
+            _shared_group = SingleFlight()
+        return _shared_group
+
+
+def singleflight(namespace, key=None):
+    """
+    Method decorator: concurrent calls with equal arguments share one execution.
+    key(self, *args, **kwargs) builds the request key; by default every argument but self.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            request = key(self, *args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            result, shared = get_singleflight().do((namespace, request), method, self, *args, **kwargs)
+            if shared:
+                print(f"   🔗 Joined in-flight {namespace} request")
+            return result
+        return wrapper
+    return decorator
+
+
+def temp_path_for(path):
+    """Unique sibling temp path (same directory, so os.replace is atomic)"""
+    return f"{path}.{uuid.uuid4().hex[:8]}.part"
+
+
+def atomic_write(path, data):
+    """Write bytes to path via a temp file + os.replace"""
+    tmp_path = temp_path_for(path)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def atomic_download(url, path, chunk_size=8192, **request_kwargs):
+    """Stream url into path via a temp file + os.replace. Raises on HTTP errors."""
+    import requests
+    tmp_path = temp_path_for(path)
+    try:
+        with requests.get(url, stream=True, **request_kwargs) as response:
+            response.raise_for_status()
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
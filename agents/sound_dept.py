@@ -5,6 +5,7 @@ Simple, reliable audio sourcing without AI generation
 import os
 import requests
 from config import OUTPUT_DIR, FREESOUND_API_KEY
+from agents.singleflight import singleflight, atomic_write
 
 class SoundDeptAgent:
     """
@@ -17,6 +18,7 @@ class SoundDeptAgent:
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
     
+    @singleflight("freesound_music")
     def generate_music(self, mood="cinematic", duration=30, style="background"):
         """
         Source professional background music from Freesound.
@@ -71,9 +73,7 @@ class SoundDeptAgent:
                     if download_response.status_code == 200:
                         # Save file
                         output_path = os.path.join(self.output_dir, f"background_music.mp3")
-                        
-                        with open(output_path, 'wb') as f:
-                            f.write(download_response.content)
+                        atomic_write(output_path, download_response.content)
                         
                         print(f"   ✅ Music downloaded: {os.path.basename(output_path)}")
                         return output_path
@@ -96,6 +96,7 @@ class SoundDeptAgent:
             print("   ⚠️ No fallback music found in assets/")
             return None
     
+    @singleflight("freesound_ambient")
     def generate_ambient_sound(self, scene_type="coffee shop"):
         """
         Source ambient sound for specific scene types.
@@ -137,9 +138,7 @@ class SoundDeptAgent:
                     
                     if download_response.status_code == 200:
                         output_path = os.path.join(self.output_dir, f"ambient_{scene_type.replace(' ', '_')}.mp3")
-                        
-                        with open(output_path, 'wb') as f:
-                            f.write(download_response.content)
+                        atomic_write(output_path, download_response.content)
                         
                         print(f"   ✅ Ambient sound downloaded")
                         return output_path
@@ -1,6 +1,7 @@
 import os
 import requests
 from config import OUTPUT_DIR
+from agents.singleflight import singleflight, atomic_write
 
 class SoundEffectsAgent:
     """
@@ -11,6 +12,7 @@ class SoundEffectsAgent:
         # Freesound doesn't require API key for basic searches
         self.base_url = "https://freesound.org/apiv2"
         
+    @singleflight("freesound_sfx")
     def find_sound_effect(self, query, duration=None):
         """
         Searches for sound effects matching the query.
@@ -43,8 +45,8 @@ class SoundEffectsAgent:
                     if not os.path.exists(save_path):
                         print(f"   ⬇️ Downloading sound effect...")
                         audio_response = requests.get(preview_url)
-                        with open(save_path, 'wb') as f:
-                            f.write(audio_response.content)
+                        audio_response.raise_for_status()
+                        atomic_write(save_path, audio_response.content)
                     
                     print(f"   ✅ Sound effect acquired: {sound['name']}")
                     return save_path
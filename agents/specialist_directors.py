@@ -181,6 +181,10 @@ class TransitionsDirector(BaseDirector):
     
     def _select_transition(self, shot1, shot2):
         """Intelligently select transition type"""
+        # Respect an explicit request from the plan/script (cut, dissolve, fade, wipe)
+        requested = shot1.get('transition_to_next') if isinstance(shot1, dict) else None
+        if requested:
+            return str(requested).lower()
         # Match cut for similar shots
         # Dissolve for mood change
         # Cut for different locations
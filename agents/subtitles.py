@@ -2,6 +2,11 @@ import os
 import torch
 import warnings
 from config import OUTPUT_DIR
+from agents.audio_cache import get_audio_cache
+from agents.render_pipeline import ffmpeg_exe
+
+# Whisper's native input format
+WHISPER_SAMPLE_RATE = 16000
 
 # Suppress warnings
 warnings.filterwarnings("ignore")
@@ -11,9 +16,9 @@ class SubtitlesAgent:
         print("   📝 Initializing Local Subtitles Agent (Whisper)...")
         self.available = False
         
-        # Check for FFmpeg first
+        # Check for FFmpeg first (the audio cache decodes with MoviePy's bundled binary if present)
         import shutil
-        if not shutil.which("ffmpeg"):
+        if not shutil.which(ffmpeg_exe()):
             print("   ⚠️ FFmpeg not found. Subtitles disabled.")
             print("   👉 Install FFmpeg to enable auto-subtitles: https://ffmpeg.org/download.html")
             return
@@ -37,8 +42,9 @@ class SubtitlesAgent:
 
         print(f"   🗣️ Transcribing audio: {os.path.basename(audio_path)}...")
         try:
-            # Transcribe
-            result = self.model.transcribe(audio_path)
+            # Transcribe from the cached 16 kHz mono PCM (memory-mapped, decoded once)
+            samples = get_audio_cache().load(audio_path, sample_rate=WHISPER_SAMPLE_RATE, channels=1)
+            result = self.model.transcribe(samples.reshape(-1) if samples is not None else audio_path)
             segments = result["segments"]
 
             # Save as SRT
@@ -4,7 +4,22 @@ Delegates tasks, validates quality, ensures world-class output
 """
 import os
 import json
-from config import GROQ_API_KEY
+import copy
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import (GROQ_API_KEY, SUPER_DIRECTOR_MODE, SUPER_DIRECTOR_CANDIDATES,
+                    SUPER_DIRECTOR_PLAN_BUDGET, RETRIEVAL_TEMPLATE_SIMILARITY,
+                    RETRIEVAL_FEWSHOT_SIMILARITY, RETRIEVAL_MAX_EXAMPLES)
+from agents.llm_schemas import PLAN_SCHEMA, CRITIQUE_SCHEMA, BATCH_CRITIQUE_SCHEMA
+
+# Creative angle per speculative candidate, so parallel drafts explore different plans
+CANDIDATE_ANGLES = [
+    "Lead with emotion: build the story around one relatable human moment.",
+    "Lead with visual spectacle: bold compositions, striking light, memorable imagery.",
+    "Lead with clarity: a crisp, confident arc that makes the subject the hero.",
+    "Lead with rhythm: energetic pacing and a strong hook in the first two seconds.",
+]
 
 class SuperDirector:
     """
@@ -16,26 +31,38 @@ class SuperDirector:
         self.model = "llama-3.3-70b-versatile"
         self.quality_threshold = 0.85  # 85% minimum quality
         self.max_iterations = 3  # Maximum refinement rounds
+        self.mode = SUPER_DIRECTOR_MODE
+        self.candidates = max(1, SUPER_DIRECTOR_CANDIDATES)
+        self.plan_budget = SUPER_DIRECTOR_PLAN_BUDGET
+        self.last_planning = {}  # How the last plan was chosen (for the run report)
         
-    def plan_production(self, user_brief):
+    def plan_production(self, user_brief, references=None):
         """
         Super Director creates master plan and delegates to specialists
+        references: similar past briefs (IntelligenceAgent.similar_briefs). A near-identical
+        brief reuses its accepted plan; close ones are shown to the planner as examples.
         """
         print("\n" + "="*70)
         print("🎬 SUPER DIRECTOR: Taking control of production (Advanced Mode)")
         print("="*70)
         
-        # Create strategic production plan
-        print("   🧠 Brainstorming creative vision...")
-        plan = self._create_strategic_plan(user_brief)
-        
-        # Critique Loop
-        if plan:
-            print("   🤔 Critiquing plan for improvements...")
-            critique = self._critique_plan(user_brief, plan)
-            if critique['needs_revision']:
-                print(f"   🔄 Refining plan: {critique['reason']}")
-                plan = self._create_strategic_plan(user_brief, feedback=critique['feedback'])
+        references = [r for r in references or [] if r.get('plan')]
+        if references and references[0]['score'] >= RETRIEVAL_TEMPLATE_SIMILARITY:
+            match = references[0]
+            print(f"   📚 Reusing the plan from a similar brief ({match['score']:.0%} match): '{match['prompt'][:60]}'")
+            plan = copy.deepcopy(match['plan'])
+            # "match" is the reused entry itself, so its script comes from the same brief as the plan
+            self.last_planning = {"mode": "template", "similarity": match['score'], "source_brief": match['prompt'],
+                                  "match": match}
+        else:
+            examples = [r for r in references if r['score'] >= RETRIEVAL_FEWSHOT_SIMILARITY][:RETRIEVAL_MAX_EXAMPLES]
+            if examples:
+                print(f"   📚 {len(examples)} similar past plans as reference (best {examples[0]['score']:.0%} match)")
+            if self.mode == "speculative" and self.candidates > 1:
+                plan = self._plan_speculative(user_brief, examples)
+            else:
+                plan = self._plan_sequential(user_brief, examples)
+            self.last_planning["examples"] = len(examples)
         
         if plan:
             print(f"\n✅ STRATEGIC PLAN APPROVED")
@@ -49,10 +76,105 @@ class SuperDirector:
             
         return plan
     
-    def _create_strategic_plan(self, brief, feedback=None):
+    def _plan_sequential(self, user_brief, examples=()):
+        """Plan, critique, and re-plan once if the critic asks for it"""
+        start = time.time()
+        # Create strategic production plan
+        print("   🧠 Brainstorming creative vision...")
+        plan = self._create_strategic_plan(user_brief, examples=examples)
+        
+        # Critique Loop
+        revised = False
+        if plan:
+            print("   🤔 Critiquing plan for improvements...")
+            critique = self._critique_plan(user_brief, plan)
+            if critique['needs_revision']:
+                print(f"   🔄 Refining plan: {critique['reason']}")
+                plan = self._create_strategic_plan(user_brief, feedback=critique['feedback'], examples=examples)
+                revised = True
+        self.last_planning = {"mode": "sequential", "revised": revised,
+                              "elapsed_s": round(time.time() - start, 1)}
+        return plan
+
+    def _plan_speculative(self, user_brief, examples=()):
+        """
+        Draft K candidate plans in parallel, score them in one batched critique and accept
+        the first (in arrival order) that clears quality_threshold. Otherwise the best one
+        seeds the next round's feedback, until max_iterations or the wall-clock budget.
+        """
+        start = time.time()
+        deadline = start + self.plan_budget
+        best, best_score, feedback = None, -1.0, None
+        rounds = []
+        pool = ThreadPoolExecutor(max_workers=self.candidates, thread_name_prefix="plan-candidate")
+        try:
+            for iteration in range(1, self.max_iterations + 1):
+                print(f"   🧠 Brainstorming {self.candidates} candidate plans in parallel (round {iteration})...")
+                # Set at the deadline: drafts still streaming stop and give their LLM slot back
+                cancel = threading.Event()
+                futures = {
+                    pool.submit(self._create_strategic_plan, user_brief, feedback,
+                                CANDIDATE_ANGLES[k % len(CANDIDATE_ANGLES)], 0.8 + 0.1 * k, False, examples,
+                                cancel): k
+                    for k in range(self.candidates)
+                }
+                candidates = []  # Arrival order
+                pending = set(futures)
+                while pending and time.time() < deadline:
+                    done, pending = wait(pending, timeout=deadline - time.time(), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        try:
+                            plan = future.result()
+                        except Exception as e:
+                            print(f"      ⚠️ Candidate {futures[future] + 1} failed: {e}")
+                            continue
+                        if plan and plan.get('shots'):
+                            candidates.append(plan)
+                if pending:
+                    cancel.set()
+                    for future in pending:
+                        future.cancel()
+                if not candidates:
+                    rounds.append({"round": iteration, "candidates": 0})
+                    break
+
+                if time.time() >= deadline:
+                    # No time for a critique: take the best plan so far, else the first draft
+                    best = best or candidates[0]
+                    rounds.append({"round": iteration, "candidates": len(candidates), "critique": "skipped (budget)"})
+                    break
+
+                print(f"   🤔 Critiquing {len(candidates)} candidates in one pass...")
+                reviews = self._critique_candidates(user_brief, candidates)
+                scores = [reviews.get(i, {}).get('score', 0.0) for i in range(len(candidates))]
+                rounds.append({"round": iteration, "candidates": len(candidates),
+                               "scores": [round(score, 2) for score in scores]})
+                for i, plan in enumerate(candidates):
+                    if scores[i] >= self.quality_threshold:
+                        print(f"   ✅ Candidate accepted (score {scores[i]:.0%}, round {iteration})")
+                        best, best_score = plan, scores[i]
+                        return best
+                    if scores[i] > best_score:
+                        best, best_score = plan, scores[i]
+                        feedback = reviews.get(i, {}).get('feedback') or feedback
+
+                if time.time() >= deadline:
+                    break
+                print(f"   🔄 Best candidate scored {best_score:.0%} (< {self.quality_threshold:.0%}), refining...")
+            if best is not None:
+                print(f"   ⏱️ Using best candidate so far (score {max(best_score, 0):.0%})")
+            return best
+        finally:
+            pool.shutdown(wait=False)
+            self.last_planning = {"mode": "speculative", "candidates": self.candidates, "rounds": rounds,
+                                  "accepted_score": round(best_score, 2) if best is not None and best_score >= 0 else None,
+                                  "elapsed_s": round(time.time() - start, 1), "budget_s": self.plan_budget}
+
+    def _create_strategic_plan(self, brief, feedback=None, angle=None, temperature=0.9, hedge=True, examples=(),
+                               cancel=None):
         """Create high-level strategic vision with CoT"""
         from agents.llm_client import LLMClient
-        client = LLMClient()
+        client = LLMClient(agent="super_director")
         
         base_prompt = f"""You are a SUPER DIRECTOR - Chief Creative Officer of a world-class production studio.
 USER BRIEF: {brief}
@@ -64,9 +186,20 @@ Think step-by-step:
 2. Determine the best visual style (Cinematic, Documentary, etc.).
 3. Outline 5-7 distinct shots that tell a cohesive story.
 4. Define technical requirements for each shot.
+5. Choose each shot's source: "STOCK" for most shots (90%), "GENERATE" ONLY for
+   branded elements or impossible scenarios. When uncertain -> STOCK.
 
 OUTPUT JSON ONLY."""
 
+        if examples:
+            base_prompt += "\n\nPLANS THAT WORKED FOR SIMILAR BRIEFS (for reference, do not copy):"
+            for example in examples:
+                shots = [{k: shot.get(k) for k in ('duration', 'visual', 'purpose', 'pacing', 'source_type')}
+                         for shot in example['plan'].get('shots', []) if isinstance(shot, dict)]
+                base_prompt += (f"\nBRIEF: {example['prompt']}\n"
+                                f"{json.dumps({'vision': example['plan'].get('vision'), 'style': example['plan'].get('style'), 'shots': shots})}")
+        if angle:
+            base_prompt += f"\n\nCREATIVE DIRECTION: {angle}"
         if feedback:
             prompt = f"{base_prompt}\n\nCRITIQUE FEEDBACK FROM PREVIOUS DRAFT: {feedback}\n\nImprove the plan based on this feedback."
         else:
@@ -74,7 +207,7 @@ OUTPUT JSON ONLY."""
 
 STRUCTURE:
 1. CREATIVE VISION (Emotional goal, visual style)
-2. SHOT LIST (5-7 shots with duration, visual description, purpose)
+2. SHOT LIST (5-7 shots with duration, visual description, purpose, pacing, source)
 3. TECHNICAL SPECS (Resolution, FPS, Color Grade)
 
 OUTPUT as JSON:
@@ -87,8 +220,10 @@ OUTPUT as JSON:
       "number": 1,
       "duration": 5,
       "visual": "Description...",
-      "purpose": "Why this shot?",
-      "technical": "Camera angle, lighting"
+      "purpose": "Why this shot? (hook, build, climax, product reveal, call to action)",
+      "pacing": "slow | medium | fast",
+      "technical": "Camera angle, lighting",
+      "source_type": "STOCK | GENERATE"
     }}
   ]
 }}"""
@@ -97,12 +232,14 @@ OUTPUT as JSON:
         system_prompt = "You are a world-class Super Director. You think deeply before planning. Output valid JSON."
         
         # Call LLM Client
-        return client.generate(system_prompt, prompt, temperature=0.9, json_mode=True)
+        return client.generate(system_prompt, prompt, temperature=temperature, json_mode=True,
+                               task="super_director", hedge=hedge, schema=PLAN_SCHEMA,
+                               cancel=cancel)
 
     def _critique_plan(self, brief, plan):
         """Self-Correction Loop: Critiques the plan"""
         from agents.llm_client import LLMClient
-        client = LLMClient()
+        client = LLMClient(agent="super_director")
         
         prompt = f"""Act as a ruthless FILM CRITIC.
 Review this production plan for the brief: "{brief}"
@@ -122,12 +259,58 @@ OUTPUT JSON: {{ "needs_revision": bool, "reason": "str", "feedback": "str" }}"""
         system_prompt = "You are a critical film expert. Output valid JSON."
         
         try:
-            result = client.generate(system_prompt, prompt, temperature=0.7, json_mode=True)
+            result = client.generate(system_prompt, prompt, temperature=0.7, json_mode=True,
+                                     task="super_director", hedge=True, schema=CRITIQUE_SCHEMA)
             if result: return result
             return {"needs_revision": False, "reason": "Correction unavailable", "feedback": ""}
         except:
              return {"needs_revision": False, "reason": "Error in critic", "feedback": ""}
     
+    def _critique_candidates(self, brief, plans):
+        """One critique call scoring every candidate plan. Returns {index: review} (0-based)"""
+        from agents.llm_client import LLMClient
+        client = LLMClient(agent="super_director")
+
+        listed = "\n\n".join(f"CANDIDATE {i}:\n{json.dumps(plan, indent=2)}" for i, plan in enumerate(plans, start=1))
+        prompt = f"""Act as a ruthless FILM CRITIC.
+Score each candidate production plan for the brief: "{brief}"
+
+{listed}
+
+Check each for:
+1. Boring or generic visuals.
+2. Lack of narrative arc.
+3. Impossible shots.
+
+Score from 0.0 (unusable) to 1.0 (world-class). Give specific feedback for improving it.
+
+OUTPUT JSON: {{ "reviews": [{{ "index": 1, "score": 0.0, "reason": "str", "feedback": "str" }}] }}"""
+
+        system_prompt = "You are a critical film expert. Output valid JSON."
+
+        try:
+            result = client.generate(system_prompt, prompt, temperature=0.3, json_mode=True,
+                                     task="super_director", hedge=True, schema=BATCH_CRITIQUE_SCHEMA)
+        except Exception as e:
+            print(f"   ⚠️ Batched critique failed: {e}")
+            result = None
+        reviews = {}
+        for review in (result or {}).get('reviews', []) if isinstance(result, dict) else []:
+            try:
+                index = int(review.get('index')) - 1
+                score = float(review.get('score', 0.0))
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < len(plans):
+                # Some models answer on a 0-10 scale
+                review['score'] = score / 10 if score > 1 else score
+                reviews[index] = review
+        if not reviews:
+            # No usable critique: let the first candidate through rather than re-plan blind
+            print("   ⚠️ Critique unavailable, accepting the first candidate")
+            reviews[0] = {"score": 1.0, "feedback": ""}
+        return reviews
+
     def _create_delegations(self, plan):
         """Create specific delegation instructions for each specialist"""
         delegations = {
@@ -0,0 +1,163 @@
+"""
+Transition Engine - Implements TransitionsDirector specs on the Editor timeline
+Hard cuts by default; frames are only blended inside each transition window:
+- Shots are chained back-to-back (no full-timeline canvas compositing)
+- Each non-cut boundary becomes a short overlap clip (A tail + B head)
+- Dissolve, fade-through-black and wipes are vectorized NumPy blends into
+  preallocated buffers, so a transition costs only its overlap frames
+"""
+import numpy as np
+from moviepy.editor import VideoClip, CompositeAudioClip, concatenate_videoclips
+
+# Transition type aliases -> blend implementation
+TRANSITION_TYPES = {
+    "dissolve": "dissolve",
+    "crossfade": "dissolve",
+    "cross_dissolve": "dissolve",
+    "fade": "fade",
+    "fade_black": "fade",
+    "dip_to_black": "fade",
+    "wipe": "wipe_left",
+    "wipe_left": "wipe_left",
+    "wipe_right": "wipe_right",
+}
+
+EASINGS = {
+    "linear": lambda p: p,
+    "smooth": lambda p: p * p * (3 - 2 * p),  # smoothstep
+    "ease_in": lambda p: p * p,
+    "ease_out": lambda p: 1 - (1 - p) * (1 - p),
+}
+
+
+class TransitionBlender:
+    """Blends two equally sized uint8 frames at progress p (0 -> A, 1 -> B)"""
+    def __init__(self, kind, size):
+        self.kind = kind
+        w, h = size
+        self.out = np.empty((h, w, 3), dtype=np.uint8)
+        self.acc = np.empty((h, w, 3), dtype=np.uint16)
+        self.tmp = np.empty((h, w, 3), dtype=np.uint16)
+
+    def __call__(self, a, b, p):
+        a = a[:, :, :3]
+        b = b[:, :, :3]
+        if self.kind == "dissolve":
+            self._mix(a, b, int(round(p * 256)))
+        elif self.kind == "fade":
+            # A fades to black over the first half, B fades up over the second
+            if p < 0.5:
+                self._scale(a, int(round((1 - 2 * p) * 256)))
+            else:
+                self._scale(b, int(round((2 * p - 1) * 256)))
+        else:
+            width = a.shape[1]
+            edge = int(round(p * width))
+            if self.kind == "wipe_left":
+                # B enters from the right edge, sweeping leftwards
+                np.copyto(self.out[:, :width - edge], a[:, :width - edge])
+                np.copyto(self.out[:, width - edge:], b[:, width - edge:])
+            else:
+                np.copyto(self.out[:, :edge], b[:, :edge])
+                np.copyto(self.out[:, edge:], a[:, edge:])
+        return self.out
+
+    def _mix(self, a, b, w):
+        """out = (a * (256 - w) + b * w) >> 8, fixed point"""
+        np.multiply(a, 256 - w, out=self.acc, dtype=np.uint16)
+        np.multiply(b, w, out=self.tmp, dtype=np.uint16)
+        np.add(self.acc, self.tmp, out=self.acc)
+        np.right_shift(self.acc, 8, out=self.acc)
+        np.copyto(self.out, self.acc, casting='unsafe')
+
+    def _scale(self, frame, w):
+        np.multiply(frame, w, out=self.acc, dtype=np.uint16)
+        np.right_shift(self.acc, 8, out=self.acc)
+        np.copyto(self.out, self.acc, casting='unsafe')
+
+
+def make_transition_clip(clip_a, clip_b, kind, duration, easing="smooth"):
+    """Overlap clip: last `duration` seconds of A blended into first `duration` of B"""
+    blender = TransitionBlender(kind, clip_a.size)
+    ease = EASINGS.get(easing, EASINGS["smooth"])
+    offset = clip_a.duration - duration
+
+    def make_frame(t):
+        p = ease(min(max(t / duration, 0.0), 1.0))
+        return blender(clip_a.get_frame(offset + t), clip_b.get_frame(t), p)
+
+    clip = VideoClip(make_frame, duration=duration)
+    layers = []
+    if clip_a.audio is not None:
+        layers.append(clip_a.audio.subclip(offset, clip_a.duration))
+    if clip_b.audio is not None:
+        layers.append(clip_b.audio.subclip(0, duration))
+    if layers:
+        clip = clip.set_audio(CompositeAudioClip(layers).set_duration(duration))
+    return clip
+
+
+def resolve_transitions(segments, transitions):
+    """
+    Map TransitionsDirector specs onto the clips actually on the timeline.
+    Returns one (kind, duration, easing) or None (hard cut) per boundary.
+    """
+    by_pair = {}
+    for spec in transitions or []:
+        if isinstance(spec, dict):
+            by_pair[(spec.get('from_shot'), spec.get('to_shot'))] = spec
+
+    boundaries = []
+    for left, right in zip(segments, segments[1:]):
+        spec = by_pair.get((left['scene_index'] + 1, right['scene_index'] + 1))
+        kind = TRANSITION_TYPES.get(str(spec.get('type', 'cut')).lower()) if spec else None
+        if not kind:
+            boundaries.append(None)
+            continue
+        # Never let a transition eat more than half of either shot
+        duration = min(float(spec.get('duration', 0.5)), left['duration'] / 2, right['duration'] / 2)
+        boundaries.append((kind, duration, spec.get('easing', 'smooth')) if duration > 0 else None)
+    return boundaries
+
+
+def has_blends(transitions):
+    """True if any TransitionsDirector spec is more than a hard cut"""
+    for spec in transitions or []:
+        if isinstance(spec, dict) and TRANSITION_TYPES.get(str(spec.get('type', 'cut')).lower()):
+            try:
+                if float(spec.get('duration', 0.5)) > 0:
+                    return True
+            except (TypeError, ValueError):
+                continue
+    return False
+
+
+def build_timeline(clips, segments, transitions):
+    """
+    Assemble the master timeline: chained hard cuts plus overlap-only transitions.
+    Falls back to canvas compositing only if clip sizes differ.
+    """
+    boundaries = resolve_transitions(segments, transitions)
+    uniform = len({tuple(c.size) for c in clips}) == 1
+    if not uniform:
+        print("      ⚠️ Mixed clip sizes: transitions skipped, compositing timeline")
+        return concatenate_videoclips(clips, method="compose")
+
+    pieces = []
+    for k, clip in enumerate(clips):
+        head = boundaries[k - 1][1] if k > 0 and boundaries[k - 1] else 0
+        tail = boundaries[k][1] if k < len(boundaries) and boundaries[k] else 0
+        if head or tail:
+            body = clip.subclip(head, clip.duration - tail) if clip.duration - head - tail > 1e-3 else None
+        else:
+            body = clip
+        if body is not None:
+            pieces.append(body)
+        if tail:
+            kind, duration, easing = boundaries[k]
+            pieces.append(make_transition_clip(clip, clips[k + 1], kind, duration, easing))
+
+    blended = sum(1 for b in boundaries if b)
+    if blended:
+        print(f"      🔀 Transitions: {blended} blended, {len(boundaries) - blended} hard cuts")
+    return concatenate_videoclips(pieces, method="chain")
@@ -1,6 +1,7 @@
 import os
 import requests
 from config import ASSETS_DIR
+from agents.singleflight import singleflight, atomic_write
 
 class UnsplashAgent:
     """
@@ -13,6 +14,7 @@ class UnsplashAgent:
         # Users can get free key at unsplash.com/developers
         self.client_id = "demo"  # Replace with actual key for production
         
+    @singleflight("unsplash")
     def search_photo(self, query, orientation="landscape"):
         """
         Searches for high-quality photos.
@@ -41,11 +43,9 @@ class UnsplashAgent:
             
             if not os.path.exists(save_path):
                 print(f"   ⬇️ Downloading high-res photo...")
-                response = requests.get(direct_url, stream=True)
+                response = requests.get(direct_url)
                 if response.status_code == 200:
-                    with open(save_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
+                    atomic_write(save_path, response.content)
                     print(f"   ✅ Photo acquired from Unsplash")
                     return save_path
                 else:
@@ -5,6 +5,7 @@ Professional text-to-speech with natural voices, no MoviePy timing errors
 import os
 import asyncio
 from config import OUTPUT_DIR
+from agents.singleflight import singleflight, temp_path_for
 
 class VoiceoverAgent:
     """
@@ -40,6 +41,22 @@ class VoiceoverAgent:
             print(f"   ❌ Edge TTS error: {e}")
             return False
     
+    @singleflight("tts", key=lambda self, text, output_path, voice: (text, voice))
+    def _synthesize(self, text, output_path, voice):
+        """
+        Speak text into output_path (temp file + rename, so readers never see a partial WAV).
+        Concurrent requests for the same line share one synthesis and its file.
+        """
+        tmp_path = temp_path_for(output_path)
+        try:
+            if not asyncio.run(self._generate_speech_async(text, tmp_path, voice)):
+                return None
+            os.replace(tmp_path, output_path)
+            return output_path
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
     def create_voiceover(self, script_scenes, voice="female_us"):
         """
         Generates voiceover from script scenes using Edge TTS.
@@ -72,11 +89,9 @@ class VoiceoverAgent:
             output_path = os.path.join(self.output_dir, "voiceover.wav")
             
             # Run async generation
-            success = asyncio.run(
-                self._generate_speech_async(voiceover_text, output_path, voice)
-            )
+            output_path = self._synthesize(voiceover_text, output_path, voice)
             
-            if success and os.path.exists(output_path):
+            if output_path and os.path.exists(output_path):
                 file_size = os.path.getsize(output_path) / 1024  # KB
                 print(f"   ✅ Voiceover generated: {os.path.basename(output_path)} ({file_size:.1f}KB)")
                 return output_path
@@ -101,21 +116,15 @@ class VoiceoverAgent:
         """
         try:
             output_path = os.path.join(self.output_dir, "vo_snippet.wav")
-            success = asyncio.run(
-                self._generate_speech_async(text, output_path, voice)
-            )
-            return output_path if success else None
+            return self._synthesize(text, output_path, voice)
         except Exception as e:
             print(f"   ❌ Short VO failed: {e}")
             return None
-    async def _generate_scene_audio(self, scene_text, scene_index, voice):
+    def _generate_scene_audio(self, scene_text, scene_index, voice):
         """Generates audio for a single scene"""
         filename = f"vo_scene_{scene_index}_{voice}.wav"
         output_path = os.path.join(self.output_dir, filename)
-        
-        if await self._generate_speech_async(scene_text, output_path, voice):
-            return output_path
-        return None
+        return self._synthesize(scene_text, output_path, voice)
 
     def generate_scene_voiceovers(self, script_scenes, voice="female_us"):
         """
@@ -124,19 +133,22 @@ class VoiceoverAgent:
         """
         print(f"   🎙️ Generating per-scene voiceovers ({voice})...")
         
-        import asyncio
         updated_scenes = []
         
         for i, scene in enumerate(script_scenes):
-            text = scene.get('voiceover', '')
-            if text:
-                print(f"      🗣️ Scene {i+1}: {text[:30]}...")
-                # Run async generation for this scene
-                path = asyncio.run(self._generate_scene_audio(text, i+1, voice))
-                if path:
-                    scene['voiceover_path'] = path
-                    # Optional: Get duration to update scene length?
-                    # For now just save the path.
+            # Scenes voiced early (while the script was still streaming) keep their take
+            if not scene.get('voiceover_path'):
+                self.generate_scene_voiceover(scene, i, voice)
             updated_scenes.append(scene)
             
         return updated_scenes
+
+    def generate_scene_voiceover(self, scene, i, voice="female_us"):
+        """Voice a single scene in place; safe to call from a worker thread."""
+        text = scene.get('voiceover', '')
+        if text:
+            print(f"      🗣️ Scene {i+1}: {text[:30]}...")
+            path = self._generate_scene_audio(text, i+1, voice)
+            if path:
+                scene['voiceover_path'] = path
+        return scene.get('voiceover_path')
@@ -16,19 +16,32 @@ from config import (
     OPENAI_TTS_MODEL, OPENAI_TTS_VOICE,
     OPENAI_API_KEY
 )
+from agents.singleflight import singleflight, temp_path_for
 
 class PremiumVoiceoverAgent:
     def __init__(self):
         self.provider = VOICEOVER_PROVIDER
         print(f"🎙️ Premium Voiceover Agent initialized (Provider: {self.provider})")
 
+    @singleflight("tts_premium", key=lambda self, text, output_path: (self.provider, text))
     def generate_voiceover(self, text, output_path):
-        """Generates voiceover using the configured provider."""
+        """
+        Generates voiceover using the configured provider.
+        Providers write to a temp file that is renamed into place on success.
+        """
         if not text:
             return None
 
         print(f"   🎙️ Generating voiceover: '{text[:30]}...'")
-        
+        final_path, output_path = output_path, temp_path_for(output_path)
+        try:
+            return self._generate_with_fallback(text, output_path, final_path)
+        finally:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+
+    def _generate_with_fallback(self, text, output_path, final_path):
+        """Primary provider, then Edge-TTS; renames output_path to final_path on success"""
         # Try Primary Provider
         success = False
         if self.provider == "elevenlabs":
@@ -44,7 +57,8 @@ class PremiumVoiceoverAgent:
             success = self._generate_edge_tts(text, output_path)
 
         if success:
-            return output_path
+            os.replace(output_path, final_path)
+            return final_path
         else:
             print("   ❌ Voiceover generation failed.")
             return None
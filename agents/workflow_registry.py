@@ -0,0 +1,148 @@
+"""
+Workflow Registry - Load each ComfyUI workflow once, fill named parameters per job
+- Templates are read and validated once per process (API format, links resolve)
+- Named parameters (prompt, negative, seed, width, height, frames, image, filename_prefix)
+  are resolved to (node_id, input) paths up front, following the sampler's
+  positive/negative links so the negative prompt is never overwritten
+- instantiate() copies only the node and input dicts (links are shared, never mutated),
+  so every job gets an independent graph without a deepcopy
+"""
+import os
+import json
+import threading
+
+from config import WORKFLOWS_DIR
+
+PARAMS = ("prompt", "negative", "seed", "width", "height", "frames", "image", "filename_prefix")
+
+# Input names that carry each non-prompt parameter, on any node
+PARAM_INPUTS = {
+    "seed": ("seed", "noise_seed"),
+    "width": ("width",),
+    "height": ("height",),
+    "frames": ("length", "frames", "num_frames", "video_length"),
+    "image": ("image",),
+    "filename_prefix": ("filename_prefix",),
+}
+
+
+def _is_link(value):
+    return isinstance(value, list) and len(value) == 2 and isinstance(value[0], str)
+
+
+def validate(name, graph):
+    """Raise ValueError unless graph is an API-format workflow whose links all resolve"""
+    if not isinstance(graph, dict) or not graph:
+        raise ValueError(f"Workflow '{name}' is empty")
+    if "nodes" in graph and "links" in graph:
+        raise ValueError(f"Workflow '{name}' is in UI format; export it with 'Save (API Format)'")
+    problems = []
+    for node_id, node in graph.items():
+        if not isinstance(node, dict) or "class_type" not in node or not isinstance(node.get("inputs"), dict):
+            problems.append(f"node {node_id} has no class_type/inputs")
+            continue
+        for input_name, value in node["inputs"].items():
+            if _is_link(value) and value[0] not in graph:
+                problems.append(f"node {node_id}.{input_name} links to missing node {value[0]}")
+    if problems:
+        raise ValueError(f"Workflow '{name}' is invalid: " + "; ".join(problems))
+
+
+def resolve_params(graph):
+    """{param: [(node_id, input_name), ...]} for every named parameter the graph exposes"""
+    params = {}
+
+    def add(param, node_id, input_name):
+        params.setdefault(param, [])
+        if (node_id, input_name) not in params[param]:
+            params[param].append((node_id, input_name))
+
+    # Prompts: text nodes feeding a sampler's positive / negative input
+    for node in graph.values():
+        for slot, param in (("positive", "prompt"), ("negative", "negative")):
+            link = node["inputs"].get(slot)
+            if _is_link(link) and "text" in graph[link[0]]["inputs"]:
+                add(param, link[0], "text")
+    if "prompt" not in params:
+        # No sampler wiring to follow: the first text encoder that is not the negative
+        negatives = set(params.get("negative", []))
+        for node_id, node in graph.items():
+            if isinstance(node["inputs"].get("text"), str) and (node_id, "text") not in negatives:
+                add("prompt", node_id, "text")
+                break
+
+    for node_id, node in graph.items():
+        for param, names in PARAM_INPUTS.items():
+            for input_name in names:
+                # Only literal values: a linked input is set by its source node
+                if input_name in node["inputs"] and not _is_link(node["inputs"][input_name]):
+                    add(param, node_id, input_name)
+    return params
+
+
+class WorkflowTemplate:
+    def __init__(self, name, graph):
+        validate(name, graph)
+        self.name = name
+        self.graph = graph
+        self.params = resolve_params(graph)
+
+    def supports(self, param):
+        return param in self.params
+
+    def instantiate(self, **values):
+        """
+        Independent job graph with the given parameters filled in.
+        Parameters this workflow does not expose are ignored; None leaves the template value.
+        """
+        unknown = set(values) - set(PARAMS)
+        if unknown:
+            raise KeyError(f"Unknown workflow parameter(s): {', '.join(sorted(unknown))}")
+        job = {node_id: {**node, "inputs": dict(node["inputs"])} for node_id, node in self.graph.items()}
+        for param, value in values.items():
+            if value is None:
+                continue
+            for node_id, input_name in self.params.get(param, ()):
+                job[node_id]["inputs"][input_name] = value
+        return job
+
+
+class WorkflowRegistry:
+    def __init__(self, directory=WORKFLOWS_DIR):
+        self.directory = directory
+        self.templates = {}
+        self.lock = threading.Lock()
+
+    def get(self, name):
+        """
+        Template for workflows/{name}_workflow_api.json, loaded and validated on first use.
+        Raises FileNotFoundError or ValueError.
+        """
+        with self.lock:
+            if name in self.templates:
+                return self.templates[name]
+        path = os.path.join(self.directory, f"{name}_workflow_api.json")
+        with open(path, 'r') as f:
+            template = WorkflowTemplate(name, json.load(f))
+        with self.lock:
+            return self.templates.setdefault(name, template)
+
+    def register(self, name, graph):
+        """Register a workflow defined in code (validated like file templates)"""
+        template = WorkflowTemplate(name, graph)
+        with self.lock:
+            self.templates[name] = template
+        return template
+
+
+_shared_registry = None
+_shared_lock = threading.Lock()
+
+
+def get_workflow_registry():
+    """Process-wide WorkflowRegistry"""
+    global _shared_registry
+    with _shared_lock:
+        if _shared_registry is None:
+            _shared_registry = WorkflowRegistry()
+        return _shared_registry
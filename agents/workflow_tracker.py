@@ -17,6 +17,7 @@ class WorkflowTracker:
         self.clips_manifest = []
         self.editing_log = []
         self.merge_plan = []
+        self.metrics = {}
         
     def log_decision(self, agent, decision_type, decision, rationale):
         """Log an AI decision with rationale."""
@@ -30,6 +31,10 @@ class WorkflowTracker:
         self.decisions.append(entry)
         print(f"   🧠 {agent}: {decision} - {rationale}")
     
+    def log_metrics(self, section, data):
+        """Attach run-level metrics (caches, usage, health) to the report."""
+        self.metrics[section] = data
+    
     def register_clip(self, clip_number, source, path, metadata):
         """Register a clip with full metadata."""
         clip_info = {
@@ -99,6 +104,7 @@ class WorkflowTracker:
             "clips_manifest": self.clips_manifest,
             "editing_log": self.editing_log,
             "merge_plan": self.merge_plan,
+            "metrics": self.metrics,
             "generated_at": datetime.now().isoformat()
         }
         
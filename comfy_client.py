@@ -1,17 +1,366 @@
 """
 Enhanced ComfyUI Client with Auto-Start and LTX-Video Support
 Integrates ComfyUI server management and workflow execution
+- One WebSocket per server per process (ComfyEventStream), shared by every agent:
+  executing / progress / executed / execution_error events are routed by prompt_id
+  into futures, so completion is seen within milliseconds without polling /history
+- One client ID for the whole process, so every queued prompt reports to that socket
+- A pool of backends (COMFYUI_BACKENDS): each job goes to the least-loaded server that
+  has the workflow's nodes and models, and is resubmitted elsewhere if its server dies
 """
 import os
 import sys
 import json
 import time
+import uuid
 import requests
-import websocket
 import subprocess
 import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 from pathlib import Path
-from config import COMFYUI_HOST, COMFYUI_PORT
+try:
+    import websocket  # Requires websocket-client
+except ImportError:
+    websocket = None
+from config import (COMFYUI_HOST, COMFYUI_PORT, COMFYUI_JOB_TIMEOUT, COMFYUI_BACKENDS,
+                    COMFYUI_STATS_TTL, COMFYUI_HEALTH_INTERVAL, OUTPUT_DIR)
+from agents.output_retrieval import get_output_retriever, RetrievalError
+
+# Every prompt this process queues reports its events to this client ID
+CLIENT_ID = f"hollywood_studio_{uuid.uuid4().hex[:8]}"
+
+
+class ComfyJobError(Exception):
+    """A queued prompt failed or was interrupted on the ComfyUI server"""
+
+
+class ComfyEventStream:
+    """
+    Long-lived WebSocket to one ComfyUI server, demultiplexing events by prompt_id.
+    Reconnects with backoff; after a reconnect, pending prompts are reconciled against
+    /history so a completion missed while disconnected still resolves its future.
+    """
+    FINISHED_LIMIT = 256  # Resolved jobs kept so a late register() still sees the result
+
+    def __init__(self, url):
+        self.url = url
+        self.ws_url = url.replace("http://", "ws://").replace("https://", "wss://") + f"/ws?clientId={CLIENT_ID}"
+        self.lock = threading.Lock()
+        self.jobs = {}  # prompt_id -> {"future", "outputs", "progress"}; events may precede register()
+        self.connected = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"comfy-events-{url}", daemon=True)
+        self.thread.start()
+
+    def register(self, prompt_id):
+        """Future resolving to the prompt's outputs ({node_id: output}) or raising ComfyJobError"""
+        with self.lock:
+            return self._job(prompt_id)["future"]
+
+    def wait_connected(self, timeout=5):
+        """Give a fresh stream a moment to connect, so the first job's events are not missed"""
+        return self.connected.wait(timeout)
+
+    def _job(self, prompt_id):
+        """Job slot for prompt_id, created on first sight (caller holds the lock)"""
+        job = self.jobs.get(prompt_id)
+        if job is None:
+            job = self.jobs[prompt_id] = {"future": Future(), "outputs": {}, "progress": None}
+            finished = [pid for pid, j in self.jobs.items() if j["future"].done()]
+            for pid in finished[:max(0, len(finished) - self.FINISHED_LIMIT)]:
+                del self.jobs[pid]
+        return job
+
+    def progress(self, prompt_id):
+        """(value, max) of the running sampler, or None"""
+        with self.lock:
+            job = self.jobs.get(prompt_id)
+            return job["progress"] if job else None
+
+    def _run(self):
+        backoff = 1
+        while True:
+            ws = None
+            try:
+                ws = websocket.WebSocket()
+                ws.connect(self.ws_url, timeout=5)
+                ws.settimeout(30)  # Idle heartbeat: recv wakes up so a dead socket is noticed
+                self.connected.set()
+                backoff = 1
+                self._reconcile()
+                while True:
+                    try:
+                        message = ws.recv()
+                    except websocket.WebSocketTimeoutException:
+                        ws.ping()
+                        continue
+                    if isinstance(message, str):
+                        self._dispatch(json.loads(message))
+                    # Binary frames are live previews: ignored
+            except Exception as e:
+                if self.connected.is_set():
+                    print(f"   ⚠️ ComfyUI event stream lost ({e.__class__.__name__}), reconnecting...")
+                self.connected.clear()
+            finally:
+                if ws is not None:
+                    try:
+                        ws.close()
+                    except Exception:
+                        pass
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def _dispatch(self, message):
+        kind = message.get("type")
+        data = message.get("data") or {}
+        prompt_id = data.get("prompt_id")
+        if not prompt_id:
+            return
+        if kind == "progress":
+            with self.lock:
+                self._job(prompt_id)["progress"] = (data.get("value"), data.get("max"))
+        elif kind == "executed" and data.get("node") is not None:
+            with self.lock:
+                self._job(prompt_id)["outputs"][data["node"]] = data.get("output") or {}
+        elif kind == "executing" and data.get("node") is None:
+            self._finish(prompt_id, None, None)
+        elif kind == "execution_success":
+            self._finish(prompt_id, None, None)
+        elif kind in ("execution_error", "execution_interrupted"):
+            detail = data.get("exception_message") or kind.replace("_", " ")
+            self._finish(prompt_id, None, f"{data.get('node_type', 'node')} {data.get('node_id', '')}: {detail}".strip())
+
+    def _finish(self, prompt_id, outputs, error):
+        with self.lock:
+            job = self._job(prompt_id)
+            if job["future"].done():
+                return
+            if error:
+                job["future"].set_exception(ComfyJobError(error))
+            else:
+                job["future"].set_result(outputs or job["outputs"])
+
+    def _reconcile(self):
+        """Resolve pending prompts that finished while the socket was down"""
+        with self.lock:
+            pending = [pid for pid, job in self.jobs.items() if not job["future"].done()]
+        for prompt_id in pending:
+            try:
+                response = requests.get(f"{self.url}/history/{prompt_id}", timeout=5)
+                entry = response.json().get(prompt_id) if response.status_code == 200 else None
+            except Exception:
+                continue
+            if not entry:
+                continue
+            status = entry.get("status", {})
+            if status.get("status_str") == "error":
+                self._finish(prompt_id, None, "execution error (reported by /history)")
+            elif status.get("completed"):
+                self._finish(prompt_id, entry.get("outputs", {}), None)
+
+
+_event_streams = {}
+_event_lock = threading.Lock()
+
+
+def get_event_stream(url):
+    """Process-wide ComfyEventStream for a server URL (None without websocket-client)"""
+    if websocket is None:
+        return None
+    with _event_lock:
+        if url not in _event_streams:
+            _event_streams[url] = ComfyEventStream(url)
+        return _event_streams[url]
+
+
+def workflow_models(workflow):
+    """Model files a workflow loads (values of *_name inputs such as ckpt_name, unet_name)"""
+    return {value for node in workflow.values() if isinstance(node, dict)
+            for name, value in node.get("inputs", {}).items()
+            if name.endswith("_name") and isinstance(value, str) and "." in value}
+
+
+class ComfyBackend:
+    """One ComfyUI server: liveness, load and what it can run"""
+    def __init__(self, url):
+        self.url = url
+        self.lock = threading.Lock()
+        self.alive = False
+        self.checked_at = 0.0
+        self.last_error = None
+        self.queue_depth = 0    # Running + pending, from /queue
+        self.assigned = 0       # Jobs we sent since that snapshot
+        self.vram_free = None
+        self.vram_total = None
+        self.warm_models = set()  # Models of the last workflow we ran there (ComfyUI keeps them loaded)
+        self.object_info = None   # Node classes and their input options (installed models)
+        self.submitted = 0
+
+    def refresh(self, force=False, timeout=2):
+        """Update liveness, queue depth and VRAM (at most every COMFYUI_STATS_TTL seconds)"""
+        with self.lock:
+            if not force and time.time() - self.checked_at < COMFYUI_STATS_TTL:
+                return self.alive
+            self.checked_at = time.time()
+        try:
+            stats = requests.get(f"{self.url}/system_stats", timeout=timeout).json()
+            queue = requests.get(f"{self.url}/queue", timeout=timeout).json()
+        except Exception as e:
+            with self.lock:
+                if self.alive:
+                    print(f"   ⚠️ ComfyUI backend {self.url} unreachable: {e.__class__.__name__}")
+                self.alive = False
+                self.last_error = str(e)[:200]
+            return False
+        devices = stats.get("devices") or []
+        with self.lock:
+            revived = not self.alive
+            self.alive = True
+            self.queue_depth = len(queue.get("queue_running", [])) + len(queue.get("queue_pending", []))
+            self.assigned = 0
+            self.vram_free = sum(d.get("vram_free", 0) for d in devices) if devices else None
+            self.vram_total = sum(d.get("vram_total", 0) for d in devices) if devices else None
+        if revived or self.object_info is None:
+            self._load_object_info(timeout)
+        return True
+
+    def _load_object_info(self, timeout):
+        try:
+            self.object_info = requests.get(f"{self.url}/object_info", timeout=max(timeout, 10)).json()
+        except Exception:
+            self.object_info = None  # Unknown: assume compatible
+
+    def supports(self, workflow):
+        """Has the workflow's node classes and model files installed (True when unknown)"""
+        info = self.object_info
+        if not info:
+            return True
+        for node in workflow.values():
+            if not isinstance(node, dict):
+                continue
+            spec = info.get(node.get("class_type"))
+            if spec is None:
+                return False
+            declared = {**spec.get("input", {}).get("required", {}), **spec.get("input", {}).get("optional", {})}
+            for name, value in node.get("inputs", {}).items():
+                options = declared.get(name)
+                if (name.endswith("_name") and isinstance(value, str) and options
+                        and isinstance(options[0], list) and value not in options[0]):
+                    return False
+        return True
+
+    def load(self):
+        with self.lock:
+            return self.queue_depth + self.assigned
+
+    def report(self):
+        with self.lock:
+            return {"alive": self.alive, "queue_depth": self.queue_depth + self.assigned,
+                    "vram_free_mb": round(self.vram_free / 2**20) if self.vram_free else None,
+                    "vram_total_mb": round(self.vram_total / 2**20) if self.vram_total else None,
+                    "warm_models": sorted(self.warm_models), "submitted": self.submitted,
+                    "last_error": self.last_error}
+
+
+class BackendPool:
+    """
+    Routes prompts across ComfyUI servers: least queued first, then already holding the
+    workflow's models, then most free VRAM. Remembers where each prompt went (and its
+    workflow) so results are fetched from the right server and a job can fail over.
+    """
+    def __init__(self, urls):
+        self.backends = [ComfyBackend(u if "://" in u else f"http://{u}") for u in urls]
+        self.jobs = {}     # prompt_id -> (backend, workflow)
+        self.moved = {}    # prompt_id -> prompt_id it was resubmitted as
+        self.failovers = 0
+        self.lock = threading.Lock()
+
+    def refresh(self, force=False):
+        return [b for b in self.backends if b.refresh(force=force)]
+
+    def candidates(self, workflow, exclude=()):
+        self.refresh()
+        models = workflow_models(workflow)
+        usable = [b for b in self.backends if b.alive and b.url not in exclude and b.supports(workflow)]
+        return sorted(usable, key=lambda b: (b.load(), not models <= b.warm_models, -(b.vram_free or 0)))
+
+    def submit(self, workflow, exclude=()):
+        """POST the prompt to the best backend, trying the next one on failure. Returns (backend, response)"""
+        tried = self.candidates(workflow, exclude)
+        if not tried:
+            raise Exception("No live ComfyUI backend can run this workflow")
+        last_error = None
+        for backend in tried:
+            events = get_event_stream(backend.url)
+            if events:
+                events.wait_connected()
+            try:
+                response = requests.post(f"{backend.url}/prompt", json={"prompt": workflow, "client_id": CLIENT_ID},
+                                         timeout=30, verify=False)
+            except requests.RequestException as e:
+                backend.refresh(force=True)
+                last_error = e
+                continue
+            if response.status_code != 200:
+                # Usually a validation error on this server (missing node/model): try the next one
+                last_error = Exception(f"ComfyUI error: {response.status_code} from {backend.url}")
+                continue
+            result = response.json()
+            prompt_id = result['prompt_id']
+            if events:
+                events.register(prompt_id)
+            with backend.lock:
+                backend.assigned += 1
+                backend.submitted += 1
+                backend.warm_models = workflow_models(workflow)
+            with self.lock:
+                self.jobs[prompt_id] = (backend, workflow)
+            return backend, result
+        raise last_error
+
+    def resolve(self, prompt_id):
+        """Current prompt_id for a job (follows failovers)"""
+        with self.lock:
+            while prompt_id in self.moved:
+                prompt_id = self.moved[prompt_id]
+            return prompt_id
+
+    def backend_for(self, prompt_id):
+        with self.lock:
+            job = self.jobs.get(prompt_id)
+        return job[0] if job else self.backends[0]
+
+    def failover(self, prompt_id):
+        """If the prompt's backend is down, resubmit it elsewhere. Returns the new prompt_id or None."""
+        with self.lock:
+            job = self.jobs.get(prompt_id)
+        if job is None:
+            return None
+        backend, workflow = job
+        if backend.refresh(force=True):
+            return None
+        new_backend, result = self.submit(workflow, exclude={backend.url})
+        with self.lock:
+            self.moved[prompt_id] = result['prompt_id']
+            self.failovers += 1
+        print(f"   🔁 ComfyUI job moved from {backend.url} to {new_backend.url}")
+        return result['prompt_id']
+
+    def report(self):
+        return {"backends": {b.url: b.report() for b in self.backends}, "failovers": self.failovers}
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def get_backend_pool():
+    """Process-wide BackendPool over COMFYUI_BACKENDS"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = BackendPool(COMFYUI_BACKENDS)
+        return _shared_pool
+
 
 class ComfyClient:
     """
@@ -22,6 +371,7 @@ class ComfyClient:
         self.port = COMFYUI_PORT
         self.url = f"http://{self.host}:{self.port}"
         self.ws_url = f"ws://{self.host}:{self.port}/ws"
+        self.pool = get_backend_pool()
         self.connected = False
         self.server_process = None
         
@@ -36,15 +386,18 @@ class ComfyClient:
         if auto_start and not self.connected and self.comfy_installed:
             self.start_server()
     
-    def _check_connection(self):
-        """Check if ComfyUI server is running"""
-        try:
-            response = requests.get(f"{self.url}/system_stats", timeout=2)
-            self.connected = (response.status_code == 200)
-            if self.connected:
-                print(f"   ✅ ComfyUI connected at {self.url}")
-        except:
-            self.connected = False
+    def _check_connection(self, verbose=True):
+        """Check if any ComfyUI backend is running"""
+        live = self.pool.refresh(force=True)
+        self.connected = bool(live)
+        if self.connected and verbose:
+            for backend in live:
+                print(f"   ✅ ComfyUI connected at {backend.url}")
+        return self.connected
+    
+    def ping(self):
+        """Re-check the server quietly (before each job)"""
+        return self._check_connection(verbose=False)
     
     def start_server(self, wait_time=10):
         """
@@ -113,59 +466,98 @@ class ComfyClient:
         if not self.connected:
             raise Exception("ComfyUI not connected")
         
-        # Prepare prompt
-        prompt_data = {
-            "prompt": workflow,
-            "client_id": "hollywood_studio"
-        }
-        
-        # Send to ComfyUI
-        response = requests.post(
-            f"{self.url}/prompt",
-            json=prompt_data,
-            verify=False
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise Exception(f"ComfyUI error: {response.status_code}")
+        # Least-loaded compatible backend; the pool also registers it with that server's event stream
+        backend, result = self.pool.submit(workflow)
+        return result
     
     def get_history(self, prompt_id):
         """Get execution history for a prompt"""
         if not self.connected:
             return None
         
-        response = requests.get(f"{self.url}/history/{prompt_id}")
+        prompt_id = self.pool.resolve(prompt_id)
+        url = self.pool.backend_for(prompt_id).url
+        response = requests.get(f"{url}/history/{prompt_id}", timeout=10)
         if response.status_code == 200:
             return response.json()
         return None
     
-    def get_output_path(self, prompt_id, output_dir="output"):
+    def get_output_path(self, prompt_id, dest_dir=OUTPUT_DIR):
         """
-        Get path to generated output.
+        Get a local copy of the prompt's first output (image, gif or video).
         
         Args:
             prompt_id: The prompt ID from queue_prompt
-            output_dir: Output directory name
+            dest_dir: Directory to place the file in
         
         Returns:
             Path to output file or None
         """
+        prompt_id = self.pool.resolve(prompt_id)
         history = self.get_history(prompt_id)
         if not history or prompt_id not in history:
             return None
         
-        outputs = history[prompt_id].get('outputs', {})
+        entry = self.first_output(history[prompt_id].get('outputs', {}))
+        if not entry:
+            return None
+        try:
+            return self.fetch_output(prompt_id, entry, dest_dir)
+        except RetrievalError as e:
+            print(f"   ❌ {e}")
+            return None
+    
+    def fetch_output(self, prompt_id, entry, dest_dir=OUTPUT_DIR):
+        """
+        Bring one output entry into dest_dir: hardlinked/moved when the backend runs on
+        this machine, resumable verified download otherwise. Raises RetrievalError.
+        """
+        prompt_id = self.pool.resolve(prompt_id)
+        backend = self.pool.backend_for(prompt_id)
+        # Each server numbers its own files (flux_00001_.png on every host): prefix the job id
+        # so outputs from different jobs never share a target or .part file
+        name = f"{prompt_id}_{os.path.basename(entry['filename'])}"
+        return get_output_retriever().retrieve(entry, backend.url, dest_dir, name=name)
+    
+    @staticmethod
+    def first_output(outputs, kinds=("images", "gifs", "videos")):
+        """First file entry ({"filename", "subfolder", "type"}) of the given kinds in a job's outputs"""
         for node_id, node_output in outputs.items():
-            if 'images' in node_output:
-                images = node_output['images']
-                if images:
-                    filename = images[0]['filename']
-                    return os.path.join(self.comfy_dir, output_dir, filename)
-        
+            for kind in kinds:
+                files = node_output.get(kind)
+                if files:
+                    return files[0]
         return None
-    
+
+    def wait_for_outputs(self, prompt_id, max_wait=COMFYUI_JOB_TIMEOUT):
+        """
+        Wait for a queued prompt and return its outputs ({node_id: {"images"|"gifs"|"videos": [...]}}).
+        Raises ComfyJobError if the job failed, TimeoutError after max_wait.
+        If the prompt's backend dies meanwhile, the job is resubmitted to another one.
+        """
+        deadline = time.time() + max_wait
+        while True:
+            prompt_id = self.pool.resolve(prompt_id)
+            events = get_event_stream(self.pool.backend_for(prompt_id).url)
+            if events is None:
+                if not self._poll_history(prompt_id, deadline - time.time()):
+                    raise TimeoutError(f"ComfyUI prompt {prompt_id} not finished after {max_wait}s")
+                return (self.get_history(prompt_id) or {}).get(prompt_id, {}).get('outputs', {})
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise TimeoutError(f"ComfyUI prompt {prompt_id} not finished after {max_wait}s")
+            try:
+                outputs = events.register(prompt_id).result(timeout=min(COMFYUI_HEALTH_INTERVAL, remaining))
+                break
+            except FutureTimeout:
+                # Still running, unless its server went away: then move the job
+                if not events.connected.is_set():
+                    self.pool.failover(prompt_id)
+        if not outputs:
+            # Cached/instant executions may skip 'executed' events: /history has the full record
+            outputs = (self.get_history(prompt_id) or {}).get(prompt_id, {}).get('outputs', {})
+        return outputs
+
     def wait_for_completion(self, prompt_id, max_wait=120, check_interval=2):
         """
         Wait for workflow execution to complete.
@@ -173,11 +565,23 @@ class ComfyClient:
         Args:
             prompt_id: The prompt ID to wait for
             max_wait: Maximum wait time in seconds
-            check_interval: Seconds between status checks
+            check_interval: Seconds between status checks (only without websocket-client)
         
         Returns:
             True if completed, False if timeout
         """
+        if websocket is None:
+            return self._poll_history(prompt_id, max_wait, check_interval)
+        try:
+            self.wait_for_outputs(prompt_id, max_wait=max_wait)
+            return True
+        except TimeoutError:
+            return False
+        except ComfyJobError as e:
+            print(f"   ❌ ComfyUI job failed: {e}")
+            return False
+
+    def _poll_history(self, prompt_id, max_wait, check_interval=2):
         waited = 0
         while waited < max_wait:
             history = self.get_history(prompt_id)
@@ -13,6 +13,23 @@ RESOLUTION = (1920, 1080)  # 1080p
 FPS = 24
 TARGET_DURATION = 30  # seconds
 
+# Social cutdowns rendered from the master timeline (seconds)
+CUTDOWN_DURATIONS = [6, 15]
+
+# Editor frame processing: "fused" (one NumPy/OpenCV kernel per clip) or "moviepy" (chained vfx)
+EDITOR_FRAME_ENGINE = "fused"
+
+# Render mode: "moviepy" (single process) or "pipelined" (decode/effects/encode processes
+# sharing a ring buffer of raw frames; best on many-core machines)
+RENDER_MODE = "moviepy"
+RENDER_RING_SLOTS = 24  # Frames in flight (24 x 1080p RGB = ~150 MB)
+RENDER_DECODERS = 2
+RENDER_EFFECT_WORKERS = 2
+
+# ========== AUDIO SETTINGS ==========
+AUDIO_SAMPLE_RATE = 44100  # Project rate: every asset is decoded once to float32 PCM at this rate
+AUDIO_CACHE_DIR = os.path.join(ASSETS_DIR, "audio_cache")
+
 # ========== AI API KEYS ==========
 # Primary: Groq (Fast, Free tier available)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
@@ -47,6 +64,53 @@ LLM_MODELS = {
     }
 }
 
+# Shared LLM transport: max concurrent requests per provider (pooled keep-alive sessions)
+LLM_MAX_IN_FLIGHT = {"ollama": 2, "groq": 8, "openai": 8, "anthropic": 4}
+
+# Router: requests go to the fastest healthy (provider, model) route from LLM_MODELS.
+# Hedged calls start a second route once the first runs past its p95 latency.
+LLM_HEDGE_ENABLED = True
+LLM_HEDGE_DEFAULT_DELAY = 20.0  # seconds, until a route has latency history
+LLM_HEDGE_MIN_DELAY = 2.0
+
+# Circuit breakers (shared by all agents) and adaptive timeouts
+LLM_BREAKER_FAILURES = 3  # Consecutive failures before a provider's circuit opens
+LLM_BREAKER_COOLDOWN = 30  # Seconds before a half-open probe is allowed
+LLM_CONNECT_TIMEOUT = 3.05
+LLM_TIMEOUT_MIN = 30
+LLM_TIMEOUT_MAX = {"ollama": 300, "default": 60}  # Read timeout ceiling before latency history exists
+
+# Disk cache for LLM responses (opt-in: set LLM_CACHE=1). Only parsed results are stored.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "0") == "1"
+LLM_CACHE_PATH = os.path.join(ASSETS_DIR, "llm_cache.sqlite")
+LLM_CACHE_MAX_MB = 64
+LLM_CACHE_TTL_HOURS = 24 * 7
+# Cumulative per-agent token/latency ledger (updated at the end of every run)
+LLM_USAGE_LEDGER_PATH = os.path.join(ASSETS_DIR, "llm_usage.json")
+
+# Cinematographer: "batched" (one JSON call for all scenes), "concurrent" (parallel per-scene
+# calls) or "sequential". Batched/concurrent fall back to per-scene calls on failure.
+CINEMATOGRAPHER_MODE = "batched"
+CINEMATOGRAPHER_CONCURRENCY = 4
+
+# Super Director planning: "speculative" (K candidate plans in parallel, one batched critique,
+# first plan over the quality threshold wins) or "sequential" (plan -> critique -> re-plan)
+SUPER_DIRECTOR_MODE = "speculative"
+SUPER_DIRECTOR_CANDIDATES = 3
+SUPER_DIRECTOR_PLAN_BUDGET = 120  # Wall-clock seconds for the speculative loop
+
+# Warm start from past runs (knowledge.json): briefs at or above TEMPLATE similarity reuse the
+# accepted plan + script directly; those above FEWSHOT similarity become planning examples
+RETRIEVAL_TEMPLATE_SIMILARITY = 0.8
+RETRIEVAL_FEWSHOT_SIMILARITY = 0.3
+RETRIEVAL_MAX_EXAMPLES = 2
+KNOWLEDGE_MAX_ENTRIES = 200  # Per list in knowledge.json
+
+# Wall-clock budget per job (seconds, 0 = unlimited). Over budget, the costliest GENERATE
+# scenes drop to STOCK (or offline stills) and the render drops to the draft preset.
+JOB_BUDGET_SECONDS = int(os.getenv("JOB_BUDGET_SECONDS", "0"))
+STAGE_TIMINGS_PATH = os.path.join(ASSETS_DIR, "stage_timings.json")
+
 # Legacy single model (for backwards compatibility)
 LLM_MODEL = "llama3" # Default for Ollama
 
@@ -54,6 +118,9 @@ LLM_MODEL = "llama3" # Default for Ollama
 # Ensure you have installed Ollama from ollama.com and ran `ollama serve`
 OLLAMA_BASE_URL = "http://localhost:11434/api/generate"
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3")
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # Sent on every request: keeps the model resident
+OLLAMA_PRELOAD = True  # Load the model in the background when the studio starts
+OLLAMA_USE_CHAT = True  # /api/chat with a separate system message: repeated system prompts reuse Ollama's prompt cache
 
 # ========== STOCK FOOTAGE APIS ==========
 # Pexels (Primary - Best quality, most reliable)
@@ -73,7 +140,18 @@ FREESOUND_API_KEY = os.getenv("FREESOUND_API_KEY", "")
 # ========== COMFYUI SETTINGS ==========
 COMFYUI_HOST = "127.0.0.1"
 COMFYUI_PORT = 8188
+# GPU hosts to spread generation over, comma-separated "host:port" or URLs (default: the one above)
+COMFYUI_BACKENDS = [b.strip() for b in os.getenv("COMFYUI_BACKENDS", "").split(",") if b.strip()] \
+    or [f"{COMFYUI_HOST}:{COMFYUI_PORT}"]
+COMFYUI_STATS_TTL = 2.0  # Seconds a backend's /queue + /system_stats snapshot is trusted for routing
+COMFYUI_HEALTH_INTERVAL = 10  # Seconds between liveness checks while waiting on a job
 VIDEO_MODEL = "hunyuan"  # "hunyuan" or "ltx2"
+COMFYUI_JOB_TIMEOUT = 600  # Seconds to wait for one queued prompt
+COMFYUI_COLLECT_WORKERS = 4  # Threads collecting finished GENERATE jobs while the studio works
+# Output folder of a ComfyUI running on this machine (outputs are hardlinked from here, not downloaded)
+COMFYUI_OUTPUT_DIR = os.getenv("COMFYUI_OUTPUT_DIR",
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), "ComfyUI", "output"))
+COMFYUI_DOWNLOAD_RETRIES = 3  # Resumable attempts per output from a remote backend
 
 # ========== VOICEOVER SETTINGS ==========
 # Providers: "openai", "elevenlabs", "edge-tts" (Free)
@@ -129,6 +207,7 @@ ENABLE_COMFYUI = True  # Enabled for advanced video gen
 ENABLE_OFFLINE_FALLBACK = True  # Generate placeholders if APIs fail
 ENABLE_QUALITY_LOOPS = True  # Super Director review loops
 ENABLE_MULTI_API = True  # Use multiple AI APIs with fallback
+ENABLE_CUTDOWNS = True  # Editor renders CUTDOWN_DURATIONS versions after the master
 
 # Create directories if they don't exist
 for directory in [OUTPUT_DIR, ASSETS_DIR, WORKFLOWS_DIR]:
@@ -1,7 +1,8 @@
 import os
 import json
 import time
-from config import OUTPUT_DIR, RESOLUTION
+from concurrent.futures import ThreadPoolExecutor
+from config import OUTPUT_DIR, RESOLUTION, OLLAMA_PRELOAD, JOB_BUDGET_SECONDS
 # Import Agents (Placeholders for now, to be implemented next)
 from agents.super_director import SuperDirector
 from agents.specialist_directors import (LightingDirector, CinematographyDirector, 
@@ -18,12 +19,27 @@ from agents.sound_effects import SoundEffectsAgent
 from agents.color_grading import ColorGradingAgent
 from agents.cinematographer import CinematographerAgent # NEW
 from agents.voiceover import VoiceoverAgent # NEW
+from agents.offline_generator import OfflineGenerator
+from agents.llm_cache import llm_cache_report
+from agents.llm_router import get_router
+from agents.provider_health import get_provider_health
+from agents.llm_usage import get_usage_ledger
+from agents.singleflight import get_singleflight
+from agents.ollama_models import preload_models
+from agents.budget_planner import BudgetPlanner, StageTimings
+from agents.generation_pipeline import GenerationPipeline
+from comfy_client import get_backend_pool
+from agents.output_retrieval import get_output_retriever
 
 class HollywoodStudio:
     def __init__(self):
         print("🎬 Initializing Hollywood-AI Studio (Hierarchical Director Mode)...")
         print("   🎯 Super Director + 5 Specialist Directors")
         
+        # Warm the local model while the agents initialize (first planning call hits a hot model)
+        if OLLAMA_PRELOAD:
+            preload_models()
+        
         # Initialize Super Director (Chief Creative Officer)
         self.super_director = SuperDirector()
         
@@ -48,21 +64,27 @@ class HollywoodStudio:
         self.color_grading = ColorGradingAgent()
         self.cinematographer = CinematographerAgent() # NEW
         self.voiceover = VoiceoverAgent() # NEW
+        self.offline_generator = OfflineGenerator()
+        # Historical stage costs for the budget planner
+        self.stage_timings = StageTimings()
         
-    def produce_video(self, user_prompt):
+    def produce_video(self, user_prompt, budget_s=JOB_BUDGET_SECONDS):
         print(f"\n📢 RECEIVED BRIEF: '{user_prompt}'")
+        # The budget clock starts with the brief
+        budget = BudgetPlanner(budget_s, self.stage_timings, tracker=self.tracker,
+                               offline=self.intelligence.network_status["recommended_mode"] == "offline")
         
         # STEP 0: SUPER DIRECTOR - Create Production Plan
         print("\n🎬 SUPER DIRECTOR: Planning production...")
-        production_plan = self.super_director.plan_production(user_prompt)
+        references = self.intelligence.similar_briefs(user_prompt)
+        production_plan = self.super_director.plan_production(user_prompt, references=references)
+        self.tracker.log_metrics("planning", {k: v for k, v in self.super_director.last_planning.items()
+                                              if k != "match"})
         
         if not production_plan:
             print("⚠️ Super Director failed, falling back to standard workflow...")
             production_plan = None
         
-        # Use production plan as script if available
-        script = production_plan if production_plan else None
-        
         # Step 0.2: Color Grading (Set Visual Mood)
         print("🎨 Color Director: Setting visual mood...")
         color_palette = self.color_grading.generate_palette(mood="cinematic")
@@ -73,6 +95,7 @@ class HollywoodStudio:
         # Step 1: Pre-Production (Scripting)
         print("📝 Step 1: Director is writing the script...")
         script = None
+        custom_script_used = False
         
         # Check if user provided a custom JSON script
         try:
@@ -80,6 +103,7 @@ class HollywoodStudio:
             if 'shot_list' in custom_script or 'scenes' in custom_script:
                 print("   ✅ Custom script detected! Using your detailed script...")
                 script = custom_script
+                custom_script_used = True
                 # Normalize key
                 if 'shot_list' in script and 'scenes' not in script:
                     script['scenes'] = script['shot_list']
@@ -87,10 +111,38 @@ class HollywoodStudio:
             # Not JSON, proceed with AI generation
             pass
         
-        # If no custom script, generate one
+        # Scenes stream in one at a time: each starts its DP pass, voiceover and stock search
+        # while the Screenwriter is still writing the rest
+        prefetched = {}
+        prefetch_pool = ThreadPoolExecutor(max_workers=2)
+
+        # A reused plan comes with the script that shipped with it (visuals already enhanced)
+        template_scenes = set()
+        match = self.super_director.last_planning.get('match')
+        if not script and match:
+            stored = match.get('script')
+            if stored and stored.get('scenes'):
+                print("   📚 Reusing the script from the matched brief")
+                script = json.loads(json.dumps(stored))
+                template_scenes = set(range(len(script['scenes'])))
+
+        # Otherwise the plan's shot list is the script; the Screenwriter only writes the copy
+        if not script and production_plan:
+            script = self.screenwriter.scenes_from_plan(production_plan)
+            if script:
+                try:
+                    self.screenwriter.fill_missing(
+                        script, user_prompt, on_scene=self._scene_prefetcher(prefetch_pool, prefetched)
+                    )
+                except Exception as e:
+                    print(f"   ⚠️ Screenwriter copy pass failed, continuing without narration: {e}")
+
+        # No custom script and no usable plan: write one from scratch
         if not script:
             try:
-                script = json.loads(self.screenwriter.write_script(user_prompt))
+                script = json.loads(self.screenwriter.write_script(
+                    user_prompt, on_scene=self._scene_prefetcher(prefetch_pool, prefetched)
+                ))
                 
                 # Normalize: Handle both 'scenes' and 'shot_list' keys
                 if 'shot_list' in script and 'scenes' not in script:
@@ -104,6 +156,10 @@ class HollywoodStudio:
                 # Fallback to STOCK so we guarantee an output even if ComfyUI is down
                 script = {"scenes": [{"visual_prompt": user_prompt, "duration": 5, "source_type": "STOCK"}]}
         
+        early_scenes, prefetched_assets = self._collect_prefetch(script, prefetched)
+        early_scenes |= template_scenes
+        prefetch_pool.shutdown(wait=True)
+        
         # Save Script
         if not os.path.exists(OUTPUT_DIR):
             os.makedirs(OUTPUT_DIR)
@@ -117,36 +173,87 @@ class HollywoodStudio:
         quality = self.intelligence.assess_script_quality(script)
         # ... (logging quality)
 
+        # Step 1.3: Schedule against the job budget (may degrade GENERATE scenes / the render preset)
+        budget_decisions = budget.fit(script.get('scenes', []), prepared=early_scenes)
+        self.editor.render_preset = budget.render_preset
+
         # NEW STEP: Cinematographer (Visual Enhancement)
         print("\n🎥 [COMMUNICATION] Screenwriter -> Cinematographer: 'Here is the draft script. Please refine the visuals.'")
         print("   🎥 Cinematographer: 'On it. Adding lens choices and lighting specs...'")
-        script = self.cinematographer.enhance_visuals(script)
+        stage_start = time.time()
+        to_enhance = len(script.get('scenes', [])) - len(early_scenes)
+        script = self.cinematographer.enhance_visuals(script, skip=early_scenes)
+        if to_enhance > 0:
+            self.stage_timings.record("dp_scene", (time.time() - stage_start) / to_enhance)
         print("   🎥 Cinematographer -> Team: 'Visuals locked. Ready for production.'")
 
+        # Visuals are final: queue every GENERATE keyframe + video now, so ComfyUI renders
+        # through voiceover, stock sourcing and retrieval instead of one scene at a time
+        generation = GenerationPipeline(self.art_dept, self.production)
+        generation.submit(script.get('scenes', []))
+
         # NEW STEP: Voiceover (Audio Generation)
         print("\n🎙️ [COMMUNICATION] Screenwriter -> Voice Actor: 'Please record the narration for these scenes.'")
         scenes = script.get('scenes', [])
+        stage_start = time.time()
+        to_voice = sum(1 for s in scenes if s.get('voiceover') and not s.get('voiceover_path'))
         scenes = self.voiceover.generate_scene_voiceovers(scenes)
+        if to_voice:
+            self.stage_timings.record("voiceover_scene", (time.time() - stage_start) / to_voice)
         script['scenes'] = scenes # Update script with audio paths
         print("   🎙️ Voice Actor -> Editor: 'Audio files are ready and synced.'")
         
         # Step 2: Casting & Art (Static Visuals & Stock)
         print("\n🎨 [COMMUNICATION] Cinematographer -> Art Dept / Librarian: 'Sourcing visuals based on new specs...'")
         assets = []
+        # Shot intent from the Super Director plan (drives social cutdowns)
+        plan_shots = production_plan.get('shots', []) if production_plan else []
         if script and 'scenes' in script:
             for i, scene in enumerate(script['scenes']):
+                scene_start = time.time()
                 source = scene.get('source_type', 'GENERATE')
-                # ...
+                shot = plan_shots[i] if i < len(plan_shots) and isinstance(plan_shots[i], dict) else {}
+                asset_path = None
+                generated_video = None
+                if source == "STOCK":
+                    asset_path = prefetched_assets.get(i) or self.librarian.get_best_match(scene)
+                
+                # Budget-degraded scenes never escalate back to generation: offline still (Ken Burns in the edit)
+                if source == "OFFLINE" or (not asset_path and scene.get('budget_degraded')):
+                    if not asset_path:
+                        words = "".join(c if c.isalnum() else " " for c in scene.get('visual_prompt', '')).split()
+                        asset_path = self.offline_generator.generate_image(" ".join(words[:5]) or "scene")
+
+                # Fallback to generation if Stock failed or if source is GENERATE
+                if not asset_path:
+                    if source == "STOCK":
+                        print("      ⚠️ All stock sources exhausted, switching to AI Generation.")
+                    if generation.has(i):
+                        # Queued up front: usually finished (or close) by the time we get here
+                        keyframe, generated_video = generation.result(i)
+                        asset_path = keyframe or generated_video
+                    else:
+                        asset_path = self.art_dept.generate_keyframe(scene)
+                    
+                    # If AI generation also fails (ComfyUI offline), try STOCK as last resort
+                    if not asset_path and source == "GENERATE":
+                        print("      ⚠️ AI Generation unavailable. Attempting STOCK fallback...")
+                        asset_path = self.librarian.get_best_match(scene)
                 
-                # Bundle asset with its specific voiceover
                 if asset_path:
+                    print(f"      ✅ Asset Secured: {os.path.basename(asset_path)}")
+                    
+                    # Bundle asset with its specific voiceover
                     asset_data = {
                         'path': asset_path,
                         'duration': scene.get('duration', 5),
                         'text_overlay': scene.get('text_overlay', ''),
-                        'voiceover_path': scene.get('voiceover_path') # Pass precise audio
+                        'voiceover_path': scene.get('voiceover_path'), # Pass precise audio
+                        'scene_index': i,
+                        'purpose': scene.get('purpose', shot.get('purpose', '')),
+                        'pacing': scene.get('pacing', shot.get('pacing', ''))
                     }
-                    assets.append(asset_data) # Check editor usage!
+                    assets.append(asset_data)
                     
                     # Log
                     ext = os.path.splitext(asset_path)[1].lower()
@@ -154,33 +261,37 @@ class HollywoodStudio:
                          print(f"      📷 Asset Type: IMAGE")
                     else:
                          print(f"      🎥 Asset Type: VIDEO")
-                
-                # Fallback to generation if Stock failed or if source is GENERATE
-                if not asset_path:
-                    if source == "STOCK":
-                        print("      ⚠️ All stock sources exhausted, switching to AI Generation.")
-                    asset_path = self.art_dept.generate_keyframe(scene)
-                    
-                    # If AI generation also fails (ComfyUI offline), try STOCK as last resort
-                    if not asset_path and source == "GENERATE":
-                        print("      ⚠️ AI Generation unavailable. Attempting STOCK fallback...")
-                        asset_path = self.librarian.get_best_match(scene)
-                
-                if asset_path:
-                    # New bundling logic handled above
-                    print(f"      ✅ Acquired: {os.path.basename(asset_path)}")
-                    print(f"      ✅ Asset Secured: {os.path.basename(asset_path)}")
                     
                     # Step 3: Production (Motion) - Only if Generated
                     if source == "GENERATE":
-                        print(f"      🎥 Rolling Camera on Scene {i+1}...")
-                        # We pass the asset path (keyframe) to the Director
-                        video_path = self.production.shoot_scene(scene, asset_path)
+                        if generation.has(i):
+                            video_path = generated_video
+                        else:
+                            print(f"      🎥 Rolling Camera on Scene {i+1}...")
+                            # We pass the asset path (keyframe) to the Director
+                            video_path = self.production.shoot_scene(scene, asset_path)
                         # Update asset path to the video (or keep image if failed)
-                        assets[-1]['path'] = video_path
-                        assets[-1]['type'] = "GENERATE_VIDEO"
+                        if video_path:
+                            asset_data['path'] = video_path
+                            asset_data['type'] = "GENERATE_VIDEO"
+
+                elapsed = time.time() - scene_start
+                if generation.has(i):
+                    pass  # Overlapped with the rest of the run: timed as a batch below
+                elif source == "GENERATE":
+                    self.stage_timings.record("scene_GENERATE_per_s", elapsed / float(scene.get('duration', 5) or 5))
+                elif not (source == "STOCK" and i in prefetched_assets):
+                    self.stage_timings.record(f"scene_{source}", elapsed)
+
+        generation.shutdown()
+        generation_report = generation.report()
+        queued_footage = sum(float(script['scenes'][i].get('duration', 5) or 5)
+                             for i in range(len(script.get('scenes', []))) if generation.has(i))
+        if queued_footage and generation_report["last_result_s"]:
+            self.stage_timings.record("scene_GENERATE_per_s", generation_report["last_result_s"] / queued_footage)
 
         # Step 3.5: Sound Department - CRITICAL AUDIO FIX
+        post_start = time.time()
         print("🎵 Step 3.5: Composing Original Score...")
         total_duration = len(assets) * 4
         audio_track = self.sound_dept.compose_score(user_prompt, duration=total_duration)
@@ -235,15 +346,24 @@ class HollywoodStudio:
         print(f"   🎵 Audio Track: {audio_track if audio_track else 'None'}")
         print(f"   🔊 Sound Effects: {len(sound_effects) if sound_effects else 0} effects")
         
+        # Per-scene voiceovers are attached to each clip; no global VO track
+        voiceover_path = None
+        
+        # Transitions Director: per-boundary specs the Editor blends (cuts by default)
+        transition_plan = self.transitions_director.execute(script.get('scenes', []))
+        
         # Call editor with all audio
         final_video = self.editor.assemble_cut(
             assets,
             audio_path=audio_track,  # Background music
             sound_effects=sound_effects,  # SFX list
             voiceover_path=voiceover_path,  # Voiceover (disabled)
-            production_plan={"prompt": user_prompt},
+            production_plan={"prompt": user_prompt, "transitions": transition_plan['transitions']},
             tracker=self.tracker
         )
+        footage = sum(float(a.get('duration', 5) or 5) for a in assets)
+        if final_video and footage:
+            self.stage_timings.record("post_per_s", (time.time() - post_start) / footage)
         
         # Step 5: Localization & Documentation (No API Extras)
         if final_video:
@@ -283,6 +403,9 @@ class HollywoodStudio:
             except Exception as e:
                 print(f"   ⚠️ Marketing Agent failed: {e}")
 
+            for cutdown in self.editor.cutdown_paths:
+                print(f"   📱 Cutdown: {os.path.basename(cutdown)}")
+
             print(f"✅ PRODUCTION COMPLETE. Output saved to {final_video}")
             print(f"\n{'='*60}")
             print(f"Full path: {final_video}")
@@ -295,6 +418,80 @@ class HollywoodStudio:
         else:
             print(f"⚠️ Production finished but no video could be assembled (check logs).")
             print(f"   Assets are located in {OUTPUT_DIR}")
+        
+        # Remember what worked, so similar briefs can start from this plan and script
+        if not custom_script_used:
+            try:
+                self.intelligence.learn_from_generation(user_prompt, script, bool(final_video), len(assets),
+                                                        plan=production_plan)
+            except Exception as e:
+                print(f"   ⚠️ Could not update knowledge base: {e}")
+
+        # Run report
+        self.tracker.log_metrics("budget", {
+            "budget_s": budget_s or None,
+            "elapsed_s": round(budget.elapsed(), 1),
+            "within_budget": budget.elapsed() <= budget_s if budget_s else None,
+            "decisions": budget_decisions
+        })
+        try:
+            self.stage_timings.save()
+        except OSError as e:
+            print(f"   ⚠️ Could not save stage timings: {e}")
+        self.tracker.log_metrics("generation_pipeline", generation_report)
+        self.tracker.log_metrics("comfyui_backends", get_backend_pool().report())
+        self.tracker.log_metrics("comfyui_retrieval", get_output_retriever().report())
+        self.tracker.log_metrics("llm_cache", llm_cache_report())
+        self.tracker.log_metrics("llm_routes", get_router().report())
+        self.tracker.log_metrics("singleflight", get_singleflight().report())
+        health = get_provider_health().report()
+        self.tracker.log_metrics("provider_health", health)
+        get_provider_health().print_status(health)
+        usage = get_usage_ledger()
+        usage_report = usage.report()
+        self.tracker.log_metrics("llm_usage", usage_report)
+        usage.print_summary(usage_report)
+        usage.flush()
+        self.tracker.save_report()
+
+    def _scene_prefetcher(self, pool, prefetched):
+        """on_scene callback: queue early work for each scene as it finishes streaming"""
+        def on_scene(index, scene):
+            snapshot = json.dumps(scene, sort_keys=True)
+            print(f"   ⚡ Scene {index+1} streamed: starting visuals + voiceover early")
+            prefetched[index] = (snapshot, scene, pool.submit(self._prefetch_scene, index, scene))
+        return on_scene
+
+    def _prefetch_scene(self, index, scene):
+        """Work that only needs the scene itself: DP pass, voiceover, stock search"""
+        self.cinematographer.enhance_scene(scene, index)
+        self.voiceover.generate_scene_voiceover(scene, index)
+        if scene.get('source_type') == 'STOCK':
+            return self.librarian.get_best_match(scene)
+        return None
+
+    def _collect_prefetch(self, script, prefetched):
+        """
+        Adopt early results for scenes that match the final parsed script.
+        Returns (indices already enhanced + voiced, {index: stock asset path}).
+        """
+        early, assets = set(), {}
+        scenes = script.get('scenes', [])
+        for index, (snapshot, scene, future) in sorted(prefetched.items()):
+            try:
+                asset_path = future.result()
+            except Exception as e:
+                print(f"   ⚠️ Early work for scene {index+1} failed: {e}")
+                continue
+            # A fallback/retried script may differ from what streamed; only adopt exact matches
+            if index < len(scenes) and json.dumps(scenes[index], sort_keys=True) == snapshot:
+                scenes[index] = scene
+                early.add(index)
+                if asset_path:
+                    assets[index] = asset_path
+        if early:
+            print(f"   ⚡ {len(early)} scenes prepared while the script was streaming")
+        return early, assets
 
 if __name__ == "__main__":
     studio = HollywoodStudio()